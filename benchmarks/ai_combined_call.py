@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+AIProcessor.process_memo の呼び出し方式ベンチマーク
+
+要約とタグを別々に生成する2回呼び出しと、JSON 応答1回で生成する方式を、
+OpenAI API を模したフェイククライアント (benchmarks/fake_openai.py) 上でレイテンシとトークン数で比較する。
+
+    uv run python benchmarks/ai_combined_call.py [--memos 20] [--latency-ms 400]
+        [--malformed-rate 0.1]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 毎回 LLM を呼んだ場合を測るため AI 結果キャッシュは使わない
+os.environ["AI_CACHE_PATH"] = "none"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_openai import FakeChatClient
+from src.utils.ai_processor import AIProcessor
+
+
+def make_content(i: int) -> str:
+    return (
+        f"第{i}回定例会議のメモ。プロジェクトの進捗について話し合いました。"
+        "バックエンドの検索機能は完成し、フロントエンドの一覧画面を改善中。"
+        "Next steps: review the pull requests and deploy to staging by Friday. "
+    ) * 5
+
+
+def run(label: str, combined: bool, args) -> None:
+    client = FakeChatClient(
+        latency=args.latency_ms / 1000, per_token=args.per_token_ms / 1000,
+        malformed_rate=args.malformed_rate, seed=args.seed
+    )
+    processor = AIProcessor(client=client, combined=combined)
+    latencies = []
+    for i in range(args.memos):
+        start = time.perf_counter()
+        processor.process_memo(make_content(i))
+        latencies.append(time.perf_counter() - start)
+
+    print(
+        f"📊 {label:<8} "
+        f"p50 {statistics.median(latencies) * 1000:7.0f} ms  "
+        f"max {max(latencies) * 1000:7.0f} ms  "
+        f"呼び出し {client.calls / args.memos:.2f} 回/件  "
+        f"入力 {client.prompt_tokens / args.memos:6.0f} tok/件  "
+        f"出力 {client.completion_tokens / args.memos:5.0f} tok/件"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--memos", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=400, help="1回の呼び出しの固定遅延")
+    parser.add_argument("--per-token-ms", type=float, default=10, help="出力トークンあたりの遅延")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="JSON 応答が壊れる割合")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run("2回呼び出し", False, args)
+    run("JSON 1回", True, args)
+
+
+if __name__ == "__main__":
+    main()
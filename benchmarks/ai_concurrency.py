@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+AsyncAIProcessor の並行処理ベンチマーク
+
+遅延を入れたフェイクの非同期 OpenAI クライアント (benchmarks/fake_openai.py) に対して、同時に多数の
+process_memo を投げたときの所要時間と、その間のイベントループの遅れ
+（/health などの他リクエストがどれだけ待たされるか）を測る。
+
+    uv run python benchmarks/ai_concurrency.py [--requests 50] [--latency-ms 400]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# 毎回 LLM を呼んだ場合を測るため AI 結果キャッシュは使わない
+os.environ["AI_CACHE_PATH"] = "none"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_openai import FakeAsyncChatClient
+from src.utils.ai_processor import AsyncAIProcessor
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """イベントループが interval ごとに起きられたかを監視し、最大の遅れを返す"""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+    return max_lag
+
+
+async def run(label: str, combined: bool, args) -> None:
+    client = FakeAsyncChatClient(latency=args.latency_ms / 1000)
+    processor = AsyncAIProcessor(client=client, combined=combined)
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(processor.process_memo(f"メモ {i}") for i in range(args.requests))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    max_lag = await lag_task
+
+    print(
+        f"📊 {label:<10} {args.requests} 件: {elapsed * 1000:6.0f} ms  "
+        f"同時実行 最大 {client.max_in_flight}  ループ遅延 最大 {max_lag * 1000:.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    args = parser.parse_args()
+
+    sequential_ms = args.requests * args.latency_ms
+    print(
+        f"逐次実行の場合の目安: JSON 1回 {sequential_ms:.0f} ms / "
+        f"2回呼び出し {sequential_ms * 2:.0f} ms"
+    )
+    asyncio.run(run("JSON 1回", True, args))
+    asyncio.run(run("2回呼び出し", False, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+AI ゲートウェイのベンチマーク
+
+RPM の上限を超えると 429 (Retry-After 付き) を返すフェイクの非同期エンドポイントに、
+同時に多数の process_memo を投げる。レート制限・リトライを無効にした場合と
+有効にした場合で、要約に成功した件数・429 の回数・送信数・所要時間を比較する。
+同じ本文のメモを混ぜ、同時に処理中の同一リクエストがまとめられることも確認する。
+
+    uv run python benchmarks/ai_gateway.py [--requests 60] [--rpm 600] [--burst 10]
+        [--distinct 40]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+# 毎回 LLM を呼んだ場合を測るため AI 結果キャッシュは使わない
+os.environ["AI_CACHE_PATH"] = "none"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.ai_gateway import AsyncAIGateway, TokenBucket
+from src.utils.ai_processor import AsyncAIProcessor, SUMMARY_ERROR
+
+
+class RateLimitedEndpoint:
+    """RPM の上限を超えたリクエストに 429 を返す chat.completions.create の代用品"""
+
+    def __init__(self, rpm: int, burst: int, latency: float):
+        self.bucket = TokenBucket(rpm, burst)
+        self.latency = latency
+        self.calls = 0
+        self.rejected = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, messages, max_tokens, temperature,
+                      response_format=None):
+        self.calls += 1
+        wait = self.bucket.reserve(1)
+        if wait > 0:
+            # 予約した分は戻し、429 と次に送ってよいまでの秒数を返す
+            self.bucket.refund(1)
+            self.rejected += 1
+            request = httpx.Request("POST", "http://fake/v1/chat/completions")
+            headers = {"retry-after-ms": str(int(wait * 1000) + 1)}
+            response = httpx.Response(429, headers=headers, request=request)
+            raise openai.RateLimitError(
+                "Rate limit reached", response=response, body=None
+            )
+        await asyncio.sleep(self.latency)
+        content = '{"summary": "- 進捗を共有", "tags": ["会議"]}'
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def close(self):
+        pass
+
+
+async def run(label: str, gateway: bool, args) -> None:
+    endpoint = RateLimitedEndpoint(args.rpm, args.burst, args.latency_ms / 1000)
+    if gateway:
+        client = AsyncAIGateway(
+            endpoint, rpm=args.rpm, tpm=0, max_in_flight=args.max_in_flight,
+            max_retries=5,
+        )
+        # 送信ペースをエンドポイントと同じバースト幅に合わせる
+        client.rpm = TokenBucket(args.rpm, args.burst)
+    else:
+        client = AsyncAIGateway(endpoint, rpm=0, tpm=0, max_in_flight=0, max_retries=0)
+    processor = AsyncAIProcessor(client=client, combined=True)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        processor.process_memo(f"メモ {i % args.distinct}") for i in range(args.requests)
+    ))
+    elapsed = time.perf_counter() - start
+    succeeded = sum(1 for result in results if result["summary"] != SUMMARY_ERROR)
+    print(
+        f"📊 {label:<14} 成功 {succeeded}/{args.requests}  送信 {endpoint.calls}  "
+        f"429 {endpoint.rejected}  "
+        f"まとめた数 {client.coalesced}  {elapsed * 1000:6.0f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--distinct", type=int, default=40, help="本文の種類（残りは同じ本文の重複）")
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run("制限・リトライ無し", False, args))
+    asyncio.run(run("制限・リトライ有り", True, args))
+
+
+if __name__ == "__main__":
+    main()
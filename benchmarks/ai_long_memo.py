@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+長文メモの map-reduce 要約ベンチマーク
+
+入力トークン数に比例して遅くなるフェイクの非同期クライアント (benchmarks/fake_openai.py) で、長いメモを
+1回の呼び出しで要約する場合と、チャンクに分けて並行に要約してからまとめる場合を比較する。
+
+    uv run python benchmarks/ai_long_memo.py [--chars 40000] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# 毎回 LLM を呼んだ場合を測るため AI 結果キャッシュは使わない
+os.environ["AI_CACHE_PATH"] = "none"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_openai import FakeAsyncChatClient
+from src.utils.ai_processor import AsyncAIProcessor
+from src.utils.text_chunker import count_tokens, chunk_text
+
+
+def make_content(chars: int) -> str:
+    line = "2024-05-01 10:00 田中: 来週のリリースに向けて残りのタスクを確認します。Review the open PRs.\n"
+    paragraphs = []
+    while sum(len(p) for p in paragraphs) < chars:
+        paragraphs.append(line * 10)
+    return "\n".join(paragraphs)
+
+
+async def run(label: str, content: str, long_memo_tokens: int, args) -> None:
+    client = FakeAsyncChatClient(
+        latency=args.base_latency_ms / 1000, per_1k_prompt_tokens=args.per_1k_ms / 1000,
+        context_window=args.context_window
+    )
+    processor = AsyncAIProcessor(client=client)
+    processor.long_memo_tokens = long_memo_tokens
+    processor.chunk_tokens = args.chunk_tokens
+    processor.map_concurrency = args.concurrency
+
+    start = time.perf_counter()
+    result = await processor.process_memo(content)
+    elapsed = time.perf_counter() - start
+    print(
+        f"📊 {label:<12} {elapsed * 1000:7.0f} ms  呼び出し {client.calls} 回  "
+        f"入力 {client.prompt_tokens} tok  同時実行 最大 {client.max_in_flight}  "
+        f"要約: {result['summary'][:20]!r}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chars", type=int, default=40000)
+    parser.add_argument("--chunk-tokens", type=int, default=1500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--base-latency-ms", type=float, default=300)
+    parser.add_argument(
+        "--per-1k-ms", type=float, default=200, help="入力 1000 トークンあたりの遅延"
+    )
+    parser.add_argument("--context-window", type=int, default=128000)
+    args = parser.parse_args()
+
+    content = make_content(args.chars)
+    chunks = chunk_text(content, args.chunk_tokens)
+    print(f"メモ: {len(content)} 文字 / {count_tokens(content)} トークン → {len(chunks)} チャンク")
+    asyncio.run(run("1回で要約", content, sys.maxsize, args))
+    asyncio.run(run("map-reduce", content, 0, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+AI プレビューのストリーミング版ベンチマーク
+
+フェイクの非同期 OpenAI クライアント (benchmarks/fake_openai.py、最初のトークンまでの遅延 + トークンごとの遅延) で、
+通常の process_memo（全体が返るまで何も表示できない）と stream_memo の
+最初のトークンまでの時間 (TTFT) / 全体の時間を比較する。
+
+    uv run python benchmarks/ai_preview_stream.py [--first-token-ms 500]
+        [--per-token-ms 30] [--tokens 40]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 毎回 LLM を呼んだ場合を測るため AI 結果キャッシュは使わない
+os.environ["AI_CACHE_PATH"] = "none"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_openai import FakeAsyncChatClient
+from src.backend.mock_openai_server import canned_reply, prompt_text
+from src.utils.ai_processor import AsyncAIProcessor
+
+SUMMARY_WORDS = ["project", "status", "shared", "next", "review", "and", "deploy"]
+
+
+def summary_reply(tokens: int):
+    """要約のプロンプトには tokens 個の単語の要約を返す（タグなどはモックサーバーと同じ応答）"""
+    summary = "- " + " ".join(
+        SUMMARY_WORDS[i % len(SUMMARY_WORDS)] for i in range(tokens - 1)
+    )
+
+    def reply(messages, json_mode: bool) -> str:
+        if json_mode:
+            return json.dumps(
+                {"summary": summary, "tags": ["会議", "進捗"]}, ensure_ascii=False
+            )
+        if "summarize" in prompt_text(messages).lower():
+            return summary
+        return canned_reply(messages, json_mode)
+
+    return reply
+
+
+async def run(args) -> None:
+    client = FakeAsyncChatClient(
+        latency=args.first_token_ms / 1000,
+        per_token=args.per_token_ms / 1000,
+        reply=summary_reply(args.tokens),
+    )
+    processor = AsyncAIProcessor(client=client)
+
+    blocking = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        await processor.process_memo("会議メモ")
+        blocking.append((time.perf_counter() - start) * 1000)
+
+    ttfts, totals = [], []
+    for _ in range(args.runs):
+        async for event, data in processor.stream_memo("会議メモ"):
+            if event == "done":
+                ttfts.append(data["ttft_ms"])
+                totals.append(data["total_ms"])
+
+    wait_ms = statistics.median(blocking)
+    ttft_ms = statistics.median(ttfts)
+    total_ms = statistics.median(totals)
+    print(f"📊 /ai/preview         最初の表示 {wait_ms:6.0f} ms  全体 {wait_ms:6.0f} ms")
+    print(f"📊 /ai/preview/stream  最初の表示 {ttft_ms:6.0f} ms  全体 {total_ms:6.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--first-token-ms", type=float, default=500)
+    parser.add_argument("--per-token-ms", type=float, default=30)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+AI を使う API エンドポイントの負荷試験（OpenAI 互換のモックサーバーに向けて実行）
+
+POST /memos・PUT /memos/{id}・POST /ai/preview に同時に多数のリクエストを送り、
+エンドポイントごとのスループットとレイテンシ (p50 / p95 / p99) を表示する。
+API の料金をかけずに試すには、モックサーバーを起動して API サーバーの接続先にする:
+
+    uv run python -m src.backend.mock_openai_server --port 8100 --latency-ms 400
+        --jitter-ms 150 --distribution lognormal
+    OPENAI_BASE_URL=http://localhost:8100/v1 AI_CACHE_PATH=none
+        uv run python src/backend/api_server.py
+    uv run python benchmarks/api_ai_load.py [--requests 200] [--concurrency 20]
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def make_content(i: int) -> str:
+    # AI 結果キャッシュに当たらないよう本文は毎回変える
+    return (
+        f"定例会議 {i} の議事録。Review the release plan {uuid.uuid4().hex[:8]}。"
+        "次回はデプロイ手順を確認する。"
+    )
+
+
+def run(label: str, args, send) -> None:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+
+    def timed(i: int):
+        start = time.perf_counter()
+        response = send(session, i)
+        return response.status_code, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(timed, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency * 1000 for _, latency in results]
+    errors = sum(1 for status, _ in results if status >= 400)
+    print(
+        f"📊 {label:<16} {len(results) / elapsed:7.1f} req/s  "
+        f"p50 {statistics.median(latencies):6.0f} ms  "
+        f"p95 {percentile(latencies, 0.95):6.0f} ms  "
+        f"p99 {percentile(latencies, 0.99):6.0f} ms  エラー {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    base_url = args.base_url
+
+    memo_ids = []
+
+    def create(session, i):
+        memo = {"title": f"負荷試験 {i}", "content": make_content(i)}
+        response = session.post(f"{base_url}/memos", json=memo)
+        if response.ok:
+            memo_ids.append(response.json()["id"])
+        return response
+
+    def update(session, i):
+        memo_id = memo_ids[i % len(memo_ids)]
+        return session.put(
+            f"{base_url}/memos/{memo_id}", json={"content": make_content(i)}
+        )
+
+    def preview(session, i):
+        return session.post(f"{base_url}/ai/preview", json={"content": make_content(i)})
+
+    run("POST /memos", args, create)
+    if memo_ids:
+        run("PUT /memos/{id}", args, update)
+    run("POST /ai/preview", args, preview)
+
+    for memo_id in memo_ids:
+        requests.delete(f"{base_url}/memos/{memo_id}")
+
+
+if __name__ == "__main__":
+    main()
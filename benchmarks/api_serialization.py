@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+一覧 API のシリアライズ・圧縮ベンチマーク
+
+content 全文を含む100件ページ (GET /memos?limit=100) について、
+従来の経路（jsonable_encoder + 標準 json の JSONResponse）と、
+orjson の FastJSONResponse を直接返す経路（圧縮なし / gzip / br）で、
+1秒あたりのリクエスト数と応答サイズ（転送バイト数）を比較する。
+
+読み取りキャッシュは有効のままにし、DB ではなくシリアライズ・圧縮のコストを測る。
+
+    uv run python benchmarks/api_serialization.py [--content-kb 4] [--rounds 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 一時 DB を使う（src のインポートより前に設定する）
+TMP_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP_DIR}/api_serialization.db"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from src.backend.api_server import app, db_manager
+from src.backend.responses import brotli
+
+PAGE_SIZE = 100
+
+# 比較用: 変更前と同じく dict を返し、jsonable_encoder + JSONResponse でシリアライズする
+baseline_app = FastAPI(default_response_class=JSONResponse)
+
+
+@baseline_app.get("/memos")
+async def list_memos_baseline(limit: int = 100):
+    page = await db_manager.list_memos_page(limit=limit)
+    return page["memos"]
+
+
+def measure(client: TestClient, url: str, accept_encoding: str, rounds: int):
+    headers = {"Accept-Encoding": accept_encoding}
+    client.get(url, headers=headers)
+    size = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        response = client.get(url, headers=headers)
+        size = response.num_bytes_downloaded
+    elapsed = time.perf_counter() - start
+    return rounds / elapsed, size, response.headers.get("content-encoding", "-")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--content-kb", type=int, default=4,
+                        help="1メモあたりの content サイズ (KB)")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    content = "会議の議事録です。Review the release plan and deploy steps. " * 500
+    content = content[: args.content_kb * 1024 // 2]
+    url = f"/memos?limit={PAGE_SIZE}"
+    with TestClient(app) as client, TestClient(baseline_app) as baseline:
+        for i in range(PAGE_SIZE):
+            tags = ["bench", f"tag{i % 10}"]
+            client.portal.call(db_manager.create_memo, f"メモ {i}", content, tags, "要約")
+
+        cases = [
+            ("変更前 (jsonable_encoder + json)", baseline, "identity"),
+            ("orjson 直接", client, "identity"),
+            ("orjson 直接 + gzip", client, "gzip"),
+        ]
+        if brotli is not None:
+            cases.append(("orjson 直接 + br", client, "br, gzip"))
+
+        print(f"📊 {PAGE_SIZE}件ページ, content 約 {args.content_kb}KB/件, {args.rounds} 回計測")
+        for name, target, accept_encoding in cases:
+            rps, size, encoding = measure(target, url, accept_encoding, args.rounds)
+            print(
+                f"  {name:<34} {rps:8.1f} req/s  {size / 1024:9.1f} KB/応答  ({encoding})"
+            )
+        if brotli is None:
+            print("  (brotli が未インストールのため br は省略: uv sync --extra compression)")
+
+
+if __name__ == "__main__":
+    main()
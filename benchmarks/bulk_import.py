@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+一括インポート (create_memos_bulk) ベンチマーク
+
+AI 処理なしで SQLite に書き込める件数/秒を、1件ずつの create_memo と比較する。
+
+    uv run python benchmarks/bulk_import.py [--count 20000] [--batch-size 1000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 一時 DB を使う（src のインポートより前に設定する）
+TMP_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP_DIR}/bulk_import.db"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.database_manager import DatabaseManager
+
+SINGLE_INSERT_COUNT = 500
+
+
+def make_memos(count: int, prefix: str):
+    return [
+        {
+            "title": f"{prefix} 会議メモ {i}",
+            "content": f"プロジェクトの進捗について話し合いました ({i})。Next steps: review and deploy.",
+            "tags": ["インポート", f"tag{i % 100}"],
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+
+    memos = make_memos(SINGLE_INSERT_COUNT, "single")
+    start = time.perf_counter()
+    for memo in memos:
+        db_manager.create_memo(
+            title=memo["title"], content=memo["content"], tags=memo["tags"]
+        )
+    single_rate = SINGLE_INSERT_COUNT / (time.perf_counter() - start)
+
+    memos = make_memos(args.count, "bulk")
+    start = time.perf_counter()
+    db_manager.create_memos_bulk(memos, batch_size=args.batch_size)
+    bulk_rate = args.count / (time.perf_counter() - start)
+
+    print(f"📊 create_memo (1件ずつ, {SINGLE_INSERT_COUNT}件): {single_rate:9.0f} 件/秒")
+    print(
+        f"📊 create_memos_bulk ({args.count}件, バッチ {args.batch_size}): "
+        f"{bulk_rate:9.0f} 件/秒"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+ベンチマーク用のフェイク OpenAI クライアント（chat.completions.create だけを持つ）
+
+応答はモックサーバー (src/backend/mock_openai_server.py) と同じ canned_reply で作り、
+ストリーミングも同じ単位で送る。サーバーを起動せずにプロセス内で呼び出せる。
+
+1回の呼び出しの遅延 = latency + 入力 1000 トークンあたり per_1k_prompt_tokens
+                      + 2つ目以降の出力トークンごとに per_token（ストリーミングは最初の1つまでが
+                      latency + 入力分で、以降はトークンごとに届く）
+"""
+
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from src.backend.mock_openai_server import STREAM_TOKEN_RE, canned_reply, prompt_text
+from src.utils.text_chunker import count_tokens
+
+
+class FakeChatClient:
+    """OpenAI クライアントの代用品（同期版）
+
+    呼び出し回数・入出力トークン数・同時実行数の最大を数える。
+    reply で応答を差し替えられ（引数は messages と JSON モードか）、
+    malformed_rate の割合で JSON 応答を途中で切る。context_window を超える入力は例外にする。
+    """
+
+    def __init__(self, latency: float = 0.0, per_token: float = 0.0,
+                 per_1k_prompt_tokens: float = 0.0,
+                 context_window: Optional[int] = None, malformed_rate: float = 0.0,
+                 reply: Callable[[List[Dict[str, Any]], bool], str] = canned_reply,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.per_token = per_token
+        self.per_1k_prompt_tokens = per_1k_prompt_tokens
+        self.context_window = context_window
+        self.malformed_rate = malformed_rate
+        self.reply = reply
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _prepare(self, model: str, messages: List[Dict[str, Any]],
+                 response_format) -> Dict[str, Any]:
+        """応答の内容と遅延を決め、呼び出しを数える"""
+        prompt = prompt_text(messages)
+        prompt_tokens = count_tokens(prompt, model)
+        if self.context_window and prompt_tokens > self.context_window:
+            raise ValueError(
+                f"context length exceeded: {prompt_tokens} > {self.context_window}"
+            )
+        json_mode = (response_format or {}).get("type") == "json_object"
+        content = self.reply(messages, json_mode)
+        if json_mode and self.rng.random() < self.malformed_rate:
+            content = content[:len(content) // 2]
+        completion_tokens = count_tokens(content, model)
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        return {
+            "content": content,
+            "chunks": STREAM_TOKEN_RE.findall(content),
+            "first_token": (
+                self.latency + self.per_1k_prompt_tokens * prompt_tokens / 1000
+            ),
+            "usage": SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens
+            )
+        }
+
+    def _total_delay(self, reply: Dict[str, Any]) -> float:
+        """全トークンを生成し終えるまでの時間（通常の呼び出し）"""
+        return reply["first_token"] + self.per_token * max(len(reply["chunks"]) - 1, 0)
+
+    def _begin(self) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _end(self) -> None:
+        self.in_flight -= 1
+
+    @staticmethod
+    def _response(reply: Dict[str, Any]):
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(message=SimpleNamespace(content=reply["content"]))
+            ],
+            usage=reply["usage"]
+        )
+
+    def _create(self, model, messages, max_tokens=None, temperature=None,
+                response_format=None):
+        reply = self._prepare(model, messages, response_format)
+        self._begin()
+        try:
+            time.sleep(self._total_delay(reply))
+        finally:
+            self._end()
+        return self._response(reply)
+
+    def close(self):
+        pass
+
+
+class FakeAsyncChatClient(FakeChatClient):
+    """AsyncOpenAI の代用品（stream=True にも対応）"""
+
+    async def _create(self, model, messages, max_tokens=None, temperature=None,
+                      response_format=None, stream=False):
+        reply = self._prepare(model, messages, response_format)
+        if stream:
+            return self._stream(reply)
+        self._begin()
+        try:
+            await asyncio.sleep(self._total_delay(reply))
+        finally:
+            self._end()
+        return self._response(reply)
+
+    async def _stream(self, reply: Dict[str, Any]):
+        self._begin()
+        try:
+            await asyncio.sleep(reply["first_token"])
+            for index, chunk in enumerate(reply["chunks"]):
+                if index:
+                    await asyncio.sleep(self.per_token)
+                delta = SimpleNamespace(content=chunk)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+        finally:
+            self._end()
+
+    async def close(self):
+        pass
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+一覧 API のプロジェクション (fields / preview) ベンチマーク
+
+content 全文を含む従来のレスポンスと、サイドバー・検索結果で使う
+項目だけに絞ったレスポンスで、100件ページのサイズとレイテンシを比較する。
+
+    uv run python benchmarks/list_projection.py [--content-kb 20] [--rounds 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 一時 DB を使う（src のインポートより前に設定する）
+TMP_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP_DIR}/list_projection.db"
+# キャッシュを無効にして毎回 DB から読み込む
+os.environ["CACHE_BACKEND"] = "none"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+from src.backend.api_server import app, db_manager
+
+PAGE_SIZE = 100
+CASES = {
+    "全項目": "/memos?limit=100",
+    "サイドバー (id,title)": "/memos?limit=100&fields=id,title",
+    "カード (id,title,tags,preview=100)": (
+        "/memos?limit=100&fields=id,title,tags&preview=100"
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--content-kb", type=int, default=20,
+                        help="1メモあたりの content サイズ (KB)")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    content = ("会議の議事録です。" * 5000)[: args.content_kb * 1024 // 3]
+    with TestClient(app) as client:
+        for i in range(PAGE_SIZE):
+            tags = ["bench", f"tag{i % 10}"]
+            client.portal.call(db_manager.create_memo, f"メモ {i}", content, tags, "要約")
+
+        print(f"📊 {PAGE_SIZE}件ページ, content 約 {args.content_kb}KB/件, {args.rounds} 回計測")
+        for name, url in CASES.items():
+            timings = []
+            size = 0
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+                size = len(response.content)
+            p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+            print(
+                f"  {name:<36} {size / 1024:9.1f} KB  "
+                f"中央値 {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
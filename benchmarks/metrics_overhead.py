@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+メトリクス記録のオーバーヘッドのベンチマーク
+
+1. 記録処理そのもののコスト（Counter.inc / Histogram.observe / SQL 文1つ分のイベント処理）
+2. API 全体でのコスト: 読み取りキャッシュに当たる GET /memos/{id}（最も軽いエンドポイント）と
+   SQL を発行する GET /memos?limit=20 を、記録あり / なし (registry.enabled) で交互に計測し、
+   1秒あたりのリクエスト数と1リクエストあたりの増加時間を比較する。
+
+    uv run python benchmarks/metrics_overhead.py [--rounds 500] [--repeat 10]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 一時 DB を使う（src のインポートより前に設定する）
+TMP_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP_DIR}/metrics_overhead.db"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+from src.backend.api_server import app, db_manager
+from src.utils.metrics import (
+    Counter, Histogram, RequestSQL, _after_cursor_execute, current_request_sql, registry
+)
+
+
+def per_call_ns(fn, n: int = 200_000) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def micro():
+    counter = Counter("bench_total", "bench", ["method", "route", "status"])
+    histogram = Histogram("bench_seconds", "bench", ["method", "route"])
+    context = type("Context", (), {"_metrics_start": time.perf_counter()})()
+    current_request_sql.set(RequestSQL())
+
+    inc_ns = per_call_ns(lambda: counter.inc("GET", "/memos", "200"))
+    observe_ns = per_call_ns(lambda: histogram.observe(0.0123, "GET", "/memos"))
+    sql_ns = per_call_ns(
+        lambda: _after_cursor_execute(None, None, "SELECT 1", None, context, False)
+    )
+    current_request_sql.set(None)
+
+    print("📊 記録1回あたりのコスト")
+    print(f"  Counter.inc                 {inc_ns:8.0f} ns")
+    print(f"  Histogram.observe           {observe_ns:8.0f} ns")
+    print(f"  SQL 文1つ分のイベント処理   {sql_ns:8.0f} ns")
+    # MetricsMiddleware は1リクエストで inc 1回・observe 3回を記録する
+    for statements in (0, 3, 10):
+        total_us = (inc_ns + observe_ns * 3 + sql_ns * statements) / 1000
+        print(f"  → 1リクエスト (SQL {statements:2d} 文) あたり 約 {total_us:5.1f} µs")
+
+
+def measure(client: TestClient, url: str, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        client.get(url)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="記録あり / なしを交互に計測する回数（中央値を使う）")
+    args = parser.parse_args()
+
+    micro()
+
+    with TestClient(app) as client:
+        memo_ids = [
+            client.portal.call(
+                db_manager.create_memo, f"メモ {i}", "本文 " * 50,
+                ["bench", f"tag{i % 5}"], "要約",
+            )["id"]
+            for i in range(50)
+        ]
+        cases = [
+            ("GET /memos/{id} (キャッシュ)", f"/memos/{memo_ids[0]}"),
+            ("GET /memos?limit=20 (SQL あり)", "/memos?limit=20&offset=10"),
+        ]
+        print(f"\n📊 API 全体 ({args.rounds} 回 × {args.repeat} セットの中央値)")
+        for name, url in cases:
+            if "offset" in url:
+                # 一覧のキャッシュに当たらないよう毎回 DB から読む
+                db_manager.cache.backend = None
+            measure(client, url, args.rounds // 10)
+            timings = {True: [], False: []}
+            for i in range(args.repeat):
+                # 計測順による偏りを避けるため、記録あり / なしの順番を毎回入れ替える
+                for enabled in ((True, False) if i % 2 == 0 else (False, True)):
+                    registry.enabled = enabled
+                    timings[enabled].append(measure(client, url, args.rounds))
+            registry.enabled = True
+            on = statistics.median(timings[True])
+            off = statistics.median(timings[False])
+            print(
+                f"  {name:<30} 記録なし {1 / off:8.1f} req/s  記録あり {1 / on:8.1f} req/s  "
+                f"差 {(on - off) * 1e6:+6.1f} µs/req ({(on - off) / off * 100:+.1f}%)"
+            )
+
+
+if __name__ == "__main__":
+    main()
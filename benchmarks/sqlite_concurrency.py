@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SQLite 同時読み書きベンチマーク
+
+書き込みスレッドが更新を続けている間に、複数の読み込みスレッドが
+get_memo / list_memos をどれだけ処理できるかを計測する。
+ジャーナルモードごとに別プロセスで実行し、結果を比較する。
+
+    uv run python benchmarks/sqlite_concurrency.py [--readers 8] [--seconds 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+JOURNAL_MODES = ["DELETE", "WAL"]
+SEED_MEMOS = 500
+
+
+def run_worker(readers: int, seconds: float):
+    """1つのジャーナルモードで計測し、結果を JSON で標準出力に書く"""
+    sys.path.insert(0, str(PROJECT_ROOT))
+    from src.utils.database_manager import DatabaseManager
+
+    db_manager = DatabaseManager()
+    memo_ids = [
+        db_manager.create_memo(
+            title=f"メモ {i}", content="内容 " * 50, tags=["bench"]
+        )["id"]
+        for i in range(SEED_MEMOS)
+    ]
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            try:
+                memo_id = memo_ids[i % len(memo_ids)]
+                db_manager.update_memo(memo_id, content=f"更新 {i} " * 50)
+                with lock:
+                    counts["writes"] += 1
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+            i += 1
+
+    def reader(n: int):
+        i = n
+        while not stop.is_set():
+            try:
+                if i % 2:
+                    db_manager.get_memo(memo_ids[i % len(memo_ids)])
+                else:
+                    db_manager.list_memos(limit=20)
+                with lock:
+                    counts["reads"] += 1
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+            i += 1
+
+    threads = [threading.Thread(target=writer)] + [
+        threading.Thread(target=reader, args=(n,)) for n in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps({
+        "reads_per_sec": counts["reads"] / seconds,
+        "writes_per_sec": counts["writes"] / seconds,
+        "errors": counts["errors"],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.readers, args.seconds)
+        return
+
+    print(f"📊 読み込み {args.readers} スレッド + 書き込み 1 スレッド, {args.seconds} 秒")
+    for mode in JOURNAL_MODES:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{tmp_dir}/bench.db",
+                SQLITE_JOURNAL_MODE=mode,
+                CACHE_BACKEND="none",
+            )
+            output = subprocess.run(
+                [
+                    sys.executable, __file__, "--worker",
+                    "--readers", str(args.readers), "--seconds", str(args.seconds),
+                ],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"  {mode:<7} 読み込み {result['reads_per_sec']:8.1f} 件/秒  "
+            f"書き込み {result['writes_per_sec']:7.1f} 件/秒  エラー {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
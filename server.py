@@ -6,6 +6,7 @@ from fastmcp import FastMCP
 from src.models.memo import Memo, MemoCreate, MemoUpdate
 from src.utils.ai_processor import AIProcessor
 from src.utils.database_manager import DatabaseManager
+from src.utils.change_detector import EnrichmentGate
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -17,7 +18,10 @@ load_dotenv(dotenv_path=ENV_PATH, override=False)
 db_manager = DatabaseManager()
 
 # AIプロセッサーの初期化
-ai_processor = AIProcessor()
+ai_processor = AIProcessor(keyword_extractor=db_manager.keyword_extractor)
+
+# 更新時に AI で再処理するかの判定（小さな修正では既存の要約・タグを残す）
+enrichment_gate = EnrichmentGate()
 
 mcp = FastMCP("AI Memo App")
 
@@ -97,6 +101,24 @@ def get_memo(memo_id: str) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"メモの取得に失敗しました: {str(e)}"}
 
+@mcp.tool()
+def get_memos(memo_ids: List[str]) -> Dict[str, Any]:
+    """複数のメモを ID の順にまとめて取得する（見つからない ID は not_found に入る）"""
+    
+    try:
+        memos = db_manager.get_memos(memo_ids)
+        return {
+            "memos": [
+                memo if memo is not None else {"id": memo_id, "not_found": True}
+                for memo_id, memo in zip(memo_ids, memos)
+            ],
+            "not_found": [
+                memo_id for memo_id, memo in zip(memo_ids, memos) if memo is None
+            ]
+        }
+    except Exception as e:
+        return {"error": f"メモの取得に失敗しました: {str(e)}"}
+
 # 以下の READ 系ユーティリティは FastAPI 側が直接 DB を参照するよう
 # 移行したため、FastMCP への登録 (@mcp.tool) を外しました。
 # 将来的にバッチ処理や CLI から再利用する可能性があるため、
@@ -143,26 +165,29 @@ def update_memo(memo_id: str, title: str = None, content: str = None, tags: List
     """メモを更新する"""
     
     try:
-        # 内容が変更された場合、AIで再処理
+        # 内容が大きく変更された場合だけ AI で再処理（小さな修正では既存の要約・タグを残す）
         ai_result = {"summary": None, "tags": []}
+        all_tags = tags
         if content and ai_processor:
-            try:
-                ai_result = ai_processor.process_memo(content)
-                if tags is None:
-                    tags = []
-                all_tags = list(set(tags + ai_result["tags"]))
-            except Exception as e:
-                all_tags = tags if tags else []
-        else:
-            all_tags = tags
+            current = db_manager.get_memo(memo_id)
+            if not current:
+                return {"error": "メモが見つかりません"}
+            
+            if enrichment_gate.should_reprocess(current["content"], content):
+                try:
+                    ai_result = ai_processor.process_memo(content)
+                    all_tags = list(set((tags or []) + ai_result["tags"]))
+                except Exception as e:
+                    ai_result = {"summary": None, "tags": []}
+                    all_tags = tags if tags else []
         
-        # データベースを更新
+        # データベースを更新（summary が None の場合は既存の要約を残す）
         memo = db_manager.update_memo(
             memo_id=memo_id,
             title=title,
             content=content,
             tags=all_tags,
-            summary=ai_result["summary"] if content else None
+            summary=ai_result["summary"]
         )
         
         if not memo:
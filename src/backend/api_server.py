@@ -1,6 +1,7 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Dict, Any, Optional
 import subprocess
 import json
@@ -9,12 +10,64 @@ import os
 from datetime import datetime
 import uuid
 from contextlib import asynccontextmanager
-from src.utils.database_manager import DatabaseManager
+from src.utils.async_database_manager import AsyncDatabaseManager
+from src.utils.database_manager import BATCH_GET_MAX_IDS
+from src.models.database import async_engine
+from src.utils.ai_cache import get_ai_cache
+from src.utils.ai_processor import AsyncAIProcessor
+from src.utils.enrichment_queue import EnrichmentWorkerPool
+from src.utils.change_detector import EnrichmentGate
+from src.utils.event_feed import EventNotifier
+from src.backend.responses import FastJSONResponse, CompressionMiddleware
+from src.backend.metrics import MetricsMiddleware
+from src.utils.metrics import registry, stats_families
 import select
 import time
+import asyncio
 
-# データベースマネージャーの初期化
-db_manager = DatabaseManager()
+# データベースマネージャーの初期化（非同期版: DB 待ちでイベントループを塞がない）
+db_manager = AsyncDatabaseManager()
+
+# AI プロセッサー（起動時に1つ作成し、OpenAI クライアントのコネクションプールを共有）
+ai_processor: Optional[AsyncAIProcessor] = None
+
+
+def get_ai_processor() -> AsyncAIProcessor:
+    """共有の AsyncAIProcessor を返す（未作成なら作成、API キーが無い場合は ValueError）"""
+    global ai_processor
+    if ai_processor is None:
+        ai_processor = AsyncAIProcessor(keyword_extractor=db_manager.keyword_extractor)
+    return ai_processor
+
+
+# 更新時に AI で再処理するかの判定（小さな修正では既存の要約・タグを残す）
+enrichment_gate = EnrichmentGate()
+
+
+# AI 要約・タグ付けのワーカー（AI が使える場合のみ起動時に開始）
+enrichment_workers: Optional[EnrichmentWorkerPool] = None
+
+
+def enrichment_available() -> bool:
+    """AI 処理のワーカーが動いているか（動いていなければ pending のジョブを作らない）"""
+    return enrichment_workers is not None
+
+def notify_enrichment_workers():
+    """ジョブを登録したことをワーカーに知らせる（未起動ならキューに残り、次回起動時に処理される）"""
+    if enrichment_workers is not None:
+        enrichment_workers.notify()
+
+
+# /events の設定
+# 別プロセス（MCP サーバーなど）の書き込みに気付くための DB の確認間隔（秒）
+EVENTS_POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", "1"))
+# 接続を保つためのコメントを送る間隔（秒、プロキシのアイドルタイムアウト対策）
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# 切断時にブラウザ (EventSource) が再接続するまでの時間 (ms)
+EVENTS_RETRY_MS = 3000
+
+# 同じプロセスでの書き込みを /events の各接続にすぐ伝える（起動時に作成）
+event_notifier: Optional[EventNotifier] = None
 
 # MCPサーバーとの通信クラス
 class MCPServer:
@@ -82,6 +135,9 @@ class MemoCreate(BaseModel):
     content: str
     tags: Optional[List[str]] = None
 
+class MemoBulkItem(MemoCreate):
+    summary: Optional[str] = None
+
 class MemoUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
@@ -90,6 +146,11 @@ class MemoUpdate(BaseModel):
 class SearchQuery(BaseModel):
     query: str
     limit: Optional[int] = 50
+    fields: Optional[List[str]] = None
+    preview: Optional[int] = None
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=BATCH_GET_MAX_IDS)
 
 # AIプレビュー用リクエストモデル
 class PreviewRequest(BaseModel):
@@ -113,9 +174,26 @@ async def lifespan(app: FastAPI):
     # else:
     #     print("MCPサーバーの起動に失敗しました")
     
+    global enrichment_workers, event_notifier
+    event_notifier = EventNotifier(asyncio.get_running_loop())
+    db_manager.event_feed.add_listener(event_notifier.notify)
+    
+    try:
+        enrichment_workers = EnrichmentWorkerPool(db_manager, get_ai_processor())
+        enrichment_workers.start()
+    except ValueError as e:
+        print(f"⚠️  AI 処理は利用できません: {e}")
+    
     yield
     
-    # 終了時
+    db_manager.event_feed.remove_listener(event_notifier.notify)
+    
+    # 終了時（処理中の AI ジョブは実行待ちに戻し、次回起動時に再開する）
+    if enrichment_workers is not None:
+        await enrichment_workers.stop()
+    if ai_processor is not None:
+        await ai_processor.close()
+    await async_engine.dispose()
     if mcp_server.server_process:
         mcp_server.server_process.terminate()
         print("MCPサーバーを停止しました")
@@ -125,9 +203,14 @@ app = FastAPI(
     title="AI Memo App API",
     description="AIを活用したメモ帳アプリケーションのAPI",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # 応答は orjson でシリアライズする（一覧・取得系は FastJSONResponse を直接返して jsonable_encoder も省く）
+    default_response_class=FastJSONResponse
 )
 
+# 大きな応答は Accept-Encoding に応じて brotli / gzip で圧縮
+app.add_middleware(CompressionMiddleware)
+
 # CORS設定
 app.add_middleware(
     CORSMiddleware,
@@ -135,8 +218,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# ルートごとのレイテンシ・ステータス・SQL 文の数と時間を記録（/metrics で出力）
+app.add_middleware(MetricsMiddleware)
+
+def collect_cache_metrics():
+    """既存の統計（読み取りキャッシュ・AI 結果キャッシュ・ゲートウェイ・更新時の判定）を /metrics 用に変換"""
+    ai_cache = ai_processor.cache if ai_processor is not None else get_ai_cache()
+    gateway = ai_processor.client.stats() if ai_processor is not None else None
+    return [
+        *stats_families("memo_cache", "メモの読み取りキャッシュ", db_manager.cache_stats()),
+        *stats_families(
+            "ai_cache", "AI 結果キャッシュ",
+            ai_cache.stats() if ai_cache is not None else None,
+        ),
+        *stats_families(
+            "ai_gateway", "AI ゲートウェイ", gateway,
+            counters=("coalesced", "retries", "rate_limited", "throttled_seconds"),
+            gauges=("in_flight",)
+        ),
+        *stats_families(
+            "ai_update_gate", "更新時の AI 再処理の判定", enrichment_gate.stats(),
+            counters=("rerun", "skipped"), gauges=("skip_ratio",)
+        ),
+    ]
+
+registry.add_collector(collect_cache_metrics)
+
 @app.get("/")
 async def root():
     """ルートエンドポイント"""
@@ -151,21 +261,74 @@ async def health_check():
     """ヘルスチェック"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """クエリパラメータ fields=id,title,... をリストに変換"""
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()]
+
+async def current_etag() -> str:
+    """データのバージョンから作る ETag（メモ・タグへの書き込みのたびに変わる）"""
+    return f'W/"{await db_manager.get_data_version()}"'
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """If-None-Match が現在の ETag と一致すれば 304 を返す（行の読み込み・シリアライズをしない）"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    # 弱い比較（W/ の有無は区別しない）
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in candidates or etag.removeprefix("W/") in candidates:
+        return Response(status_code=304, headers=etag_headers(etag))
+    return None
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """ETag のヘッダー（no-cache: キャッシュした応答は毎回 If-None-Match で確認してから使う）"""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
 @app.get("/memos")
-async def list_memos(limit: int = 100, offset: int = 0):
-    """すべてのメモを取得（DB 直アクセス）"""
+async def list_memos(request: Request, limit: int = 100, offset: int = 0,
+                     cursor: Optional[str] = None, fields: Optional[str] = None,
+                     preview: Optional[int] = None):
+    """すべてのメモを取得（DB 直アクセス）
+    
+    次ページのカーソルは X-Next-Cursor ヘッダーで返す。
+    cursor を指定すると (updated_at, id) のキーセットページングで続きを取得する。
+    fields=id,title,updated_at,tags のように返す項目を絞り、preview=100 で
+    content の代わりに先頭100文字を返せる（一覧表示用）。
+    ETag を返し、If-None-Match が一致すれば 304 を返す。
+    """
     try:
-        memos = db_manager.list_memos(limit=limit, offset=offset)
-        return memos
+        # バージョンは読み込みより先に取得する（間に書き込みがあっても古い ETag で新しい内容を返すだけ）
+        etag = await current_etag()
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        page = await db_manager.list_memos_page(
+            limit=limit, offset=offset, cursor=cursor,
+            fields=parse_fields(fields), preview=preview,
+        )
+        headers = etag_headers(etag)
+        if page["next_cursor"]:
+            headers["X-Next-Cursor"] = page["next_cursor"]
+        return FastJSONResponse(page["memos"], headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/tags")
-async def get_all_tags():
-    """すべてのタグを取得（DB 直アクセス）"""
+async def get_all_tags(request: Request):
+    """すべてのタグを取得（DB 直アクセス、ETag / If-None-Match に対応）"""
     try:
-        return db_manager.get_all_tags()
+        etag = await current_etag()
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        return FastJSONResponse(
+            await db_manager.get_all_tags(), headers=etag_headers(etag)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -174,77 +337,196 @@ async def get_all_tags():
 async def get_stats():
     """統計情報を取得（DB 直アクセス）"""
     try:
-        count = db_manager.get_memo_count()
+        count = await db_manager.get_memo_count()
         return {"count": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """読み取りキャッシュと AI 結果キャッシュのヒット/ミス/追い出し数"""
+    ai_cache = get_ai_cache()
+    return {**db_manager.cache_stats(), "ai": ai_cache.stats() if ai_cache else None}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """メトリクス（Prometheus のテキスト形式）"""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@app.get("/ai/stats")
+async def get_ai_stats():
+    """更新時の AI 再処理 / スキップの回数と、LLM 呼び出しのゲートウェイの統計"""
+    return {
+        "update_gate": enrichment_gate.stats(),
+        "gateway": ai_processor.client.stats() if ai_processor else None
+    }
+
+
 @app.post("/memos")
 async def create_memo(memo: MemoCreate):
-    """メモ作成（AI 処理込み）"""
+    """メモ作成（AI の要約・タグはキューに登録し、保存後にワーカーが付与）
+    
+    レスポンスの enrichment_status は pending で、
+    GET /memos/{memo_id}/enrichment で進捗を確認できる。
+    AI 処理が利用できない場合は要約・タグなしで保存する（enrichment_status は null）。
+    """
     try:
-        # AI 処理を直接実行
-        from src.utils.ai_processor import AIProcessor
-        ai_processor = AIProcessor()
-        ai_result = ai_processor.process_memo(memo.content)
-        
-        # AI タグとユーザータグを結合
-        all_tags = list(set((memo.tags or []) + ai_result["tags"]))
-        
-        # DB に保存
-        saved = db_manager.create_memo(
+        saved = await db_manager.create_memo(
             title=memo.title,
             content=memo.content,
-            tags=all_tags,
-            summary=ai_result["summary"]
+            tags=memo.tags,
+            enrich=enrichment_available()
         )
+        notify_enrichment_workers()
         return saved
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/memos/bulk")
+async def create_memos_bulk(request: Request, enrich: str = "none"):
+    """メモを一括作成（JSON 配列または NDJSON）
+    
+    enrich=none: AI 処理なしで保存のみ（既定）
+    enrich=deferred: AI 処理のジョブをキューに登録し、保存後にワーカーが要約・タグを付与
+    （AI 処理が利用できない場合は none として保存し、レスポンスの enrich も none になる）
+    """
+    if enrich not in ("none", "deferred"):
+        raise HTTPException(
+            status_code=400, detail="enrich は none または deferred を指定してください"
+        )
+    if not enrichment_available():
+        enrich = "none"
+    
+    try:
+        body = await request.body()
+        content_type = request.headers.get("content-type", "")
+        if "ndjson" in content_type or "jsonl" in content_type:
+            lines = body.decode("utf-8").splitlines()
+            items = [json.loads(line) for line in lines if line.strip()]
+        else:
+            items = json.loads(body)
+        if not isinstance(items, list) or not all(
+            isinstance(item, dict) for item in items
+        ):
+            raise ValueError("メモオブジェクトの配列を送信してください")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"リクエストの解析に失敗しました: {str(e)}")
+    
+    # POST /memos と同じ検証を1件ずつ行う（tags に文字列を渡した場合など）
+    validated = []
+    for index, item in enumerate(items):
+        try:
+            validated.append(MemoBulkItem.model_validate(item).model_dump())
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            raise HTTPException(
+                status_code=400, detail=f"{index + 1}件目: {field}: {error['msg']}"
+            )
+    items = validated
+    
+    try:
+        memo_ids = await db_manager.create_memos_bulk(
+        items, enrich=enrich == "deferred"
+    )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if enrich == "deferred" and memo_ids:
+        notify_enrichment_workers()
+    
+    return {"created": len(memo_ids), "ids": memo_ids, "enrich": enrich}
+
 @app.get("/memos/{memo_id}")
-async def get_memo(memo_id: str):
-    """指定されたメモを取得（DB 直アクセス）"""
+async def get_memo(memo_id: str, request: Request):
+    """指定されたメモを取得（DB 直アクセス、ETag / If-None-Match に対応）"""
     try:
-        memo = db_manager.get_memo(memo_id)
+        etag = await current_etag()
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        memo = await db_manager.get_memo(memo_id)
         if not memo:
             raise HTTPException(status_code=404, detail="メモが見つかりません")
-        return memo
+        return FastJSONResponse(memo, headers=etag_headers(etag))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/memos/batch-get")
+async def batch_get_memos(batch: BatchGetRequest):
+    """複数のメモを1回で取得（DB 直アクセス、1回の IN 検索 + タグの一括読み込み）
+    
+    memos は ids と同じ順で、見つからないメモは {"id": ..., "not_found": true} になる。
+    見つからなかった ID は not_found にもまとめて返す。
+    """
+    try:
+        memos = await db_manager.get_memos(batch.ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return FastJSONResponse({
+        "memos": [
+            memo if memo is not None else {"id": memo_id, "not_found": True}
+            for memo_id, memo in zip(batch.ids, memos)
+        ],
+        "not_found": [
+            memo_id for memo_id, memo in zip(batch.ids, memos) if memo is None
+        ]
+    })
+
+@app.get("/memos/{memo_id}/enrichment")
+async def get_enrichment_status(memo_id: str):
+    """メモの AI 要約・タグ付けの状態（pending / done / failed と試行回数・直近のエラー）"""
+    try:
+        status = await db_manager.get_enrichment_status(memo_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if status is None:
+        raise HTTPException(status_code=404, detail="メモが見つかりません")
+    return status
 
 @app.put("/memos/{memo_id}")
 async def update_memo(memo_id: str, memo: MemoUpdate):
     """メモを更新（DB 直アクセス）"""
     try:
-        # 内容が変更された場合、AIで再処理
+        # 内容が大きく変更された場合だけ AI で再処理（小さな修正では既存の要約・タグを残す）
         ai_result = {"summary": None, "tags": []}
+        all_tags = memo.tags
         if memo.content:
-            from src.utils.ai_processor import AIProcessor
-            ai_processor = AIProcessor()
-            ai_result = ai_processor.process_memo(memo.content)
+            current = await db_manager.get_memo(memo_id)
+            if not current:
+                raise HTTPException(status_code=404, detail="メモが見つかりません")
             
-            # AI タグとユーザータグを結合
-            if memo.tags is None:
-                memo.tags = []
-            all_tags = list(set(memo.tags + ai_result["tags"]))
-        else:
-            all_tags = memo.tags
+            if enrichment_gate.should_reprocess(current["content"], memo.content):
+                ai_result = await get_ai_processor().process_memo(memo.content)
+                
+                # AI タグとユーザータグを結合
+                all_tags = list(set((memo.tags or []) + ai_result["tags"]))
         
-        # データベースを更新
-        updated_memo = db_manager.update_memo(
+        # データベースを更新（summary が None の場合は既存の要約を残す）
+        updated_memo = await db_manager.update_memo(
             memo_id=memo_id,
             title=memo.title,
             content=memo.content,
             tags=all_tags,
-            summary=ai_result["summary"] if memo.content else None
+            summary=ai_result["summary"]
         )
         
         if not updated_memo:
             raise HTTPException(status_code=404, detail="メモが見つかりません")
         
         return updated_memo
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -252,35 +534,54 @@ async def update_memo(memo_id: str, memo: MemoUpdate):
 async def delete_memo(memo_id: str):
     """メモを削除（DB 直アクセス）"""
     try:
-        success = db_manager.delete_memo(memo_id)
+        success = await db_manager.delete_memo(memo_id)
         if success:
             return {"message": "メモが正常に削除されました"}
         else:
             raise HTTPException(status_code=404, detail="メモが見つかりません")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/memos/search")
 async def search_memos(search_query: SearchQuery):
-    """メモを検索（DB 直アクセス）"""
+    """メモを検索（FTS5 全文検索, DB 直アクセス）"""
     try:
-        return db_manager.search_memos(query=search_query.query, limit=search_query.limit)
+        return FastJSONResponse(await db_manager.search_memos(
+            query=search_query.query, limit=search_query.limit,
+            fields=search_query.fields, preview=search_query.preview
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/memos/search/{query}")
-async def search_memos_get(query: str, limit: int = 50):
-    """メモを検索（GET版, DB 直アクセス）"""
+async def search_memos_get(query: str, limit: int = 50, fields: Optional[str] = None,
+                           preview: Optional[int] = None):
+    """メモを検索（GET版, FTS5 全文検索, DB 直アクセス）"""
     try:
-        return db_manager.search_memos(query=query, limit=limit)
+        return FastJSONResponse(
+            await db_manager.search_memos(
+                query=query, limit=limit, fields=parse_fields(fields), preview=preview
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/memos/tag/{tag_name}")
-async def get_memos_by_tag(tag_name: str, limit: int = 50):
+async def get_memos_by_tag(tag_name: str, limit: int = 50, fields: Optional[str] = None,
+                           preview: Optional[int] = None):
     """タグでメモを検索（DB 直アクセス）"""
     try:
-        return db_manager.get_memos_by_tag(tag_name=tag_name, limit=limit)
+        return FastJSONResponse(await db_manager.get_memos_by_tag(
+            tag_name=tag_name, limit=limit, fields=parse_fields(fields), preview=preview
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -290,18 +591,106 @@ async def get_memos_by_tag(tag_name: str, limit: int = 50):
 async def ai_preview(preview: PreviewRequest):
     """AI による要約・タグ付けプレビュー（直接呼び出し版）"""
     try:
-        # MCP を経由せず、直接 AIProcessor を使用
-        from src.utils.ai_processor import AIProcessor
-        
-        # AIProcessor の初期化
-        ai_processor = AIProcessor()
-        result = ai_processor.process_memo(preview.content)
+        # MCP を経由せず、共有の AsyncAIProcessor を使用
+        result = await get_ai_processor().process_memo(preview.content)
         
         return result
     except Exception as e:
         print(f"AI preview error: {e}")
         raise HTTPException(status_code=500, detail=f"AI 処理エラー: {str(e)}")
 
+@app.post("/ai/preview/stream")
+async def ai_preview_stream(preview: PreviewRequest):
+    """AI プレビューのストリーミング版（Server-Sent Events）
+    
+    要約を token イベントで逐次送り、続けて tags、最後に done
+    （要約全文・タグ・最初のトークンまでの時間 ttft_ms・全体の時間 total_ms）を送る。
+    """
+    try:
+        processor = get_ai_processor()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI 処理エラー: {str(e)}")
+    
+    async def event_stream():
+        async for event, data in processor.stream_memo(preview.content):
+            if event == "done":
+                print(
+                    f"AI preview stream: ttft={data['ttft_ms']} ms "
+                    f"total={data['total_ms']:.0f} ms cached={data['cached']}"
+                )
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # プロキシでバッファリングされると逐次表示にならないため
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def sse_event(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Server-Sent Events の1イベント分"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.get("/events")
+async def memo_events(request: Request, last_event_id: Optional[int] = None):
+    """メモの変更の通知（Server-Sent Events）
+    
+    作成・更新・削除・AI 処理の完了 / 失敗ごとに created / updated / deleted /
+    enriched / enrichment_failed イベント（id, type, memo_id, created_at）を送る。
+    クライアントは memo_id のキャッシュだけを捨てればよい。
+    最初に ready（現在の last_id）を送る。再接続時は Last-Event-ID ヘッダー
+    （またはクエリパラメータ last_event_id）の続きから送り、既に保持期間外なら
+    reset を送る（その場合はキャッシュをすべて捨てて読み直す）。
+    """
+    header = request.headers.get("last-event-id")
+    if header:
+        try:
+            last_event_id = int(header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID が不正です")
+    
+    async def event_stream():
+        after_id = last_event_id
+        if after_id is None:
+            after_id = (await db_manager.get_events(None))["last_id"]
+        yield f"retry: {EVENTS_RETRY_MS}\n\n"
+        yield sse_event("ready", {"last_id": after_id})
+        last_sent = time.monotonic()
+        
+        while True:
+            # 読み込みより前に取得しておき、読み込み中に記録されたイベントも取りこぼさない
+            if event_notifier is not None:
+                wake = event_notifier.current()
+            else:
+                wake = asyncio.Event()
+            page = await db_manager.get_events(after_id)
+            if page["reset"]:
+                after_id = page["last_id"]
+                yield sse_event("reset", {"last_id": after_id}, after_id)
+                last_sent = time.monotonic()
+                continue
+            for event in page["events"]:
+                yield sse_event(event["type"], event, event["id"])
+            if page["events"]:
+                after_id = page["last_id"]
+                last_sent = time.monotonic()
+                continue
+            
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            if time.monotonic() - last_sent >= EVENTS_HEARTBEAT_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,67 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.utils.metrics import (
+    COUNT_BUCKETS, LATENCY_BUCKETS, RequestSQL, current_request_sql, registry
+)
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP リクエスト数", ["method", "route", "status"]
+)
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP リクエストの処理時間（秒、応答の送信完了まで）", ["method", "route"]
+)
+http_request_sql_statements = registry.histogram(
+    "http_request_sql_statements", "1リクエストあたりの SQL 文の数", ["method", "route"],
+    buckets=COUNT_BUCKETS
+)
+http_request_sql_seconds = registry.histogram(
+    "http_request_sql_seconds", "1リクエストあたりの SQL 実行時間の合計（秒）", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+
+# ルートに一致しなかったリクエスト（404 など）のラベル（パスをそのまま使うと種類が増え続けるため）
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """ルートごとのレイテンシ・ステータス・SQL 文の数と時間を記録する ASGI ミドルウェア
+
+    ルートは実際のパスではなくテンプレート（/memos/{memo_id}）で集計する。
+    SQL はこのリクエストの処理中に発行されたものを数える（src.utils.metrics.instrument_engine）。
+    """
+
+    def __init__(self, app: ASGIApp, exclude: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        excluded = scope["type"] != "http" or scope["path"] in self.exclude
+        if excluded or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        request_sql = RequestSQL()
+        token = current_request_sql.set(request_sql)
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request_sql.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests.inc(method, route_path, str(status))
+            http_request_seconds.observe(elapsed, method, route_path)
+            http_request_sql_statements.observe(
+                request_sql.statements, method, route_path
+            )
+            http_request_sql_seconds.observe(request_sql.seconds, method, route_path)
@@ -0,0 +1,271 @@
+"""
+OpenAI 互換のモックサーバー（負荷試験・オフラインでのベンチマーク用）
+
+/v1/chat/completions を通常・ストリーミング (stream=true) の両方で受け付け、
+プロンプトから決まる固定の応答（要約・タグ・JSON）を返す。
+遅延の分布・エラー率・429 の割合は引数または環境変数 MOCK_OPENAI_* で設定する。
+
+    uv run python -m src.backend.mock_openai_server --port 8100 --latency-ms 400
+        --jitter-ms 150
+    OPENAI_BASE_URL=http://localhost:8100/v1 uv run python src/backend/api_server.py
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from src.utils.keyword_extractor import extract_terms
+from src.utils.text_chunker import count_tokens
+
+# プロンプト中のメモ本文（\"\"\" で囲まれた部分）
+NOTE_RE = re.compile(r'"""(.*?)"""', re.S)
+# 応答をストリーミングで送る単位
+STREAM_TOKEN_RE = re.compile(r"\s*\w+|\s*\W")
+SENTENCE_RE = re.compile(r"[^\n。.!?！？]+")
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+def _setting(value, name: str, default: str, cast=float):
+    """引数で指定されていなければ環境変数の値を使う"""
+    return value if value is not None else cast(os.getenv(name, default))
+
+
+class MockSettings:
+    """モックサーバーの設定（既定値は環境変数 MOCK_OPENAI_*）"""
+
+    def __init__(self, latency_ms: float = None, jitter_ms: float = None,
+                 distribution: str = None, per_token_ms: float = None,
+                 error_rate: float = None, rate_limit_rate: float = None,
+                 retry_after_ms: int = None, seed: Optional[int] = None):
+        env = os.getenv
+        # 最初のトークンまでの遅延（distribution に従って latency_ms ± jitter_ms でばらつかせる）
+        self.latency_ms = _setting(latency_ms, "MOCK_OPENAI_LATENCY_MS", "300")
+        self.jitter_ms = _setting(jitter_ms, "MOCK_OPENAI_JITTER_MS", "0")
+        self.distribution = distribution or env("MOCK_OPENAI_DISTRIBUTION", "fixed")
+        # 出力トークンごとの遅延
+        self.per_token_ms = _setting(per_token_ms, "MOCK_OPENAI_PER_TOKEN_MS", "10")
+        # 500 を返す割合 / 429 (Retry-After 付き) を返す割合
+        self.error_rate = _setting(error_rate, "MOCK_OPENAI_ERROR_RATE", "0")
+        self.rate_limit_rate = _setting(
+            rate_limit_rate, "MOCK_OPENAI_RATE_LIMIT_RATE", "0"
+        )
+        self.retry_after_ms = _setting(
+            retry_after_ms, "MOCK_OPENAI_RETRY_AFTER_MS", "500", cast=int
+        )
+        if seed is None and env("MOCK_OPENAI_SEED"):
+            seed = int(env("MOCK_OPENAI_SEED"))
+        self.seed = seed
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """1回分の遅延（秒）"""
+        mean, jitter = self.latency_ms, self.jitter_ms
+        if self.distribution == "uniform":
+            value = rng.uniform(mean - jitter, mean + jitter)
+        elif self.distribution == "normal":
+            value = rng.gauss(mean, jitter)
+        elif self.distribution == "lognormal":
+            # 平均 mean・標準偏差 jitter になる対数正規分布（裾の重い遅延）
+            if mean <= 0:
+                value = 0.0
+            else:
+                sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2))
+                value = rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        else:
+            value = mean
+        return max(0.0, value) / 1000
+
+
+def prompt_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(message.get("content") or "") for message in messages)
+
+
+def canned_reply(messages: List[Dict[str, Any]], json_mode: bool) -> str:
+    """プロンプトから決まる固定の応答（同じ入力には常に同じ応答）"""
+    prompt = prompt_text(messages)
+    notes = NOTE_RE.findall(prompt)
+    note = notes[-1] if notes else prompt
+
+    terms = list(dict.fromkeys(extract_terms(note)))[:3] or ["メモ"]
+    sentences = [s.strip() for s in SENTENCE_RE.findall(note) if s.strip()][:2]
+    sentences = sentences or ["内容なし"]
+    summary = "\n".join(f"- {sentence[:30]}" for sentence in sentences)
+
+    if json_mode:
+        return json.dumps({"summary": summary, "tags": terms}, ensure_ascii=False)
+    if "tags" in prompt.lower() and "summarize" not in prompt.lower():
+        return "\n".join(terms)
+    return summary
+
+
+def usage(prompt: str, completion: str, model: str) -> Dict[str, int]:
+    prompt_tokens = count_tokens(prompt, model)
+    completion_tokens = count_tokens(completion, model)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+def error_response(status_code: int, message: str, error_type: str,
+                   headers: Dict[str, str] = None) -> JSONResponse:
+    """OpenAI と同じ形式のエラー応答"""
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {
+            "message": message, "type": error_type, "param": None, "code": None
+        }},
+        headers=headers
+    )
+
+
+def create_app(settings: MockSettings = None) -> FastAPI:
+    settings = settings or MockSettings()
+    rng = random.Random(settings.seed)
+    stats = {
+        "requests": 0, "streams": 0, "errors": 0, "rate_limited": 0,
+        "in_flight": 0, "max_in_flight": 0,
+    }
+
+    app = FastAPI(title="Mock OpenAI API")
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {
+            "object": "list",
+            "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "mock"}],
+        }
+
+    @app.get("/mock/stats")
+    async def get_stats():
+        """受け付けたリクエスト数・返したエラー数・同時処理数の最大"""
+        return stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        model = body.get("model", "gpt-4o-mini")
+        messages = body.get("messages", [])
+
+        roll = rng.random()
+        if roll < settings.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return error_response(
+                429, "Rate limit reached (mock)", "requests",
+                headers={"retry-after-ms": str(settings.retry_after_ms)}
+            )
+        if roll < settings.rate_limit_rate + settings.error_rate:
+            stats["errors"] += 1
+            return error_response(500, "The server had an error (mock)", "server_error")
+
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        reply = canned_reply(messages, json_mode)
+        tokens = STREAM_TOKEN_RE.findall(reply)
+        latency = settings.sample_latency(rng)
+        per_token = settings.per_token_ms / 1000
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            stats["streams"] += 1
+
+            async def stream():
+                stats["in_flight"] += 1
+                stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+                try:
+                    await asyncio.sleep(latency)
+                    for index, token in enumerate(tokens):
+                        if index:
+                            await asyncio.sleep(per_token)
+                        chunk = {
+                            "id": completion_id,
+                            "object": "chat.completion.chunk",
+                            "created": created,
+                            "model": model,
+                            "choices": [{
+                                "index": 0,
+                                "delta": {"content": token},
+                                "finish_reason": None
+                            }]
+                        }
+                        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    done = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+                    }
+                    yield f"data: {json.dumps(done)}\n\n"
+                    yield "data: [DONE]\n\n"
+                finally:
+                    stats["in_flight"] -= 1
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        # 通常の呼び出しは全トークンを生成し終えるまで待ってから返す
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency + per_token * max(len(tokens) - 1, 0))
+        finally:
+            stats["in_flight"] -= 1
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop"
+            }],
+            "usage": usage(prompt_text(messages), reply, model)
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 互換のモックサーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=None,
+                        help="最初のトークンまでの遅延（平均）")
+    parser.add_argument("--jitter-ms", type=float, default=None,
+                        help="遅延のばらつき（uniform は幅、normal / lognormal は標準偏差）")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default=None)
+    parser.add_argument("--per-token-ms", type=float, default=None,
+                        help="出力トークンごとの遅延")
+    parser.add_argument("--error-rate", type=float, default=None,
+                        help="500 を返す割合 (0〜1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=None,
+                        help="429 を返す割合 (0〜1)")
+    parser.add_argument("--retry-after-ms", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None, help="遅延・エラーの乱数シード（再現用）")
+    args = parser.parse_args()
+
+    settings = MockSettings(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        distribution=args.distribution, per_token_ms=args.per_token_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        retry_after_ms=args.retry_after_ms, seed=args.seed
+    )
+    import uvicorn
+    uvicorn.run(create_app(settings), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import gzip
+import os
+from typing import Any, Dict, List, Optional
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # 未インストールの場合は gzip のみ
+    brotli = None
+
+# このサイズ (bytes) 以上の応答だけを圧縮する（小さい応答は圧縮しても得が無い）
+API_COMPRESSION_MIN_BYTES = int(os.getenv("API_COMPRESSION_MIN_BYTES", "1024"))
+# 圧縮レベル（速度とサイズのバランス）
+API_GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", "5"))
+API_BROTLI_QUALITY = int(os.getenv("API_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "text/plain", "text/html", "text/csv", "application/x-ndjson"
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson でシリアライズする JSONResponse
+
+    エンドポイントからこのクラスのインスタンスを直接返すと FastAPI の
+    jsonable_encoder を通らない（Memo.to_dict の datetime は orjson が ISO 8601 にする）。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding を {エンコーディング: q値} に変換"""
+    encodings = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encodings[name] = q
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """クライアントが受け付ける圧縮方式を選ぶ（br > gzip、どちらも不可なら None）"""
+    encodings = accepted_encodings(accept_encoding)
+    candidates: List[str] = (["br"] if brotli is not None else []) + ["gzip"]
+    for name in candidates:
+        q = encodings.get(name, encodings.get("*", 0.0))
+        if q > 0:
+            return name
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=API_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=API_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Accept-Encoding に応じて応答を brotli / gzip で圧縮する ASGI ミドルウェア
+
+    1回で送られる応答（JSON など）のうち min_size 以上のものだけを圧縮する。
+    圧縮の対象になる応答には、圧縮しなかった場合も Vary: Accept-Encoding を付ける
+    （共有キャッシュが非圧縮の応答を圧縮対応のクライアントに返さないように）。
+    ストリーミング応答（SSE など）は逐次届くことが重要なため、そのまま流す。
+    """
+
+    def __init__(self, app: ASGIApp, min_size: int = API_COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # 本文を見るまで圧縮するか決められないため、開始メッセージは保留する
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.min_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                if start_message["status"] == 304:
+                    # 検証した 200 の応答と同じ Vary を返す
+                    headers.add_vary_header("Accept-Encoding")
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,9 +1,12 @@
 import streamlit as st
 import json
 import requests
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Tuple
 import os
 from dotenv import load_dotenv
 
@@ -79,12 +82,50 @@ if 'current_memo_id' not in st.session_state:
     st.session_state.current_memo_id = None
 if 'selected_tag' not in st.session_state:
     st.session_state.selected_tag = None
+if 'memo_cursors' not in st.session_state:
+    # メモ一覧で表示中のページまでのカーソル（先頭ページは None）
+    st.session_state.memo_cursors = [None]
+if 'recent_memo_ids' not in st.session_state:
+    st.session_state.recent_memo_ids = []
+
+# ETag 付きで保持する GET 応答の数（URL ごとに1件）
+VALIDATOR_CACHE_SIZE = 256
 
 class MemoAPI:
     """FastAPIサーバーとの通信を行うクラス"""
     
     def __init__(self):
         self.base_url = "http://localhost:8000"
+        # URL → ETag 付きの直近の応答（If-None-Match で再検証し、304 なら再利用する）
+        self._validators: "OrderedDict[str, requests.Response]" = OrderedDict()
+        self._validators_lock = threading.Lock()
+        self.not_modified = 0
+    
+    def _get(self, url: str, params: Dict[str, Any] = None,
+             headers: Dict[str, str] = None,
+             timeout: float = 15) -> requests.Response:
+        """条件付き GET（前回の ETag を If-None-Match で送り、304 なら保持している応答を返す）"""
+        url = requests.Request("GET", url, params=params).prepare().url
+        headers = dict(headers or {})
+        with self._validators_lock:
+            cached = self._validators.get(url)
+        if cached is not None:
+            headers["If-None-Match"] = cached.headers["ETag"]
+        
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            self.not_modified += 1
+            return cached
+        
+        with self._validators_lock:
+            if response.status_code == 200 and "ETag" in response.headers:
+                self._validators[url] = response
+                self._validators.move_to_end(url)
+                while len(self._validators) > VALIDATOR_CACHE_SIZE:
+                    self._validators.popitem(last=False)
+            else:
+                self._validators.pop(url, None)
+        return response
     
     def _make_request(self, method: str, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """HTTPリクエストを送信"""
@@ -94,7 +135,7 @@ class MemoAPI:
             timeout = 15  # 秒
             
             if method == "GET":
-                response = requests.get(url, headers=headers, timeout=timeout)
+                response = self._get(url, headers=headers, timeout=timeout)
             elif method == "POST":
                 response = requests.post(url, json=data, headers=headers, timeout=timeout)
             elif method == "PUT":
@@ -131,13 +172,56 @@ class MemoAPI:
         """メモを取得"""
         return self._make_request("GET", f"/memos/{memo_id}")
     
-    def list_memos(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    def get_memos(self, memo_ids: List[str]) -> List[Dict[str, Any]]:
+        """複数のメモを1回のリクエストで取得（ids と同じ順、見つからないメモは not_found: True）"""
+        if not memo_ids:
+            return []
+        result = self._make_request("POST", "/memos/batch-get", {"ids": memo_ids})
+        if "error" in result:
+            return []
+        return result.get("memos", [])
+    
+    @staticmethod
+    def _projection_params(fields: List[str] = None, preview: int = None) -> str:
+        """fields / preview クエリパラメータを組み立てる"""
+        params = ""
+        if fields:
+            params += f"&fields={','.join(fields)}"
+        if preview:
+            params += f"&preview={preview}"
+        return params
+    
+    def list_memos(self, limit: int = 100, offset: int = 0, fields: List[str] = None,
+                   preview: int = None) -> List[Dict[str, Any]]:
         """すべてのメモを取得"""
-        result = self._make_request("GET", f"/memos?limit={limit}&offset={offset}")
+        params = self._projection_params(fields, preview)
+        endpoint = f"/memos?limit={limit}&offset={offset}{params}"
+        result = self._make_request("GET", endpoint)
         if "error" in result:
             return []
         return result if isinstance(result, list) else []
     
+    def list_memos_page(self, limit: int = 100, cursor: str = None,
+                        fields: List[str] = None) -> Dict[str, Any]:
+        """カーソル方式でメモを1ページ取得（ページの深さによらずコストは一定）"""
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        if fields:
+            params["fields"] = ",".join(fields)
+        try:
+            response = self._get(f"{self.base_url}/memos", params=params, timeout=15)
+            if response.status_code != 200:
+                return {"error": f"HTTP {response.status_code}: {response.text}"}
+            return {
+                "memos": response.json(),
+                "next_cursor": response.headers.get("X-Next-Cursor")
+            }
+        except requests.exceptions.ConnectionError:
+            return {"error": "APIサーバーに接続できません。サーバーが起動しているか確認してください。"}
+        except Exception as e:
+            return {"error": f"リクエストエラー: {str(e)}"}
+    
     def update_memo(self, memo_id: str, title: str = None, content: str = None, tags: List[str] = None) -> Dict[str, Any]:
         """メモを更新"""
         data = {}
@@ -154,16 +238,22 @@ class MemoAPI:
         """メモを削除"""
         return self._make_request("DELETE", f"/memos/{memo_id}")
     
-    def search_memos(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def search_memos(self, query: str, limit: int = 50, fields: List[str] = None,
+                     preview: int = None) -> List[Dict[str, Any]]:
         """メモを検索"""
-        result = self._make_request("GET", f"/memos/search/{query}?limit={limit}")
+        params = self._projection_params(fields, preview)
+        endpoint = f"/memos/search/{query}?limit={limit}{params}"
+        result = self._make_request("GET", endpoint)
         if "error" in result:
             return []
         return result if isinstance(result, list) else []
     
-    def get_memos_by_tag(self, tag_name: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_memos_by_tag(self, tag_name: str, limit: int = 50, fields: List[str] = None,
+                         preview: int = None) -> List[Dict[str, Any]]:
         """タグでメモを検索"""
-        result = self._make_request("GET", f"/memos/tag/{tag_name}?limit={limit}")
+        params = self._projection_params(fields, preview)
+        endpoint = f"/memos/tag/{tag_name}?limit={limit}{params}"
+        result = self._make_request("GET", endpoint)
         if "error" in result:
             return []
         return result if isinstance(result, list) else []
@@ -181,12 +271,92 @@ class MemoAPI:
         return result
 
     # --- AI プレビュー ---
-    def ai_preview(self, content: str) -> Dict[str, Any]:
+    def ai_preview(self, content: str,
+                   on_token: Callable[[str], None] = None) -> Dict[str, Any]:
+        """AI プレビュー（on_token を渡すとストリーミング版を使い、要約を受信するたびに呼ぶ）
+        
+        ストリーミング版の結果には ttft_ms（最初のトークンまで）と total_ms（全体）を
+        クライアント側で計測して付ける。
+        """
         data = {"content": content}
-        return self._make_request("POST", "/ai/preview", data)
+        if on_token is None:
+            return self._make_request("POST", "/ai/preview", data)
+        
+        start = time.perf_counter()
+        ttft_ms = None
+        summary = ""
+        result = {}
+        try:
+            for event, payload in self._stream_events("/ai/preview/stream", data):
+                if event == "token":
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - start) * 1000
+                    summary += payload["text"]
+                    on_token(summary)
+                elif event == "done":
+                    result = payload
+                elif event == "error":
+                    return {"error": payload.get("detail", "AI 処理エラー")}
+        except requests.exceptions.ConnectionError:
+            return {"error": "APIサーバーに接続できません。サーバーが起動しているか確認してください。"}
+        except Exception as e:
+            return {"error": f"リクエストエラー: {str(e)}"}
+        
+        if not result:
+            return {"error": "AI プレビューの応答が途中で終了しました"}
+        result["ttft_ms"] = ttft_ms
+        result["total_ms"] = (time.perf_counter() - start) * 1000
+        return result
+    
+    def _stream_events(self, endpoint: str,
+                       data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Server-Sent Events を (イベント名, データ) として順に返す"""
+        # 接続は 5 秒で打ち切り、受信は トークン間隔が 60 秒空くまで待つ
+        with requests.post(
+            f"{self.base_url}{endpoint}", json=data, stream=True, timeout=(5, 60)
+        ) as response:
+            if response.status_code != 200:
+                detail = f"HTTP {response.status_code}: {response.text}"
+                yield "error", {"detail": detail}
+                return
+            event, lines = "message", []
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        lines.append(line[len("data:"):].strip())
+                    continue
+                if lines:
+                    yield event, json.loads("\n".join(lines))
+                event, lines = "message", []
+
+# APIインスタンスの作成（再実行のたびに作り直さず、ETag 付きの応答を使い回す）
+@st.cache_resource
+def get_api() -> MemoAPI:
+    return MemoAPI()
+
+api = get_api()
 
-# APIインスタンスの作成
-api = MemoAPI()
+# 一覧表示で使う項目（content 全文は送らず、先頭だけプレビューとして受け取る）
+LIST_FIELDS = ["id", "title"]
+CARD_FIELDS = ["id", "title", "tags"]
+PREVIEW_CHARS = 100
+# サイドバーのメモ一覧の1ページの件数
+MEMO_PAGE_SIZE = 20
+# 「最近表示したメモ」に残す件数
+RECENT_MEMOS = 5
+
+def remember_memo(memo_id: str):
+    """最近表示したメモの先頭に追加"""
+    recent = [memo_id] + [i for i in st.session_state.recent_memo_ids if i != memo_id]
+    st.session_state.recent_memo_ids = recent[:RECENT_MEMOS]
+
+def format_preview_timing(ai_res: Dict[str, Any]) -> str:
+    """AI プレビューの応答時間（最初のトークンまで / 全体）"""
+    if ai_res.get("ttft_ms") is None:
+        return ""
+    return f"最初のトークンまで {ai_res['ttft_ms']:.0f} ms / 全体 {ai_res['total_ms']:.0f} ms"
 
 def main():
     """メインアプリケーション"""
@@ -254,25 +424,68 @@ def main():
         search_query = st.text_input("キーワードを入力", placeholder="タイトル、内容、タグで検索")
         if search_query:
             try:
-                search_results = api.search_memos(search_query)
+                search_results = api.search_memos(search_query, fields=LIST_FIELDS)
                 st.write(f"検索結果: {len(search_results)}件")
             except Exception as e:
                 st.warning("検索に失敗しました")
         
         st.divider()
         
-        # メモ一覧（エラーハンドリング付き）
+        # 最近表示したメモ（1回のリクエストでまとめて取得）
+        if st.session_state.current_memo_id:
+            remember_memo(st.session_state.current_memo_id)
+        if st.session_state.recent_memo_ids:
+            st.subheader("🕘 最近表示したメモ")
+            recent_memos = api.get_memos(st.session_state.recent_memo_ids)
+            # 削除されたメモは履歴から外す
+            missing = {memo["id"] for memo in recent_memos if memo.get("not_found")}
+            st.session_state.recent_memo_ids = [
+                memo_id for memo_id in st.session_state.recent_memo_ids
+                if memo_id not in missing
+            ]
+            for memo in recent_memos:
+                if memo.get("not_found"):
+                    continue
+                if st.button(f"📄 {memo['title'][:30]}", key=f"recent_{memo['id']}",
+                             use_container_width=True):
+                    st.session_state.current_memo_id = memo['id']
+                    st.session_state.selected_tag = None
+                    st.rerun()
+            
+            st.divider()
+        
+        # メモ一覧（カーソル方式のページング、エラーハンドリング付き）
         st.subheader("📋 メモ一覧")
         try:
-            memos = api.list_memos()
-            if memos:
-                for memo in memos:
+            page = api.list_memos_page(
+                limit=MEMO_PAGE_SIZE,
+                cursor=st.session_state.memo_cursors[-1],
+                fields=LIST_FIELDS,
+            )
+            if "error" in page:
+                st.warning("メモ一覧の取得に失敗しました")
+            elif page["memos"]:
+                for memo in page["memos"]:
                     if st.button(f"📄 {memo['title'][:30]}...", key=f"list_{memo['id']}", use_container_width=True):
                         st.session_state.current_memo_id = memo['id']
                         st.session_state.selected_tag = None
                         st.rerun()
             else:
                 st.info("メモがありません")
+            
+            col_prev, col_next = st.columns(2)
+            with col_prev:
+                if len(st.session_state.memo_cursors) > 1:
+                    if st.button("◀ 前へ", key="memo_page_prev",
+                                 use_container_width=True):
+                        st.session_state.memo_cursors.pop()
+                        st.rerun()
+            with col_next:
+                if page.get("next_cursor"):
+                    if st.button("次へ ▶", key="memo_page_next",
+                                 use_container_width=True):
+                        st.session_state.memo_cursors.append(page["next_cursor"])
+                        st.rerun()
         except Exception as e:
             st.warning("メモ一覧の取得に失敗しました")
     
@@ -295,13 +508,19 @@ def main():
                 with col2:
                     if st.form_submit_button("🤖 AI処理", use_container_width=True):
                         if content:
-                            ai_res = api.ai_preview(content)
+                            # 要約を受信しながら表示する
+                            streaming = st.empty()
+                            ai_res = api.ai_preview(
+                                content, on_token=streaming.markdown
+                            )
+                            streaming.empty()
                             if "error" in ai_res:
                                 st.error(ai_res["error"])
                             else:
                                 # AI処理結果をセッション状態に保存
                                 st.session_state.ai_result = ai_res
                                 st.success("AI 処理完了！下記の「適用」ボタンで反映できます")
+                                st.caption(format_preview_timing(ai_res))
                         else:
                             st.warning("内容を入力してください")
                 
@@ -350,12 +569,14 @@ def main():
         elif st.session_state.selected_tag:
             # タグ別メモ一覧
             st.subheader(f"🏷️ タグ: {st.session_state.selected_tag}")
-            tag_memos = api.get_memos_by_tag(st.session_state.selected_tag)
+            tag_memos = api.get_memos_by_tag(
+                st.session_state.selected_tag, fields=CARD_FIELDS, preview=PREVIEW_CHARS
+            )
             
             if tag_memos:
                 for memo in tag_memos:
                     with st.expander(f"📄 {memo['title']}"):
-                        st.write(f"**内容:** {memo['content'][:100]}...")
+                        st.write(f"**内容:** {memo['preview']}...")
                         st.write(f"**タグ:** {', '.join(memo['tags'])}")
                         if st.button("編集", key=f"edit_tag_{memo['id']}"):
                             st.session_state.current_memo_id = memo['id']
@@ -389,13 +610,18 @@ def main():
                     
                     with col2:
                         if st.form_submit_button("🤖 AI再処理", use_container_width=True):
-                            ai_res = api.ai_preview(content)
+                            streaming = st.empty()
+                            ai_res = api.ai_preview(
+                                content, on_token=streaming.markdown
+                            )
+                            streaming.empty()
                             if "error" in ai_res:
                                 st.error(ai_res["error"])
                             else:
                                 # AI再処理結果をセッション状態に保存
                                 st.session_state.ai_edit_result = ai_res
                                 st.success("AI 再処理完了！下記の「適用」ボタンで反映できます")
+                                st.caption(format_preview_timing(ai_res))
                 
                 # AI再処理結果の表示と適用（編集画面用）
                 if 'ai_edit_result' in st.session_state and st.session_state.ai_edit_result:
@@ -455,6 +681,12 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
                 
+                # AI 処理の状態（保存後にワーカーが要約・タグを付与する）
+                if memo.get("enrichment_status") == "pending":
+                    st.info("🤖 AI が要約・タグを生成中です。しばらくしてから再読み込みしてください")
+                elif memo.get("enrichment_status") == "failed":
+                    st.warning("AI による要約・タグ付けに失敗しました")
+                
                 # 要約
                 if memo.get("summary"):
                     st.markdown(f"""
@@ -479,11 +711,13 @@ def main():
         # 検索結果表示
         elif search_query:
             st.subheader("🔍 検索結果")
-            search_results = api.search_memos(search_query)
+            search_results = api.search_memos(
+                search_query, fields=CARD_FIELDS, preview=PREVIEW_CHARS
+            )
             if search_results:
                 for memo in search_results:
                     with st.expander(f"📄 {memo['title']}"):
-                        st.write(f"**内容:** {memo['content'][:100]}...")
+                        st.write(f"**内容:** {memo['preview']}...")
                         st.write(f"**タグ:** {', '.join(memo['tags'])}")
                         if st.button("編集", key=f"edit_{memo['id']}"):
                             st.session_state.current_memo_id = memo['id']
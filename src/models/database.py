@@ -1,19 +1,98 @@
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, Table, ForeignKey
+from sqlalchemy import (
+    create_engine, event, inspect, text, Column, String, Text, DateTime, Integer, Table,
+    ForeignKey, Index,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import Session, sessionmaker, relationship
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 from sqlalchemy.sql import func
-from typing import List, Optional
-from datetime import datetime
+from typing import Iterable, List, Optional
+import functools
 import os
+import uuid
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # データベース設定
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./memo_app.db")
-engine = create_engine(DATABASE_URL, echo=False)
+
+# 非同期版（FastAPI 用）: sqlite:// は aiosqlite ドライバに置き換える
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if DATABASE_URL.startswith("sqlite://") else DATABASE_URL
+)
+
+# SQLite の PRAGMA（API サーバー・MCP サーバー・バッチが同じ DB ファイルを共有するため
+# WAL で読み書きの競合を減らし、ロック待ちは busy_timeout で吸収する）
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # 負の値は KiB 単位 (64MB)
+}
+
+# コネクションプール設定
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    if not url.startswith("sqlite"):
+        return False
+    return ":memory:" in url or url.rstrip("/").endswith(":")
+
+
+def _engine_options(url: str) -> dict:
+    """create_engine / create_async_engine 共通のオプション"""
+    options = {"echo": False}
+    # インメモリ SQLite は単一コネクションのプールになるためサイズ指定しない
+    if not _is_sqlite_memory(url):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=not url.startswith("sqlite"),
+        )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """新しい SQLite コネクションに PRAGMA を適用"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str = DATABASE_URL) -> Engine:
+    """設定済みの Engine を作成（SQLite では WAL などの PRAGMA を適用）"""
+    db_engine = create_engine(url, **_engine_options(url))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def create_async_db_engine(url: str = ASYNC_DATABASE_URL) -> AsyncEngine:
+    """設定済みの AsyncEngine を作成（PRAGMA は同期版と同じ）"""
+    db_engine = create_async_engine(url, **_engine_options(url))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+
 Base = declarative_base()
 
 # タグとメモの多対多関係のための中間テーブル
@@ -24,6 +103,12 @@ memo_tags = Table(
     Column('tag_id', Integer, ForeignKey('tags.id'))
 )
 
+# to_dict / 一覧 API の fields で指定できる項目
+MEMO_FIELDS = (
+    "id", "title", "content", "summary", "status", "enrichment_status", "tags",
+    "created_at", "updated_at",
+)
+
 class Memo(Base):
     """メモテーブル"""
     __tablename__ = "memos"
@@ -33,24 +118,44 @@ class Memo(Base):
     content = Column(Text, nullable=False)
     summary = Column(Text, nullable=True)
     status = Column(String(20), default="draft", index=True)
+    # AI による要約・タグ付けの状態（pending / done / failed、AI 処理をしないメモは None）
+    enrichment_status = Column(String(20), nullable=True, index=True)
     created_at = Column(DateTime, default=func.now(), index=True)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
+    # ユーザーの書き込みで明示的に設定する（onupdate は使わない: AI 処理の反映では変えず、
+    # SQLite の CURRENT_TIMESTAMP は UTC・秒単位で datetime.now() と並び順がずれるため）
+    updated_at = Column(DateTime, default=func.now(), index=True)
     
     # リレーションシップ
     tags = relationship("Tag", secondary=memo_tags, back_populates="memos")
     
-    def to_dict(self) -> dict:
-        """メモを辞書形式に変換"""
+    # 一覧のキーセットページング (updated_at desc, id desc) 用の複合インデックス
+    __table_args__ = (
+        Index("ix_memos_updated_at_id", "updated_at", "id"),
+    )
+    
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> dict:
+        """メモを辞書形式に変換（fields を指定するとその項目だけ）
+
+        日時は datetime のまま返し、API の応答では orjson が ISO 8601 の文字列にする。
+        """
+        if fields is not None:
+            return {name: self._field_value(name) for name in fields}
         return {
             "id": self.id,
             "title": self.title,
             "content": self.content,
             "summary": self.summary,
             "status": self.status,
+            "enrichment_status": self.enrichment_status,
             "tags": [tag.name for tag in self.tags],
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
+    
+    def _field_value(self, name: str):
+        if name == "tags":
+            return [tag.name for tag in self.tags]
+        return getattr(self, name)
 
 class Tag(Base):
     """タグテーブル"""
@@ -66,10 +171,125 @@ class Tag(Base):
     def __repr__(self):
         return f"<Tag(name='{self.name}')>"
 
+class EnrichmentJob(Base):
+    """AI 要約・タグ付けのジョブキュー（メモごとに1行）
+
+    status: queued（実行待ち）/ running（ワーカーが処理中）/ done / failed
+    running のまま locked_until を過ぎたジョブは、ワーカーが落ちたものとして再実行される。
+    """
+    __tablename__ = "enrichment_jobs"
+    
+    id = Column(Integer, primary_key=True)
+    memo_id = Column(String, ForeignKey('memos.id'), unique=True, nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_run_at = Column(DateTime, nullable=False)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    
+    # 実行可能なジョブを next_run_at 順に取り出す用
+    __table_args__ = (
+        Index("ix_enrichment_jobs_status_next_run_at", "status", "next_run_at"),
+    )
+
+class DataVersion(Base):
+    """メモ・タグのデータのバージョン（1行のみ、書き込みのたびに version を1つ上げる）
+
+    API の ETag に使う。DB を作り直した場合に古い ETag と一致しないよう、
+    行を作成したときの epoch も ETag に含める。
+    """
+    __tablename__ = "data_version"
+    
+    id = Column(Integer, primary_key=True)
+    epoch = Column(String(32), nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+
+class MemoEvent(Base):
+    """メモの変更イベントのログ（/events の変更通知用、古いものから削除する）
+
+    id は AUTOINCREMENT で、古いイベントを削除しても再利用されない（Last-Event-ID として使う）。
+    type: created / updated / deleted / enriched / enrichment_failed
+    """
+    __tablename__ = "memo_events"
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id = Column(Integer, primary_key=True)
+    type = Column(String(20), nullable=False)
+    memo_id = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+def _add_missing_columns():
+    """既存テーブルに後から追加した列を ALTER TABLE で追加（NULL 許容の列のみ）"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(
+                        f'ALTER TABLE {table.name} '
+                        f'ADD COLUMN {column.name} {column_type}'
+                    ))
+
 # データベースの初期化
 def init_db():
     """データベースを初期化"""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    
+    # 既存テーブルに後から追加したインデックスを作成
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    # データのバージョン（ETag 用）の行を作成
+    data_version = DataVersion.__table__
+    with engine.begin() as conn:
+        row = conn.execute(data_version.select().where(data_version.c.id == 1)).first()
+        if row is None:
+            conn.execute(
+                data_version.insert().values(id=1, epoch=uuid.uuid4().hex, version=0)
+            )
+
+# 一括インポート用の INSERT
+def insert_rows(db: Session, table: Table, rows: List[dict]):
+    """同じ列を持つ大量の行を INSERT（コミットはしない）
+
+    SQLAlchemy の行ごとのパラメータ処理を通さず DB-API の executemany に渡す。
+    型変換が必要な列（SQLite の日時など）は、同じ値を1度だけ変換する。
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect
+    statement, keys = _compiled_insert(table, tuple(rows[0]), dialect)
+    params = [[row[key] for key in keys] for row in rows]
+    for index, key in enumerate(keys):
+        process = table.c[key].type.bind_processor(dialect)
+        if process is None:
+            continue
+        converted = {None: None}
+        for values in params:
+            value = values[index]
+            if value not in converted:
+                converted[value] = process(value)
+            values[index] = converted[value]
+    if dialect.positional:
+        params = [tuple(values) for values in params]
+    else:
+        params = [dict(zip(keys, values)) for values in params]
+    db.connection().exec_driver_sql(statement, params)
+
+@functools.lru_cache(maxsize=64)
+def _compiled_insert(table: Table, columns: tuple, dialect) -> tuple:
+    """(INSERT 文, パラメータの順の列名)"""
+    compiled = table.insert().compile(dialect=dialect, column_keys=list(columns))
+    keys = compiled.positiontup if compiled.positional else columns
+    return str(compiled), tuple(keys)
 
 # FastAPI専用: Dependency Injection用のジェネレーター関数
 def get_db():
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+
+def normalize_content(content: str) -> str:
+    """キャッシュキー用にメモ本文を正規化（Unicode 正規化・改行コード・前後の空白）"""
+    content = unicodedata.normalize("NFC", content)
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in content.strip().split("\n"))
+
+
+def content_hash(content: str, prompt_version: str, model: str) -> str:
+    """(正規化した本文, プロンプトのバージョン, モデル) の SHA-256"""
+    payload = json.dumps(
+        [normalize_content(content), prompt_version, model], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AIResultCache:
+    """AI の要約・タグ生成結果を本文のハッシュで保存する SQLite キャッシュ
+
+    同じ本文に対する再処理（プレビュー後の保存、本文を変えない更新など）で
+    LLM を呼ばずに済ませる。結果は本文とプロンプトが同じ限り変わらないため TTL は持たず、
+    max_entries を超えたら最終参照が古いものから追い出す。
+    ファイルを共有すれば API サーバーと MCP サーバーで同じキャッシュを使える。
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_results ("
+            "content_hash TEXT PRIMARY KEY, model TEXT NOT NULL, "
+            "prompt_version TEXT NOT NULL, result TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_ai_results_last_access "
+            "ON ai_results (last_access)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """スレッドごとのコネクション（autocommit）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, content: str, prompt_version: str,
+            model: str) -> Optional[Dict[str, Any]]:
+        """保存済みの結果を返す（無ければ None）"""
+        key = content_hash(content, prompt_version, model)
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT result FROM ai_results WHERE content_hash = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        conn.execute(
+            "UPDATE ai_results SET last_access = ? WHERE content_hash = ?",
+            (time.time(), key),
+        )
+        return json.loads(row[0])
+
+    def set(self, content: str, prompt_version: str, model: str,
+            result: Dict[str, Any]) -> None:
+        key = content_hash(content, prompt_version, model)
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO ai_results "
+            "(content_hash, model, prompt_version, result, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key, model, prompt_version, json.dumps(result, ensure_ascii=False),
+                now, now,
+            ),
+        )
+        evicted = conn.execute(
+            "DELETE FROM ai_results WHERE rowid IN ("
+            "SELECT rowid FROM ai_results ORDER BY last_access "
+            "LIMIT max(0, (SELECT COUNT(*) FROM ai_results) - ?))",
+            (self.max_entries,),
+        ).rowcount
+        self.evictions += max(evicted, 0)
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM ai_results")
+
+    def stats(self) -> Dict[str, Any]:
+        """ヒット/ミス/追い出しのカウンタ"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_ai_cache() -> Optional[AIResultCache]:
+    """環境変数から作成したプロセス共通の AI 結果キャッシュ
+
+    AI_CACHE_PATH: 保存先ファイル（既定 ./ai_cache.db、none で無効）
+    """
+    path = os.getenv("AI_CACHE_PATH", "./ai_cache.db")
+    if path == "none":
+        return None
+    max_entries = int(os.getenv("AI_CACHE_MAX_ENTRIES", "10000"))
+    return AIResultCache(path, max_entries=max_entries)
@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+import openai
+from src.utils.metrics import registry
+from src.utils.text_chunker import count_tokens
+
+# OpenAI のレート制限に合わせた上限（0 で無制限）
+AI_RPM = int(os.getenv("AI_RPM", "500"))
+AI_TPM = int(os.getenv("AI_TPM", "200000"))
+# 同時に送るリクエスト数の上限（0 で無制限）
+AI_MAX_IN_FLIGHT = int(os.getenv("AI_MAX_IN_FLIGHT", "16"))
+# 429 / 5xx / 接続エラーのリトライ回数と、Retry-After が無い場合のバックオフ
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "3"))
+AI_RETRY_BACKOFF_SECONDS = float(os.getenv("AI_RETRY_BACKOFF_SECONDS", "1"))
+AI_RETRY_MAX_SECONDS = float(os.getenv("AI_RETRY_MAX_SECONDS", "30"))
+
+RETRYABLE_STATUS = (408, 409, 429)
+
+# /metrics 用（リトライを含む1回ごとの API 呼び出し）
+ai_calls = registry.counter(
+    "ai_requests_total", "OpenAI API の呼び出し数（リトライを含む）", ["model", "outcome"]
+)
+ai_call_seconds = registry.histogram(
+    "ai_request_duration_seconds", "OpenAI API の呼び出し時間（秒、ストリーミングは応答開始まで）", ["model"]
+)
+ai_tokens = registry.counter(
+    "ai_tokens_total", "OpenAI API が返した使用トークン数", ["model", "type"]
+)
+ai_failures = registry.counter(
+    "ai_failures_total", "リトライしても成功しなかった（またはリトライしない）呼び出しの数", ["model", "reason"]
+)
+
+
+class TokenBucket:
+    """1分あたり per_minute を連続的に補充するトークンバケット
+
+    reserve は待たずに予約だけ行い、使えるようになるまでの秒数を返す
+    （同期・非同期の両方から使えるよう、待ち方は呼び出し側に任せる）。
+    """
+
+    def __init__(self, per_minute: int, burst: Optional[int] = None):
+        self.per_minute = per_minute
+        self.capacity = burst or per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """amount を予約し、実際に使えるまでの待ち秒数を返す"""
+        with self._lock:
+            now = time.monotonic()
+            refilled = self.tokens + (now - self.updated) * self.rate
+            self.tokens = min(self.capacity, refilled)
+            self.updated = now
+            # 上限を超える要求は上限分として扱う（永久に待たないように）
+            self.tokens -= min(amount, self.capacity)
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def refund(self, amount: float) -> None:
+        """見積もりと実際の使用量の差を戻す（負の値なら追加で消費する）"""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """リクエストが消費するトークン数の見積もり（入力 + 出力の上限）"""
+    prompt = "".join(
+        str(message.get("content") or "") for message in request.get("messages", [])
+    )
+    prompt_tokens = count_tokens(prompt, request.get("model", "gpt-4o-mini"))
+    return prompt_tokens + (request.get("max_tokens") or 0)
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """同一リクエストをまとめるためのキー"""
+    encoded = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def is_retryable(error: Exception) -> bool:
+    """リトライで回復しうるエラーか（レート制限・サーバーエラー・接続エラー）"""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status in RETRYABLE_STATUS or status >= 500)
+
+
+def error_reason(error: Exception) -> str:
+    """メトリクスのラベル用のエラーの種類"""
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection"
+    status = getattr(error, "status_code", None)
+    if status == 429:
+        return "rate_limited"
+    if status is not None:
+        return f"http_{status}"
+    return type(error).__name__
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """エラー応答の Retry-After (retry-after-ms / retry-after) を秒で返す"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AIGateway:
+    """OpenAI クライアントの前段に置くゲートウェイ
+
+    chat.completions.create を同じ引数で受け付け、
+      - RPM / TPM のトークンバケットで送信ペースを抑える
+      - 同時に送るリクエスト数を AI_MAX_IN_FLIGHT までに制限する
+      - 429 / 5xx / 接続エラーを Retry-After（無ければ指数バックオフ）に従ってリトライする
+        （429 の場合は Retry-After の間、他のリクエストも送信を控える）
+      - 同じ引数のリクエストが処理中なら新たに送らず、その結果を共有する (singleflight)
+    ストリーミングはまとめずに、開始時のレート制限・リトライのみ行う。
+    """
+
+    def __init__(self, client, rpm: int = AI_RPM, tpm: int = AI_TPM,
+                 max_in_flight: int = AI_MAX_IN_FLIGHT,
+                 max_retries: int = AI_MAX_RETRIES):
+        self.client = client
+        self.rpm = TokenBucket(rpm) if rpm > 0 else None
+        self.tpm = TokenBucket(tpm) if tpm > 0 else None
+        self.max_in_flight = max_in_flight if max_in_flight > 0 else sys.maxsize
+        self.max_retries = max_retries
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._semaphore = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Any] = {}
+        self._paused_until = 0.0
+        # 実際に API へ送っている最中の呼び出し数（セマフォの内側）
+        self.in_flight = 0
+        self.requests = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.throttled_seconds = 0.0
+
+    def __getattr__(self, name):
+        # close など chat 以外の属性はクライアントのものを使う
+        return getattr(self.client, name)
+
+    def stats(self) -> Dict[str, Any]:
+        """送信数・まとめた数・リトライ数などの統計"""
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failures": self.failures,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "in_flight": self.in_flight,
+            "limits": {
+                "rpm": self.rpm.per_minute if self.rpm else None,
+                "tpm": self.tpm.per_minute if self.tpm else None,
+                "max_in_flight": (
+                    self.max_in_flight if self.max_in_flight != sys.maxsize else None
+                ),
+                "max_retries": self.max_retries
+            }
+        }
+
+    def _track_in_flight(self, delta: int) -> None:
+        with self._lock:
+            self.in_flight += delta
+
+    def _reserve(self, tokens: int) -> float:
+        """バケットから予約し、送信まで待つ秒数を返す"""
+        wait = max(0.0, self._paused_until - time.monotonic())
+        if self.rpm:
+            wait = max(wait, self.rpm.reserve(1))
+        if self.tpm:
+            wait = max(wait, self.tpm.reserve(tokens))
+        if wait > 0:
+            self.throttled_seconds += wait
+        return wait
+
+    def _record_call(self, request: Dict[str, Any], start: float,
+                     error: Exception = None) -> None:
+        """API 呼び出し1回の時間と結果を記録"""
+        model = request.get("model", "")
+        ai_call_seconds.observe(time.perf_counter() - start, model)
+        ai_calls.inc(model, "ok" if error is None else error_reason(error))
+
+    def _record_usage(self, request: Dict[str, Any], response, tokens: int) -> None:
+        """実際の使用トークン数が分かれば記録し、見積もりとの差を TPM に戻す"""
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if not isinstance(total_tokens, int):
+            return
+        model = request.get("model", "")
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        ai_tokens.inc(model, "prompt", amount=prompt_tokens)
+        ai_tokens.inc(model, "completion", amount=completion_tokens)
+        if self.tpm:
+            self.tpm.refund(tokens - total_tokens)
+
+    def _retry_delay(self, request: Dict[str, Any], error: Exception,
+                     attempt: int) -> Optional[float]:
+        """リトライまでの秒数（リトライしない場合は None）"""
+        if getattr(error, "status_code", None) == 429:
+            self.rate_limited += 1
+        if attempt >= self.max_retries or not is_retryable(error):
+            self.failures += 1
+            ai_failures.inc(request.get("model", ""), error_reason(error))
+            return None
+        self.retries += 1
+        delay = retry_after(error)
+        if delay is None:
+            delay = AI_RETRY_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.0)
+        delay = min(delay, AI_RETRY_MAX_SECONDS)
+        if getattr(error, "status_code", None) == 429:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def create(self, **request):
+        """chat.completions.create と同じ引数で呼び出す"""
+        if request.get("stream"):
+            return self._send(request)
+
+        key = request_key(request)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            response = self._send(request)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _send(self, request: Dict[str, Any]):
+        tokens = estimate_tokens(request)
+        attempt = 0
+        while True:
+            wait = self._reserve(tokens)
+            if wait > 0:
+                time.sleep(wait)
+            with self._semaphore:
+                self.requests += 1
+                self._track_in_flight(1)
+                start = time.perf_counter()
+                try:
+                    response = self.client.chat.completions.create(**request)
+                except Exception as e:
+                    self._record_call(request, start, e)
+                    delay = self._retry_delay(request, e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    self._record_call(request, start)
+                    self._record_usage(request, response, tokens)
+                    return response
+                finally:
+                    self._track_in_flight(-1)
+            time.sleep(delay)
+            attempt += 1
+
+
+class AsyncAIGateway(AIGateway):
+    """AIGateway の非同期版（openai.AsyncOpenAI の前段）"""
+
+    def __init__(self, client, rpm: int = AI_RPM, tpm: int = AI_TPM,
+                 max_in_flight: int = AI_MAX_IN_FLIGHT,
+                 max_retries: int = AI_MAX_RETRIES):
+        super().__init__(client, rpm, tpm, max_in_flight, max_retries)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def create(self, **request):
+        """chat.completions.create と同じ引数で呼び出す"""
+        if request.get("stream"):
+            return await self._send(request)
+
+        key = request_key(request)
+        task = self._inflight.get(key)
+        if task is None:
+            # API 呼び出しは呼び出し元とは別のタスクで行い、最初の呼び出し元が
+            # キャンセル（wait_for の時間切れなど）されても、まとめた他の呼び出し元には影響させない
+            task = self._inflight[key] = asyncio.ensure_future(self._send(request))
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: "asyncio.Task") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 誰も待っていない場合に「取得されなかった例外」の警告を出さない
+        if not task.cancelled():
+            task.exception()
+
+    async def _send(self, request: Dict[str, Any]):
+        tokens = estimate_tokens(request)
+        attempt = 0
+        while True:
+            wait = self._reserve(tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._semaphore:
+                self.requests += 1
+                self._track_in_flight(1)
+                start = time.perf_counter()
+                try:
+                    response = await self.client.chat.completions.create(**request)
+                except Exception as e:
+                    self._record_call(request, start, e)
+                    delay = self._retry_delay(request, e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    self._record_call(request, start)
+                    self._record_usage(request, response, tokens)
+                    return response
+                finally:
+                    self._track_in_flight(-1)
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -1,24 +1,75 @@
 import os
+import json
+import time
+import asyncio
+import warnings
 import openai
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from dotenv import load_dotenv
 from pathlib import Path
+from pydantic import BaseModel, Field, ValidationError
+from src.utils.ai_cache import AIResultCache, get_ai_cache
+from src.utils.ai_gateway import AIGateway, AsyncAIGateway
+from src.utils.keyword_extractor import KeywordExtractor
+from src.utils.metrics import registry
+from src.utils.text_chunker import chunk_text, count_tokens
 
 # プロジェクトルートの .env を指定して読み込む
 ENV_PATH = Path(__file__).resolve().parent.parent.parent / ".env"
 load_dotenv(dotenv_path=ENV_PATH, override=False)
 
-class AIProcessor:
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-        
-        self.client = openai.OpenAI(api_key=api_key)
-    
-    def summarize_memo(self, content: str) -> str:
-        """メモの内容を要約する"""
-        prompt = f"""
+# タグの最大数
+MAX_TAGS = 5
+
+# 使用するモデル
+MODEL = "gpt-4o-mini"
+
+# プロンプトのバージョン（プロンプトを変えたら上げて AI 結果キャッシュを無効化する）
+PROMPT_VERSION = "1"
+
+# 要約に失敗した場合の文言（この結果はキャッシュしない）
+SUMMARY_ERROR = "要約を生成できませんでした"
+
+# 長文モード: この トークン数を超えるメモはチャンクごとに要約してからまとめる (map-reduce)
+AI_LONG_MEMO_TOKENS = int(os.getenv("AI_LONG_MEMO_TOKENS", "3000"))
+# 1チャンクのトークン数と、チャンク要約の同時呼び出し数
+AI_CHUNK_TOKENS = int(os.getenv("AI_CHUNK_TOKENS", "1500"))
+AI_MAP_CONCURRENCY = int(os.getenv("AI_MAP_CONCURRENCY", "4"))
+
+# タグ抽出でローカルのキーワード抽出をどう使うか
+#   llm:      LLM のみ（失敗時はタグ無し）
+#   fallback: LLM が失敗したらローカル抽出の結果を使う
+#   race:     LLM を AI_TAG_BUDGET_MS まで待ち、間に合わなければローカル抽出の結果を使う
+TAG_STRATEGIES = ("llm", "fallback", "race")
+AI_TAG_STRATEGY = os.getenv("AI_TAG_STRATEGY", "llm").lower()
+AI_TAG_BUDGET_MS = int(os.getenv("AI_TAG_BUDGET_MS", "1500"))
+
+# race で LLM のタグ抽出を待つスレッド（時間切れでも呼び出し自体は最後まで走る）
+_tag_race_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ai-tags")
+
+# /metrics 用（API 呼び出しごとの時間・トークン数は AIGateway が記録する）
+ai_errors = registry.counter(
+    "ai_processor_errors_total", "AI 処理のエラー・フォールバックの回数", ["stage"]
+)
+ai_memo_seconds = registry.histogram(
+    "ai_process_memo_duration_seconds", "process_memo の処理時間（秒）", ["source"]
+)
+ai_tag_sources = registry.counter(
+    "ai_tags_results_total",
+    "タグの取得元ごとの process_memo の結果数（llm / local / none）",
+    ["source"]
+)
+
+
+class MemoAnalysis(BaseModel):
+    """要約とタグを1回で生成する場合のレスポンススキーマ"""
+    summary: str = Field(..., min_length=1)
+    tags: List[str] = Field(default_factory=list)
+
+
+def summary_prompt(content: str) -> str:
+    return f"""
 ###
 You are a professional summarizer.
 Summarize the following user note into 2–3 bullet points, each ≤ 15 words.
@@ -26,24 +77,10 @@ Text:
 \"\"\"{content}\"\"\"
 ###
 """
-        
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.3
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Error summarizing memo: {e}")
-            return "要約を生成できませんでした"
-    
-    def extract_tags(self, content: str) -> List[str]:
-        """メモの内容からタグを抽出する"""
-        prompt = f"""
+
+
+def tags_prompt(content: str) -> str:
+    return f"""
 ###
 You are a metadata extractor.
 From the note below, list up to 5 relevant tags.
@@ -51,34 +88,566 @@ Note:
 \"\"\"{content}\"\"\"
 ###
 """
-        
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.3
+
+
+def analysis_prompt(content: str) -> str:
+    return f"""
+###
+You are a professional summarizer and metadata extractor.
+For the user note below, respond with a JSON object with exactly these keys:
+  "summary": 2–3 bullet points as a single string, one per line, each ≤ 15 words
+  "tags": an array of up to {MAX_TAGS} relevant tags
+Note:
+\"\"\"{content}\"\"\"
+###
+"""
+
+
+def chunk_summary_prompt(chunk: str, index: int, total: int) -> str:
+    return f"""
+###
+You are a professional summarizer.
+The text below is part {index} of {total} of a long user note.
+Summarize the key points of this part into up to 5 bullet points, each ≤ 20 words.
+Text:
+\"\"\"{chunk}\"\"\"
+###
+"""
+
+
+def join_chunk_summaries(summaries: List[str]) -> str:
+    """チャンクごとの要約を reduce 段の入力にまとめる"""
+    return "\n\n".join(
+        f"[Part {index}/{len(summaries)}]\n{summary}"
+        for index, summary in enumerate(summaries, start=1)
+    )
+
+
+def parse_tags(tags_text: str) -> List[str]:
+    """改行区切りのタグ応答をリストに変換"""
+    # カンマや改行で区切られたタグをリストに変換
+    lines = tags_text.strip().split('\n')
+    tags = [tag.strip().strip('*').strip('-').strip() for tag in lines if tag.strip()]
+    tags = [tag for tag in tags if tag and len(tag) > 0]
+
+    return tags[:MAX_TAGS]  # 最大5個まで
+
+
+def parse_analysis(text: str) -> Dict[str, Any]:
+    """JSON 応答を MemoAnalysis で検証（不正な場合は ValueError）"""
+    try:
+        analysis = MemoAnalysis.model_validate(json.loads(text))
+    except (TypeError, json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Invalid analysis response: {e}") from e
+
+    tags = [tag.strip().strip('#').strip() for tag in analysis.tags]
+    return {
+        "summary": analysis.summary.strip(),
+        "tags": [tag for tag in tags if tag][:MAX_TAGS]
+    }
+
+
+def prompt_version_key(combined: bool) -> str:
+    """AI 結果キャッシュのキーに使うプロンプトのバージョン"""
+    return f"{PROMPT_VERSION}:{'combined' if combined else 'separate'}"
+
+
+def combined_call_enabled() -> bool:
+    """AI_COMBINED_CALL=false で要約・タグを別々に2回呼び出す"""
+    return os.getenv("AI_COMBINED_CALL", "true").lower() in ("1", "true", "yes")
+
+
+def require_api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable is required")
+    return api_key
+
+
+def client_options(base_url: str = None) -> Dict[str, Any]:
+    """OpenAI クライアントの引数
+
+    base_url（または OPENAI_BASE_URL）を指定した場合は OpenAI 互換のサーバー
+    （src/backend/mock_openai_server.py など）に接続し、API キーは無くてもよい。
+    リトライはゲートウェイで行うため、クライアント自身のリトライは無効にする。
+    """
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    if base_url:
+        return {
+            "api_key": os.getenv("OPENAI_API_KEY") or "not-needed",
+            "base_url": base_url,
+            "max_retries": 0,
+        }
+    return {"api_key": require_api_key(), "max_retries": 0}
+
+
+def message_text(response) -> str:
+    """chat.completions の応答の本文"""
+    return response.choices[0].message.content
+
+
+def record_error(stage: str, message: str) -> None:
+    """エラー・フォールバックを出力し、/metrics の回数に数える"""
+    print(message)
+    ai_errors.inc(stage)
+
+
+class BaseAIProcessor:
+    """AIProcessor（同期版）と AsyncAIProcessor（非同期版）に共通の部分
+
+    設定、API リクエストの組み立て、応答の解釈、失敗時の結果と AI 結果キャッシュを持ち、
+    LLM を呼び出すメソッドはそれぞれのクラスが実装する。
+    keyword_extractor を渡すと tag_strategy（fallback / race）に従って
+    LLM の代わりにローカルのキーワード抽出でタグを返せる。
+    race ではタグだけを時間切れにするため、1回呼び出し (combined) の設定でも
+    要約とタグを別々に呼び出す（要約は LLM を待つ）。
+    ローカル抽出のタグを含む結果は AI 結果キャッシュに保存しない。
+    LLM の呼び出しはすべてゲートウェイ（レート制限・同時実行数・リトライ）を経由する。
+    """
+
+    gateway_class = AIGateway
+
+    def __init__(self, client, combined: bool = None, cache: AIResultCache = None,
+                 keyword_extractor: Optional[KeywordExtractor] = None,
+                 tag_strategy: str = None):
+        if not isinstance(client, AIGateway):
+            client = self.gateway_class(client)
+        self.client = client
+        # True の場合、要約とタグを1回の JSON 応答で生成する
+        self.combined = combined_call_enabled() if combined is None else combined
+        self.model = MODEL
+        # 同じ本文の再処理で LLM を呼ばないための結果キャッシュ（AI_CACHE_PATH=none で無効）
+        self.cache = cache or get_ai_cache()
+        self.long_memo_tokens = AI_LONG_MEMO_TOKENS
+        self.chunk_tokens = AI_CHUNK_TOKENS
+        self.map_concurrency = AI_MAP_CONCURRENCY
+        self.keyword_extractor = keyword_extractor
+        tag_strategy = (tag_strategy or AI_TAG_STRATEGY).lower()
+        if tag_strategy not in TAG_STRATEGIES:
+            raise ValueError(f"Unknown tag strategy: {tag_strategy}")
+        # ローカル抽出が無ければ LLM のみ
+        self.tag_strategy = tag_strategy if keyword_extractor is not None else "llm"
+        self.tag_budget = AI_TAG_BUDGET_MS / 1000
+        if self.tag_strategy == "race" and self.combined:
+            # 1回呼び出しでは要約とタグが同じ応答のため、タグだけを時間切れにできない
+            warnings.warn("AI_TAG_STRATEGY=race uses separate summary and tag calls; "
+                          "AI_COMBINED_CALL=true is ignored", stacklevel=3)
+            self.combined = False
+
+    @property
+    def prompt_version(self) -> str:
+        """キャッシュキーに使うプロンプトのバージョン（呼び出し方式ごとに別）"""
+        return prompt_version_key(self.combined)
+
+    def cached_result(self, content: str) -> Optional[Dict[str, Any]]:
+        """AI 結果キャッシュにある結果（無ければ None）
+
+        1回呼び出しと2回呼び出しのプロンプトの結果は同等とみなし、自分の方式に無ければ
+        もう一方の方式のエントリも使う（ストリーミングのプレビューは2回呼び出しのプロンプトで作るため、
+        1回呼び出しの設定でもプレビュー後の保存で LLM を呼ばずに済む）。
+        """
+        if self.cache is None:
+            return None
+        for version in (self.prompt_version, prompt_version_key(not self.combined)):
+            cached = self.cache.get(content, version, self.model)
+            if cached is not None:
+                return cached
+        return None
+
+    def is_long_memo(self, content: str) -> bool:
+        """長文モード（map-reduce）で処理するメモか"""
+        return count_tokens(content, self.model) > self.long_memo_tokens
+
+    def is_cacheable(self, result: Dict[str, Any]) -> bool:
+        """要約・タグとも LLM で生成できた結果だけをキャッシュする"""
+        return (
+            self.cache is not None
+            and bool(result["summary"])
+            and result["summary"] != SUMMARY_ERROR
+            and result.get("tags_source", "llm") == "llm"
+        )
+
+    def local_tags(self, content: str) -> List[str]:
+        """LLM を使わずにコーパスの TF-IDF でタグを抽出する"""
+        return self.keyword_extractor.extract(content, MAX_TAGS)
+
+    def _cached_process_result(self, content: str,
+                               start: float) -> Optional[Dict[str, Any]]:
+        """process_memo の最初に AI 結果キャッシュを引く（ヒットした場合は時間を記録）"""
+        cached = self.cached_result(content)
+        if cached is not None:
+            ai_memo_seconds.observe(time.perf_counter() - start, "cache")
+        return cached
+
+    def _finish_process(self, content: str, result: Dict[str, Any],
+                        start: float) -> Dict[str, Any]:
+        """LLM で処理した結果の時間とタグの取得元を記録し、キャッシュできる結果は保存する"""
+        ai_memo_seconds.observe(time.perf_counter() - start, "llm")
+        ai_tag_sources.inc(result.get("tags_source", "llm"))
+        if self.is_cacheable(result):
+            self.cache.set(content, self.prompt_version, self.model, result)
+        return result
+
+    def _request(self, prompt: str, max_tokens: int, **options) -> Dict[str, Any]:
+        """chat.completions.create の引数"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.3,
+            **options
+        }
+
+    def _chunk_summary_request(self, chunk: str, index: int,
+                               total: int) -> Dict[str, Any]:
+        return self._request(chunk_summary_prompt(chunk, index, total), max_tokens=200)
+
+    def _summary_request(self, content: str, **options) -> Dict[str, Any]:
+        return self._request(summary_prompt(content), max_tokens=100, **options)
+
+    def _tags_request(self, content: str) -> Dict[str, Any]:
+        return self._request(tags_prompt(content), max_tokens=100)
+
+    def _analysis_request(self, content: str) -> Dict[str, Any]:
+        return self._request(
+            analysis_prompt(content), max_tokens=200,
+            response_format={"type": "json_object"},
+        )
+
+    def _use_local_tags(self) -> bool:
+        """LLM のタグ抽出に失敗したときローカル抽出で代替するか"""
+        return self.tag_strategy != "llm"
+
+    def _tags_failed(self, error: Exception) -> None:
+        """LLM のタグ抽出の失敗（race の時間切れを含む）を記録"""
+        if isinstance(error, (FuturesTimeoutError, asyncio.TimeoutError)):
+            record_error(
+                "tags_timeout",
+                f"Tag extraction exceeded {self.tag_budget:.1f}s, using local keywords",
             )
-            
-            # レスポンスからタグを抽出
-            tags_text = response.choices[0].message.content.strip()
-            # カンマや改行で区切られたタグをリストに変換
-            tags = [tag.strip().strip('*').strip('-').strip() for tag in tags_text.split('\n') if tag.strip()]
-            tags = [tag for tag in tags if tag and len(tag) > 0]
-            
-            return tags[:5]  # 最大5個まで
+        else:
+            record_error("tags", f"Error extracting tags: {error}")
+
+    @staticmethod
+    def _analysis_failed(error: Exception) -> bool:
+        """1回呼び出しの失敗を記録し、2回呼び出しでやり直すか（応答が壊れている場合のみ）を返す"""
+        if isinstance(error, ValueError):
+            record_error("analysis_invalid",
+                         f"Falling back to separate summary/tag calls: {error}")
+            return True
+        record_error("analysis", f"Error analyzing memo: {error}")
+        return False
+
+    @staticmethod
+    def _error_result(tags: List[str], tags_source: str) -> Dict[str, Any]:
+        """LLM が使えなかった場合の結果（fallback / race ではタグだけローカル抽出で返す）"""
+        return {
+            "summary": SUMMARY_ERROR,
+            "tags": tags,
+            "tags_source": tags_source
+        }
+
+
+class AIProcessor(BaseAIProcessor):
+    """要約とタグの生成（openai.OpenAI、MCP サーバーなど同期の呼び出し元用）"""
+
+    gateway_class = AIGateway
+
+    def __init__(self, client=None, combined: bool = None, cache: AIResultCache = None,
+                 keyword_extractor: Optional[KeywordExtractor] = None,
+                 tag_strategy: str = None, base_url: str = None):
+        super().__init__(
+            client or openai.OpenAI(**client_options(base_url)),
+            combined, cache, keyword_extractor, tag_strategy
+        )
+
+    def _create(self, request: Dict[str, Any]):
+        """ゲートウェイ経由で chat.completions.create を呼び出す"""
+        return self.client.chat.completions.create(**request)
+
+    def summarize_chunk(self, chunk: str, index: int, total: int) -> str:
+        """長いメモの一部を要約する（失敗時は例外）"""
+        response = self._create(self._chunk_summary_request(chunk, index, total))
+        return message_text(response).strip()
+
+    def condense_memo(self, content: str) -> str:
+        """長いメモをチャンクに分けて並行に要約し、reduce 段の入力を作る (map)"""
+        chunks = chunk_text(content, self.chunk_tokens, self.model)
+        with ThreadPoolExecutor(max_workers=self.map_concurrency) as pool:
+            summaries = list(pool.map(
+                lambda args: self.summarize_chunk(*args),
+                [
+                    (chunk, index, len(chunks))
+                    for index, chunk in enumerate(chunks, start=1)
+                ]
+            ))
+        return join_chunk_summaries(summaries)
+
+    def summarize_memo(self, content: str) -> str:
+        """メモの内容を要約する"""
+        try:
+            response = self._create(self._summary_request(content))
+            return message_text(response).strip()
+        except Exception as e:
+            record_error("summary", f"Error summarizing memo: {e}")
+            return SUMMARY_ERROR
+
+    def extract_tags(self, content: str) -> List[str]:
+        """メモの内容からタグを抽出する"""
+        return self._extract_tags(content)[0]
+
+    def _llm_tags(self, content: str) -> List[str]:
+        """LLM でタグを抽出する（失敗時は例外）"""
+        response = self._create(self._tags_request(content))
+        return parse_tags(message_text(response))
+
+    def _extract_tags(self, content: str) -> Tuple[List[str], str]:
+        """(タグ, 取得元) を返す。取得元は llm / local / none（失敗してタグ無し）"""
+        try:
+            if self.tag_strategy == "race":
+                future = _tag_race_pool.submit(self._llm_tags, content)
+                return future.result(timeout=self.tag_budget), "llm"
+            return self._llm_tags(content), "llm"
         except Exception as e:
-            print(f"Error extracting tags: {e}")
-            return []
-    
+            self._tags_failed(e)
+        return self._fallback_tags(content)
+
+    def _fallback_tags(self, content: str) -> Tuple[List[str], str]:
+        if not self._use_local_tags():
+            return [], "none"
+        return self.local_tags(content), "local"
+
+    def analyze_memo(self, content: str) -> Dict[str, Any]:
+        """要約とタグを1回の呼び出しで生成する
+
+        応答は JSON で受け取り MemoAnalysis で検証する。
+        JSON として解釈できない・スキーマに合わない場合は ValueError を送出する。
+        """
+        response = self._create(self._analysis_request(content))
+        return parse_analysis(message_text(response))
+
     def process_memo(self, content: str) -> Dict[str, Any]:
-        """メモの内容を処理して要約とタグを生成する"""
+        """メモの内容を処理して要約とタグを生成する（同じ本文の結果はキャッシュから返す）"""
+        start = time.perf_counter()
+        cached = self._cached_process_result(content, start)
+        if cached is not None:
+            return cached
+        return self._finish_process(content, self._process_memo(content), start)
+
+    def _process_memo(self, content: str) -> Dict[str, Any]:
+        if self.is_long_memo(content):
+            # 長文はチャンク要約をまとめたものから最終的な要約・タグを作る (reduce)
+            try:
+                content = self.condense_memo(content)
+            except Exception as e:
+                record_error("long_memo", f"Error summarizing long memo: {e}")
+                return self._error_result(*self._fallback_tags(content))
+
+        if self.combined:
+            try:
+                return {**self.analyze_memo(content), "tags_source": "llm"}
+            except Exception as e:
+                if not self._analysis_failed(e):
+                    return self._error_result(*self._fallback_tags(content))
+
         summary = self.summarize_memo(content)
-        tags = self.extract_tags(content)
-        
+        tags, tags_source = self._extract_tags(content)
+
+        return {
+            "summary": summary,
+            "tags": tags,
+            "tags_source": tags_source
+        }
+
+
+class AsyncAIProcessor(BaseAIProcessor):
+    """要約とタグの生成の非同期版（openai.AsyncOpenAI）
+
+    API サーバーの起動時に1つだけ作成し、クライアントの HTTP コネクションプールを
+    全リクエストで共有する。LLM の待ち時間中もイベントループを塞がず、
+    2回呼び出しが必要な場合は要約とタグを並行して取得する。
+    """
+
+    gateway_class = AsyncAIGateway
+
+    def __init__(self, client=None, combined: bool = None, cache: AIResultCache = None,
+                 keyword_extractor: Optional[KeywordExtractor] = None,
+                 tag_strategy: str = None, base_url: str = None):
+        super().__init__(
+            client or openai.AsyncOpenAI(**client_options(base_url)),
+            combined, cache, keyword_extractor, tag_strategy
+        )
+
+    async def close(self) -> None:
+        """HTTP コネクションプールを閉じる"""
+        await self.client.close()
+
+    async def _create(self, request: Dict[str, Any]):
+        """ゲートウェイ経由で chat.completions.create を呼び出す"""
+        return await self.client.chat.completions.create(**request)
+
+    async def summarize_chunk(self, chunk: str, index: int, total: int) -> str:
+        """長いメモの一部を要約する（失敗時は例外）"""
+        response = await self._create(self._chunk_summary_request(chunk, index, total))
+        return message_text(response).strip()
+
+    async def condense_memo(self, content: str) -> str:
+        """長いメモをチャンクに分けて並行に要約し、reduce 段の入力を作る (map)"""
+        chunks = chunk_text(content, self.chunk_tokens, self.model)
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+
+        async def summarize(chunk: str, index: int) -> str:
+            async with semaphore:
+                return await self.summarize_chunk(chunk, index, len(chunks))
+
+        summaries = await asyncio.gather(*(
+            summarize(chunk, index) for index, chunk in enumerate(chunks, start=1)
+        ))
+        return join_chunk_summaries(summaries)
+
+    async def stream_memo(self,
+                          content: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """要約をトークンごとに返し、最後にタグと計測値を返す（プレビューの逐次表示用）
+
+        (イベント名, データ) を yield する:
+          token: 要約の差分 {"text"}
+          tags:  タグ {"tags"}
+          done:  {"summary", "tags", "tags_source", "cached", "ttft_ms", "total_ms"}
+          error: {"detail"}
+        タグは要約のストリーミングと並行して取得する。
+        結果は2回呼び出しのプロンプトのキーでキャッシュし、プレビュー後の保存では
+        process_memo が cached_result でこれを使う（LLM を呼ばない）。
+        """
+        start = time.perf_counter()
+        cached = self.cached_result(content)
+        if cached is not None:
+            ttft_ms = (time.perf_counter() - start) * 1000
+            yield "token", {"text": cached["summary"]}
+            yield "tags", {"tags": cached["tags"]}
+            yield "done", {
+                **cached, "cached": True, "ttft_ms": ttft_ms, "total_ms": ttft_ms
+            }
+            return
+
+        prompt_content = content
+        if self.is_long_memo(content):
+            # 長文はチャンク要約 (map) を待ってから、まとめの要約をストリーミングする
+            try:
+                prompt_content = await self.condense_memo(content)
+            except Exception as e:
+                record_error("long_memo", f"Error summarizing long memo: {e}")
+                yield "error", {"detail": f"AI 処理エラー: {str(e)}"}
+                return
+
+        tags_task = asyncio.create_task(self._extract_tags(prompt_content))
+        try:
+            parts = []
+            ttft_ms = None
+            try:
+                stream = await self.client.chat.completions.create(
+                    **self._summary_request(prompt_content, stream=True)
+                )
+                async for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - start) * 1000
+                    parts.append(chunk.choices[0].delta.content)
+                    yield "token", {"text": chunk.choices[0].delta.content}
+            except Exception as e:
+                record_error("stream", f"Error streaming summary: {e}")
+                yield "error", {"detail": f"AI 処理エラー: {str(e)}"}
+                return
+
+            tags, tags_source = await tags_task
+            yield "tags", {"tags": tags}
+        finally:
+            # クライアントが途中で切断した場合もタグの呼び出しを残さない
+            tags_task.cancel()
+
+        result = {
+            "summary": "".join(parts).strip(), "tags": tags, "tags_source": tags_source
+        }
+        if self.is_cacheable(result):
+            # 要約・タグは summary_prompt / tags_prompt で作ったため、2回呼び出しのキーで保存する
+            self.cache.set(content, prompt_version_key(False), self.model, result)
+        yield "done", {
+            **result,
+            "cached": False,
+            "ttft_ms": ttft_ms,
+            "total_ms": (time.perf_counter() - start) * 1000
+        }
+
+    async def summarize_memo(self, content: str) -> str:
+        """メモの内容を要約する"""
+        try:
+            response = await self._create(self._summary_request(content))
+            return message_text(response).strip()
+        except Exception as e:
+            record_error("summary", f"Error summarizing memo: {e}")
+            return SUMMARY_ERROR
+
+    async def extract_tags(self, content: str) -> List[str]:
+        """メモの内容からタグを抽出する"""
+        return (await self._extract_tags(content))[0]
+
+    async def _llm_tags(self, content: str) -> List[str]:
+        response = await self._create(self._tags_request(content))
+        return parse_tags(message_text(response))
+
+    async def _extract_tags(self, content: str) -> Tuple[List[str], str]:
+        try:
+            if self.tag_strategy == "race":
+                tags = await asyncio.wait_for(self._llm_tags(content), self.tag_budget)
+                return tags, "llm"
+            return await self._llm_tags(content), "llm"
+        except Exception as e:
+            self._tags_failed(e)
+        return await self._fallback_tags(content)
+
+    async def _fallback_tags(self, content: str) -> Tuple[List[str], str]:
+        if not self._use_local_tags():
+            return [], "none"
+        # 初回のコーパス読み込みがあるためスレッドで実行
+        return await asyncio.to_thread(self.local_tags, content), "local"
+
+    async def analyze_memo(self, content: str) -> Dict[str, Any]:
+        """要約とタグを1回の呼び出しで生成する（不正な応答は ValueError）"""
+        response = await self._create(self._analysis_request(content))
+        return parse_analysis(message_text(response))
+
+    async def process_memo(self, content: str) -> Dict[str, Any]:
+        """メモの内容を処理して要約とタグを生成する（同じ本文の結果はキャッシュから返す）"""
+        start = time.perf_counter()
+        cached = self._cached_process_result(content, start)
+        if cached is not None:
+            return cached
+        return self._finish_process(content, await self._process_memo(content), start)
+
+    async def _process_memo(self, content: str) -> Dict[str, Any]:
+        if self.is_long_memo(content):
+            try:
+                content = await self.condense_memo(content)
+            except Exception as e:
+                record_error("long_memo", f"Error summarizing long memo: {e}")
+                return self._error_result(*await self._fallback_tags(content))
+
+        if self.combined:
+            try:
+                return {**await self.analyze_memo(content), "tags_source": "llm"}
+            except Exception as e:
+                if not self._analysis_failed(e):
+                    return self._error_result(*await self._fallback_tags(content))
+
+        # 要約とタグは互いに依存しないため並行して呼び出す
+        summary, (tags, tags_source) = await asyncio.gather(
+            self.summarize_memo(content),
+            self._extract_tags(content),
+        )
         return {
             "summary": summary,
-            "tags": tags
-        } 
+            "tags": tags,
+            "tags_source": tags_source
+        }
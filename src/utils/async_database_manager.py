@@ -0,0 +1,147 @@
+from typing import List, Dict, Any, Optional, Sequence
+from src.models.database import AsyncSessionLocal, async_engine
+from src.utils.database_manager import DatabaseManager
+from src.utils.metrics import instrument_engine
+
+
+class AsyncDatabaseManager:
+    """DatabaseManager の非同期版（SQLAlchemy AsyncEngine + aiosqlite）
+
+    クエリの実装は DatabaseManager のセッションを受け取るメソッドを共有し、
+    AsyncSession.run_sync で非同期ドライバ上のコネクションに対して実行する。
+    DB の待ち時間中もイベントループを塞がないため、遅い検索があっても
+    /health など他のリクエストは処理を続けられる。
+    """
+
+    def __init__(self, db_manager: DatabaseManager = None):
+        # スキーマ・検索インデックスの初期化は同期版に任せる（起動時に1回だけ）
+        self._db_manager = db_manager or DatabaseManager()
+        instrument_engine(async_engine.sync_engine)
+        self.search_index = self._db_manager.search_index
+        self.cache = self._db_manager.cache
+        self.keyword_extractor = self._db_manager.keyword_extractor
+        self.event_feed = self._db_manager.event_feed
+
+    async def _run(self, fn, *args, **kwargs):
+        """非同期セッションを開いて実装メソッドを実行"""
+        async with AsyncSessionLocal() as session:
+            try:
+                return await session.run_sync(fn, *args, **kwargs)
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def create_memo(self, title: str, content: str, tags: List[str] = None,
+                          summary: str = None, enrich: bool = False) -> Dict[str, Any]:
+        """メモを作成（enrich=True の場合は AI 処理のジョブを同じトランザクションで登録）"""
+        return await self._run(
+            self._db_manager._create_memo, title, content, tags, summary, enrich
+        )
+
+    async def create_memos_bulk(self, memos: List[Dict[str, Any]],
+                                batch_size: int = 1000,
+                                enrich: bool = False) -> List[str]:
+        """メモをまとめて作成し、作成したメモIDを入力順に返す"""
+        return await self._run(
+            self._db_manager._create_memos_bulk, memos, batch_size, enrich
+        )
+
+    async def get_memo(self, memo_id: str) -> Optional[Dict[str, Any]]:
+        """メモを取得"""
+        return await self._run(self._db_manager._get_memo, memo_id)
+
+    async def get_memos(self, memo_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """複数のメモをまとめて取得（memo_ids と同じ順で、見つからないメモは None）"""
+        return await self._run(self._db_manager._get_memos, memo_ids)
+
+    async def list_memos(self, limit: int = 100, offset: int = 0, cursor: str = None,
+                         fields: Sequence[str] = None,
+                         preview: int = None) -> List[Dict[str, Any]]:
+        """すべてのメモを取得"""
+        page = await self.list_memos_page(
+            limit=limit, offset=offset, cursor=cursor, fields=fields, preview=preview
+        )
+        return page["memos"]
+
+    async def list_memos_page(self, limit: int = 100, offset: int = 0,
+                              cursor: str = None, fields: Sequence[str] = None,
+                              preview: int = None) -> Dict[str, Any]:
+        """メモを1ページ取得（キーセットページング）"""
+        return await self._run(
+            self._db_manager._list_memos_page, limit, offset, cursor, fields, preview
+        )
+
+    async def update_memo(self, memo_id: str, title: str = None, content: str = None,
+                          tags: List[str] = None,
+                          summary: str = None) -> Optional[Dict[str, Any]]:
+        """メモを更新"""
+        return await self._run(
+            self._db_manager._update_memo, memo_id, title, content, tags, summary
+        )
+
+    async def delete_memo(self, memo_id: str) -> bool:
+        """メモを削除"""
+        return await self._run(self._db_manager._delete_memo, memo_id)
+
+    async def search_memos(self, query: str, limit: int = 50,
+                           fields: Sequence[str] = None,
+                           preview: int = None) -> List[Dict[str, Any]]:
+        """メモを検索"""
+        return await self._run(
+            self._db_manager._search_memos, query, limit, fields, preview
+        )
+
+    async def get_memos_by_tag(self, tag_name: str, limit: int = 50,
+                               fields: Sequence[str] = None,
+                               preview: int = None) -> List[Dict[str, Any]]:
+        """タグでメモを検索"""
+        return await self._run(
+            self._db_manager._get_memos_by_tag, tag_name, limit, fields, preview
+        )
+
+    async def get_all_tags(self) -> List[str]:
+        """すべてのタグを取得"""
+        return await self._run(self._db_manager._get_all_tags)
+
+    async def get_memo_count(self) -> int:
+        """メモの総数を取得"""
+        return await self._run(self._db_manager._get_memo_count)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """読み取りキャッシュのヒット/ミス/追い出し数"""
+        return self.cache.stats()
+
+    async def claim_enrichment_job(self) -> Optional[Dict[str, Any]]:
+        """AI 処理のジョブを1件取り出す（無ければ None）"""
+        return await self._run(self._db_manager._claim_enrichment_job)
+
+    async def complete_enrichment_job(self, job_id: int, memo_id: str,
+                                      summary: Optional[str], tags: List[str]) -> None:
+        """AI の要約・タグをメモに反映し、ジョブを完了にする"""
+        return await self._run(
+            self._db_manager._complete_enrichment_job, job_id, memo_id, summary, tags
+        )
+
+    async def fail_enrichment_job(self, job_id: int, memo_id: str, attempts: int,
+                                  error: str) -> str:
+        """ジョブの失敗を記録（再実行するなら queued、上限に達したら failed を返す）"""
+        return await self._run(
+            self._db_manager._fail_enrichment_job, job_id, memo_id, attempts, error
+        )
+
+    async def release_enrichment_job(self, job_id: int) -> None:
+        """処理を中断したジョブを実行待ちに戻す"""
+        return await self._run(self._db_manager._release_enrichment_job, job_id)
+
+    async def get_enrichment_status(self, memo_id: str) -> Optional[Dict[str, Any]]:
+        """メモの AI 処理の状態（メモが無ければ None）"""
+        return await self._run(self._db_manager._get_enrichment_status, memo_id)
+
+    async def get_data_version(self) -> str:
+        """メモ・タグのデータのバージョン（書き込みのたびに変わる、ETag 用）"""
+        return await self._run(self._db_manager._get_data_version)
+
+    async def get_events(self, after_id: Optional[int],
+                         limit: int = 500) -> Dict[str, Any]:
+        """after_id より後の変更イベント（古い順、保持期間外なら reset=True）"""
+        return await self._run(self._db_manager._get_events, after_id, limit)
@@ -0,0 +1,338 @@
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import orjson
+
+# キャッシュ未登録を表す値（None もキャッシュ対象にするため）
+MISS = object()
+
+
+def cache_key(*values) -> str:
+    """引数の値からキャッシュキーを作成"""
+    return json.dumps(list(values), ensure_ascii=False, default=str)
+
+
+class CacheBackend:
+    """キャッシュの保存先インターフェース
+
+    エントリは (namespace, key) で管理し、namespace 単位でまとめて無効化できる。
+    """
+
+    evictions = 0
+
+    def get(self, namespace: str, key: str) -> Any:
+        """値を取得（無い・期限切れの場合は MISS）"""
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, namespace: str, key: str = None) -> None:
+        """key を省略すると namespace 全体を無効化"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """プロセス内の LRU + TTL キャッシュ"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[(namespace, key)]
+                return MISS
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[(namespace, key)] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace: str, key: str = None) -> None:
+        with self._lock:
+            if key is not None:
+                self._entries.pop((namespace, key), None)
+                return
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """SQLite ファイルを使う共有キャッシュ
+
+    複数の uvicorn ワーカーや MCP サーバーから同じファイルを参照すれば、
+    どのプロセスの書き込みによる無効化も全プロセスに反映される。
+    値は orjson で保存するため、datetime は ISO 8601 の文字列として読み出される。
+    """
+
+    def __init__(self, path: str, max_entries: int = 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, last_access REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_cache_entries_last_access "
+            "ON cache_entries (last_access)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """スレッドごとのコネクション（autocommit）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = OFF")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Any:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries "
+            "WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None:
+            return MISS
+        now = time.time()
+        if row[1] < now:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+            return MISS
+        conn.execute(
+            "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+            (now, namespace, key),
+        )
+        return orjson.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries "
+            "(namespace, key, value, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, orjson.dumps(value).decode(), now + ttl, now),
+        )
+        evicted = conn.execute(
+            "DELETE FROM cache_entries WHERE rowid IN ("
+            "SELECT rowid FROM cache_entries ORDER BY last_access "
+            "LIMIT max(0, (SELECT COUNT(*) FROM cache_entries) - ?))",
+            (self.max_entries,),
+        ).rowcount
+        self.evictions += max(evicted, 0)
+
+    def invalidate(self, namespace: str, key: str = None) -> None:
+        conn = self._connect()
+        if key is not None:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+        else:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM cache_entries")
+
+
+class QueryCache:
+    """DatabaseManager の読み取り結果キャッシュ（read-through）
+
+    書き込み側が該当エントリを無効化する前提で、別プロセス（MCP サーバーなど）
+    による更新は読み取りのたびに DB のデータバージョンを確認して反映する。
+    TTL はデータバージョンを進めない変更を取りこぼした場合の上限として働く。
+    backend が None の場合は常に読み込み関数を呼ぶ（キャッシュ無効）。
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # 最後に確認した DB のデータバージョン (epoch, version)
+        self.data_version: Optional[Tuple[str, int]] = None
+        # 無効化のたびに進む世代（読み込み中に書き込みがあったかの判定用）
+        self.generation = 0
+        self._version_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get(self, namespace: str, key: str) -> Any:
+        """キャッシュにあれば値、無ければ MISS を返す（ヒット/ミスを数える）"""
+        if self.backend is None:
+            return MISS
+        value = self.backend.get(namespace, key)
+        if value is MISS:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        if self.backend is not None:
+            self.backend.set(namespace, key, value, self.ttl)
+
+    def get_or_load(self, namespace: str, key: str, loader: Callable[[], Any],
+                    sync: Callable[[], Any] = None) -> Any:
+        """キャッシュにあれば返し、無ければ loader の結果を保存して返す
+
+        sync はキャッシュを引く前と読み込みの後に呼ばれ、DB のデータバージョンを
+        observe_version に渡す。他プロセスの書き込みで進んでいれば全エントリを捨て、
+        読み込み中に進んだ場合は読み込んだ値を保存しない。
+        """
+        if self.backend is None:
+            return loader()
+        if sync is not None:
+            sync()
+        value = self.get(namespace, key)
+        if value is not MISS:
+            return value
+        generation = self.generation
+        value = loader()
+        if sync is not None:
+            sync()
+        self.fill(namespace, {key: value}, generation)
+        return value
+
+    def fill(self, namespace: str, entries: Dict[str, Any], generation: int) -> None:
+        """読み込み前に取った generation 以降に無効化が無ければ entries を保存する
+
+        読み込み中にコミットされた書き込みの無効化より後に、
+        書き込み前の値を保存してしまうのを防ぐ。
+        """
+        if self.backend is None or self.generation != generation:
+            return
+        for key, value in entries.items():
+            self.backend.set(namespace, key, value, self.ttl)
+        # 保存の途中で無効化された場合は保存した分を消す
+        if self.generation != generation:
+            for key in entries:
+                self.backend.invalidate(namespace, key)
+
+    def invalidate(self, namespace: str, key: str = None) -> None:
+        if self.backend is not None:
+            self._advance_generation()
+            self.backend.invalidate(namespace, key)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self._advance_generation()
+            self.backend.clear()
+
+    def _advance_generation(self) -> None:
+        with self._version_lock:
+            self.generation += 1
+
+    def observe_version(self, epoch: str, version: int,
+                        local_write: bool = False) -> None:
+        """DB のデータバージョンを通知し、他プロセスの書き込みで進んでいれば全エントリを捨てる
+
+        自プロセスの書き込み (local_write=True) で1つだけ進んだ場合は、
+        書き込み側が該当エントリを無効化済みのため捨てない。
+        ETag（データバージョン）と古いキャッシュの本文が組み合わさるのを防ぐ。
+        """
+        with self._version_lock:
+            last = self.data_version
+            if last is not None and last[0] == epoch:
+                if version <= last[1]:
+                    return
+                if local_write and version == last[1] + 1:
+                    self.data_version = (epoch, version)
+                    return
+            self.data_version = (epoch, version)
+        self.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """ヒット/ミス/追い出しのカウンタ"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions if self.backend else 0,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def create_query_cache() -> QueryCache:
+    """環境変数からキャッシュを作成
+
+    CACHE_BACKEND: memory (既定) / sqlite / none
+    """
+    backend_name = os.getenv("CACHE_BACKEND", "memory")
+    max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    ttl = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+
+    if backend_name == "memory":
+        backend = MemoryCacheBackend(max_entries=max_entries)
+    elif backend_name == "sqlite":
+        backend = SQLiteCacheBackend(
+            os.getenv("CACHE_PATH", "./memo_cache.db"), max_entries=max_entries
+        )
+    elif backend_name == "none":
+        backend = None
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend_name}")
+    return QueryCache(backend, ttl=ttl)
+
+
+def cached(namespace: str):
+    """セッションを受け取る実装メソッドの結果を self.cache に載せるデコレーター
+
+    キーはセッション以外の引数（既定値を含む）から作るため、
+    無効化するときは cache_key(引数...) で同じキーを指定できる。
+    他プロセスの書き込みは self._check_data_version(db) で確認する。
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(self, db, *args, **kwargs):
+            bound = signature.bind(self, db, *args, **kwargs)
+            bound.apply_defaults()
+            key = cache_key(*list(bound.arguments.values())[2:])
+            return self.cache.get_or_load(
+                namespace, key, lambda: fn(self, db, *args, **kwargs),
+                sync=lambda: self._check_data_version(db),
+            )
+
+        return wrapper
+
+    return decorator
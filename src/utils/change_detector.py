@@ -0,0 +1,100 @@
+import os
+import re
+import threading
+from typing import Any, Dict, Set
+from src.utils.text_tokenizer import normalize_text
+
+# これ以上本文が変わった場合だけ AI で再処理する（1 - 類似度、0〜1）
+AI_CHANGE_THRESHOLD = float(os.getenv("AI_CHANGE_THRESHOLD", "0.1"))
+# 変わった文字数がこれ未満なら再処理しない（短いメモの誤字修正で割合だけが大きくなるため）
+AI_CHANGE_MIN_CHARS = int(os.getenv("AI_CHANGE_MIN_CHARS", "4"))
+
+# 類似度の計算に使う文字 shingle の長さ
+SHINGLE_SIZE = 3
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    """正規化して空白の連続を1つにまとめる"""
+    return WHITESPACE_RE.sub(" ", normalize_text(text or "")).strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """正規化したテキストの文字 n-gram の集合（分かち書きの無い日本語にも使える）"""
+    text = _normalize(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def content_similarity(old: str, new: str) -> float:
+    """2つの本文の類似度（shingle の Jaccard 係数、同一なら 1.0）"""
+    old_shingles, new_shingles = shingles(old or ""), shingles(new or "")
+    if not old_shingles and not new_shingles:
+        return 1.0
+    return len(old_shingles & new_shingles) / len(old_shingles | new_shingles)
+
+
+def changed_chars(old: str, new: str) -> int:
+    """正規化した本文で、共通の先頭・末尾を除いて変わった文字数
+
+    1か所の編集なら正確な文字数、離れた複数か所の編集なら多めに数える。
+    """
+    old, new = _normalize(old), _normalize(new)
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return max(len(old), len(new)) - prefix - suffix
+
+
+class EnrichmentGate:
+    """本文の更新で AI の要約・タグを作り直すかを判定する
+
+    誤字の修正など小さな変更では LLM を呼ばず、既存の要約とタグを残す。
+    短いメモでは1文字の修正でも変更の割合が大きくなるため、変わった文字数が
+    min_chars（本文の半分の方が小さければそちら）未満の変更も小さいとみなす。
+    判定結果の回数（再処理 / スキップ）を数える。
+    """
+
+    def __init__(self, threshold: float = AI_CHANGE_THRESHOLD,
+                 min_chars: int = AI_CHANGE_MIN_CHARS):
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self.rerun = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def should_reprocess(self, old_content: str, new_content: str) -> bool:
+        """変更の大きさ (1 - 類似度) が threshold 以上で、変わった文字数も十分なら True"""
+        reprocess = (
+            1.0 - content_similarity(old_content, new_content) >= self.threshold
+            and self._changed_enough(old_content, new_content)
+        )
+        with self._lock:
+            if reprocess:
+                self.rerun += 1
+            else:
+                self.skipped += 1
+        return reprocess
+
+    def _changed_enough(self, old_content: str, new_content: str) -> bool:
+        # 本文全体が min_chars より短い場合は、半分以上書き換えられていれば再処理する
+        longest = max(len(_normalize(old_content)), len(_normalize(new_content)))
+        required = min(self.min_chars, (longest + 1) // 2)
+        return changed_chars(old_content, new_content) >= required
+
+    def stats(self) -> Dict[str, Any]:
+        """再処理 / スキップの回数"""
+        total = self.rerun + self.skipped
+        return {
+            "threshold": self.threshold,
+            "min_chars": self.min_chars,
+            "rerun": self.rerun,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / total if total else 0.0,
+        }
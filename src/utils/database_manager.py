@@ -1,17 +1,62 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List, Dict, Any, Optional
+from sqlalchemy.orm import Session, selectinload, load_only
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import (
+    or_, and_, tuple_, bindparam, type_coerce, String, func, null, select, update
+)
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from datetime import datetime
+import base64
+import json
+import os
 import uuid
-from src.models.database import SessionLocal, Memo, Tag, init_db
+from src.models.database import (
+    SessionLocal, Memo, Tag, DataVersion, MEMO_FIELDS, memo_tags, init_db, engine,
+    insert_rows,
+)
+from src.utils.search_index import SearchIndex
+from src.utils.enrichment_queue import EnrichmentQueue
+from src.utils.event_feed import EventFeed
+from src.utils.keyword_extractor import KeywordExtractor
+from src.utils.cache import MISS, QueryCache, cached, cache_key, create_query_cache
+from src.utils.metrics import instrument_engine
 from contextlib import contextmanager
 
+# 一括インポートで1回の IN 検索に含めるタグ数（SQLite のパラメータ数上限対策）
+TAG_LOOKUP_CHUNK = 500
+
+# get_memos で一度に取得できるメモ数の上限
+BATCH_GET_MAX_IDS = int(os.getenv("BATCH_GET_MAX_IDS", "100"))
+
+# INSERT ... ON CONFLICT DO NOTHING を使える DB ごとの insert
+ON_CONFLICT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
 class DatabaseManager:
     """データベース操作を管理するクラス"""
     
-    def __init__(self):
+    def __init__(self, cache: QueryCache = None):
         # データベースの初期化
         init_db()
+        
+        # SQL 文の数・時間を /metrics 用に記録
+        instrument_engine(engine)
+        
+        # 全文検索インデックスの初期化
+        self.search_index = SearchIndex(engine)
+        self.search_index.init()
+        
+        # AI 要約・タグ付けのジョブキュー（メモと同じ DB に保存）
+        self.enrichment_queue = EnrichmentQueue()
+        
+        # メモの変更イベントのログ（/events の配信元、書き込みと同じトランザクションで記録）
+        self.event_feed = EventFeed()
+        
+        # LLM を使わないタグ抽出用の TF-IDF 統計（初回利用時に全メモから作り、以降は差分で更新）
+        self.keyword_extractor = KeywordExtractor(self._load_keyword_corpus)
+        
+        # 読み取りキャッシュ（get_memo / list_memos / get_all_tags / get_memo_count）
+        self.cache = cache or create_query_cache()
     
     @contextmanager
     def _get_session(self):
@@ -25,120 +70,667 @@ class DatabaseManager:
         finally:
             db.close()
     
-    def create_memo(self, title: str, content: str, tags: List[str] = None, summary: str = None) -> Dict[str, Any]:
-        """メモを作成"""
+    def _run(self, fn, *args, **kwargs):
+        """セッションを開いて実装メソッドを実行"""
         with self._get_session() as db:
-            memo_id = str(uuid.uuid4())
-            
-            # メモを作成
-            memo = Memo(
-                id=memo_id,
-                title=title,
-                content=content,
-                summary=summary,
-                status="draft"
-            )
-            
-            # タグを処理
-            if tags:
-                for tag_name in tags:
-                    tag = self._get_or_create_tag(db, tag_name)
-                    memo.tags.append(tag)
-            
-            db.add(memo)
-            db.commit()
-            db.refresh(memo)
-            
-            return memo.to_dict()
+            return fn(db, *args, **kwargs)
+    
+    def _load_keyword_corpus(self) -> Tuple[List[str], List[str]]:
+        """キーワード抽出の IDF 用に全メモの本文と全タグ名を読み込む"""
+        with self._get_session() as db:
+            documents = [
+                keyword_document(title, content)
+                for title, content in db.query(Memo.title, Memo.content)
+            ]
+            tags = [name for (name,) in db.query(Tag.name)]
+        return documents, tags
+    
+    def create_memo(self, title: str, content: str, tags: List[str] = None,
+                    summary: str = None, enrich: bool = False) -> Dict[str, Any]:
+        """メモを作成（enrich=True の場合は AI 処理のジョブを同じトランザクションで登録）"""
+        return self._run(self._create_memo, title, content, tags, summary, enrich)
+    
+    def create_memos_bulk(self, memos: List[Dict[str, Any]], batch_size: int = 1000,
+                          enrich: bool = False) -> List[str]:
+        """メモをまとめて作成し、作成したメモIDを入力順に返す
+        
+        各要素は title / content（必須）と tags / summary（任意）を持つ辞書。
+        batch_size 件ごとに1トランザクションで、メモ・memo_tags・検索インデックスを
+        executemany で書き込む。enrich=True の場合は AI 処理のジョブも登録する。
+        """
+        return self._run(self._create_memos_bulk, memos, batch_size, enrich)
     
     def get_memo(self, memo_id: str) -> Optional[Dict[str, Any]]:
         """メモを取得"""
-        with self._get_session() as db:
-            memo = db.query(Memo).filter(Memo.id == memo_id).first()
-            return memo.to_dict() if memo else None
+        return self._run(self._get_memo, memo_id)
     
-    def list_memos(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    def get_memos(self, memo_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """複数のメモをまとめて取得（memo_ids と同じ順で、見つからないメモは None）"""
+        return self._run(self._get_memos, memo_ids)
+    
+    def list_memos(self, limit: int = 100, offset: int = 0, cursor: str = None,
+                   fields: Sequence[str] = None,
+                   preview: int = None) -> List[Dict[str, Any]]:
         """すべてのメモを取得"""
-        with self._get_session() as db:
-            memos = db.query(Memo).order_by(Memo.updated_at.desc()).offset(offset).limit(limit).all()
-            return [memo.to_dict() for memo in memos]
+        return self.list_memos_page(
+            limit=limit, offset=offset, cursor=cursor, fields=fields, preview=preview
+        )["memos"]
+    
+    def list_memos_page(self, limit: int = 100, offset: int = 0, cursor: str = None,
+                        fields: Sequence[str] = None,
+                        preview: int = None) -> Dict[str, Any]:
+        """メモを1ページ取得（キーセットページング）
+        
+        (updated_at, id) の降順で並べ、cursor があればその直後から取得する。
+        offset は後方互換のため残しているが、深いページほど遅くなる。
+        次ページがある場合は next_cursor を返す。
+        fields を指定するとその項目だけを読み込み、preview を指定すると
+        content の先頭 preview 文字を "preview" として返す（一覧表示用）。
+        """
+        return self._run(self._list_memos_page, limit, offset, cursor, fields, preview)
     
     def update_memo(self, memo_id: str, title: str = None, content: str = None, 
                    tags: List[str] = None, summary: str = None) -> Optional[Dict[str, Any]]:
         """メモを更新"""
-        with self._get_session() as db:
-            memo = db.query(Memo).filter(Memo.id == memo_id).first()
-            if not memo:
-                return None
-            
-            # フィールドを更新
-            if title is not None:
-                memo.title = title
-            if content is not None:
-                memo.content = content
-            if summary is not None:
-                memo.summary = summary
-            
-            # タグを更新
-            if tags is not None:
-                memo.tags.clear()
-                for tag_name in tags:
-                    tag = self._get_or_create_tag(db, tag_name)
-                    memo.tags.append(tag)
-            
-            memo.updated_at = datetime.now()
-            db.commit()
-            db.refresh(memo)
-            
-            return memo.to_dict()
+        return self._run(self._update_memo, memo_id, title, content, tags, summary)
     
     def delete_memo(self, memo_id: str) -> bool:
         """メモを削除"""
-        with self._get_session() as db:
-            memo = db.query(Memo).filter(Memo.id == memo_id).first()
-            if not memo:
-                return False
-            
-            db.delete(memo)
-            db.commit()
-            return True
+        return self._run(self._delete_memo, memo_id)
     
-    def search_memos(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def search_memos(self, query: str, limit: int = 50, fields: Sequence[str] = None,
+                     preview: int = None) -> List[Dict[str, Any]]:
         """メモを検索"""
-        with self._get_session() as db:
-            # タイトル、内容、タグで検索
-            search_filter = or_(
-                Memo.title.ilike(f"%{query}%"),
-                Memo.content.ilike(f"%{query}%"),
-                Tag.name.ilike(f"%{query}%")
-            )
-            
-            memos = db.query(Memo).join(Memo.tags, isouter=True).filter(search_filter).distinct().order_by(Memo.updated_at.desc()).limit(limit).all()
-            return [memo.to_dict() for memo in memos]
+        return self._run(self._search_memos, query, limit, fields, preview)
     
-    def get_memos_by_tag(self, tag_name: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_memos_by_tag(self, tag_name: str, limit: int = 50,
+                         fields: Sequence[str] = None,
+                         preview: int = None) -> List[Dict[str, Any]]:
         """タグでメモを検索"""
-        with self._get_session() as db:
-            memos = db.query(Memo).join(Memo.tags).filter(Tag.name == tag_name).order_by(Memo.updated_at.desc()).limit(limit).all()
-            return [memo.to_dict() for memo in memos]
+        return self._run(self._get_memos_by_tag, tag_name, limit, fields, preview)
     
     def get_all_tags(self) -> List[str]:
         """すべてのタグを取得"""
-        with self._get_session() as db:
-            tags = db.query(Tag.name).all()
-            return [tag[0] for tag in tags]
+        return self._run(self._get_all_tags)
     
     def get_memo_count(self) -> int:
         """メモの総数を取得"""
-        with self._get_session() as db:
-            return db.query(Memo).count()
-    
-    def _get_or_create_tag(self, db: Session, tag_name: str) -> Tag:
-        """タグを取得または作成"""
-        tag = db.query(Tag).filter(Tag.name == tag_name).first()
-        if not tag:
-            tag = Tag(name=tag_name)
-            db.add(tag)
+        return self._run(self._get_memo_count)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """読み取りキャッシュのヒット/ミス/追い出し数"""
+        return self.cache.stats()
+    
+    def claim_enrichment_job(self) -> Optional[Dict[str, Any]]:
+        """AI 処理のジョブを1件取り出す（無ければ None）"""
+        return self._run(self._claim_enrichment_job)
+    
+    def complete_enrichment_job(self, job_id: int, memo_id: str, summary: Optional[str],
+                                tags: List[str]) -> None:
+        """AI の要約・タグをメモに反映し、ジョブを完了にする"""
+        return self._run(self._complete_enrichment_job, job_id, memo_id, summary, tags)
+    
+    def fail_enrichment_job(self, job_id: int, memo_id: str, attempts: int,
+                            error: str) -> str:
+        """ジョブの失敗を記録（再実行するなら queued、上限に達したら failed を返す）"""
+        return self._run(self._fail_enrichment_job, job_id, memo_id, attempts, error)
+    
+    def release_enrichment_job(self, job_id: int) -> None:
+        """処理を中断したジョブを実行待ちに戻す"""
+        return self._run(self._release_enrichment_job, job_id)
+    
+    def get_enrichment_status(self, memo_id: str) -> Optional[Dict[str, Any]]:
+        """メモの AI 処理の状態（メモが無ければ None）"""
+        return self._run(self._get_enrichment_status, memo_id)
+    
+    def get_data_version(self) -> str:
+        """メモ・タグのデータのバージョン（書き込みのたびに変わる、ETag 用）"""
+        return self._run(self._get_data_version)
+    
+    def get_events(self, after_id: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """after_id より後の変更イベント（古い順）
+
+        after_id が None なら空を返す。保持期間より前から再開しようとした場合は reset=True。
+        last_id は次回の after_id に使う。
+        """
+        return self._run(self._get_events, after_id, limit)
+    
+    # ---- セッションを受け取る実装（AsyncDatabaseManager と共有）----
+    
+    def _create_memo(self, db: Session, title: str, content: str,
+                     tags: List[str] = None, summary: str = None,
+                     enrich: bool = False) -> Dict[str, Any]:
+        memo_id = str(uuid.uuid4())
+        now = datetime.now()
+        
+        # メモを作成（タグ・検索インデックスも含めて1トランザクションで書き込む）
+        memo = Memo(
+            id=memo_id,
+            title=title,
+            content=content,
+            summary=summary,
+            status="draft",
+            enrichment_status="pending" if enrich else None,
+            created_at=now,
+            updated_at=now
+        )
+        
+        # タグを処理
+        if tags:
+            memo.tags = self._resolve_tags(db, tags)
+        
+        db.add(memo)
+        self.search_index.index_memo(db, memo)
+        if enrich:
+            db.flush()
+            self.enrichment_queue.enqueue(db, [memo_id])
+        result = memo.to_dict()
+        self._record_change(db, "created", [memo_id])
+        db.commit()
+        self.event_feed.notify()
+        
+        self.keyword_extractor.add_document(keyword_document(title, content))
+        self.keyword_extractor.add_tags(tags or [])
+        self._invalidate_cache(db, list_changed=True, count_changed=True)
+        return result
+    
+    def _create_memos_bulk(self, db: Session, memos: List[Dict[str, Any]],
+                           batch_size: int = 1000, enrich: bool = False) -> List[str]:
+        # 書き込みを始める前に全件を検証する（途中のバッチだけ保存されるのを防ぐ）
+        for index, item in enumerate(memos):
+            if not item.get("title") or not item.get("content"):
+                raise ValueError(f"{index + 1}件目: title と content は必須です")
+        
+        memo_ids = []
+        for start in range(0, len(memos), batch_size):
+            batch = memos[start:start + batch_size]
+            now = datetime.now()
+            
+            memo_rows = []
+            for item in batch:
+                memo_rows.append({
+                    "id": str(uuid.uuid4()),
+                    "title": item["title"],
+                    "content": item["content"],
+                    "summary": item.get("summary"),
+                    "status": "draft",
+                    "enrichment_status": "pending" if enrich else None,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            insert_rows(db, Memo.__table__, memo_rows)
+            
+            tag_ids = self._resolve_tag_ids(
+                db, [name for item in batch for name in (item.get("tags") or [])]
+            )
+            link_rows = [
+                {"memo_id": row["id"], "tag_id": tag_ids[name]}
+                for row, item in zip(memo_rows, batch)
+                for name in dict.fromkeys(item.get("tags") or [])
+                if name
+            ]
+            insert_rows(db, memo_tags, link_rows)
+            
+            self.search_index.index_memos_bulk(db, [
+                (
+                    row["id"], row["title"], row["content"], row["summary"],
+                    list(item.get("tags") or []),
+                )
+                for row, item in zip(memo_rows, batch)
+            ])
+            if enrich:
+                self.enrichment_queue.enqueue(db, [row["id"] for row in memo_rows])
+            self._record_change(db, "created", [row["id"] for row in memo_rows])
+            db.commit()
+            self.event_feed.notify()
+            memo_ids.extend(row["id"] for row in memo_rows)
+            for row, item in zip(memo_rows, batch):
+                document = keyword_document(row["title"], row["content"])
+                self.keyword_extractor.add_document(document)
+                self.keyword_extractor.add_tags(item.get("tags") or [])
+        
+        self._invalidate_cache(db, list_changed=True, count_changed=True)
+        return memo_ids
+    
+    @cached("memo")
+    def _get_memo(self, db: Session, memo_id: str) -> Optional[Dict[str, Any]]:
+        memo = (
+            db.query(Memo).options(selectinload(Memo.tags))
+            .filter(Memo.id == memo_id).first()
+        )
+        return memo.to_dict() if memo else None
+    
+    def _get_memos(self, db: Session,
+                   memo_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        if len(memo_ids) > BATCH_GET_MAX_IDS:
+            raise ValueError(f"一度に取得できるメモは {BATCH_GET_MAX_IDS} 件までです")
+        
+        # get_memo と同じキャッシュエントリを使い、キャッシュに無いメモだけを1回の IN 検索で読み込む
+        memos = {}
+        missing = []
+        if self.cache.enabled:
+            self._check_data_version(db)
+        generation = self.cache.generation
+        for memo_id in dict.fromkeys(memo_ids):
+            memo = self.cache.get("memo", cache_key(memo_id))
+            if memo is MISS:
+                missing.append(memo_id)
+            else:
+                memos[memo_id] = memo
+        
+        if missing:
+            rows = (
+                db.query(Memo).options(selectinload(Memo.tags))
+                .filter(Memo.id.in_(missing)).all()
+            )
+            loaded = {memo.id: memo.to_dict() for memo in rows}
+            for memo_id in missing:
+                memos[memo_id] = loaded.get(memo_id)
+            if self.cache.enabled:
+                self._check_data_version(db)
+            entries = {cache_key(memo_id): memos[memo_id] for memo_id in missing}
+            self.cache.fill("memo", entries, generation)
+        
+        return [memos[memo_id] for memo_id in memo_ids]
+    
+    @cached("memo_list")
+    def _list_memos_page(self, db: Session, limit: int = 100, offset: int = 0,
+                         cursor: str = None, fields: Sequence[str] = None,
+                         preview: int = None) -> Dict[str, Any]:
+        fields = normalize_fields(fields)
+        # DB に格納されたままの updated_at（カーソルとの比較を DB の表現でそろえるため）
+        updated_at_raw = type_coerce(Memo.updated_at, String).label("updated_at_raw")
+        query = self._memo_query(db, fields, preview, updated_at_raw)
+        
+        if cursor:
+            cursor_updated_at, cursor_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Memo.updated_at, Memo.id) < tuple_(
+                    bindparam("cursor_updated_at", cursor_updated_at, type_=String),
+                    bindparam("cursor_id", cursor_id, type_=String),
+                )
+            )
+        
+        query = query.order_by(Memo.updated_at.desc(), Memo.id.desc())
+        if offset and not cursor:
+            query = query.offset(offset)
+        rows = query.limit(limit).all()
+        
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1].updated_at_raw, rows[-1].Memo.id)
+        
+        return {
+            "memos": [self._row_to_dict(row, fields) for row in rows],
+            "next_cursor": next_cursor
+        }
+    
+    def _update_memo(self, db: Session, memo_id: str, title: str = None,
+                     content: str = None, tags: List[str] = None,
+                     summary: str = None) -> Optional[Dict[str, Any]]:
+        memo = (
+            db.query(Memo).options(selectinload(Memo.tags))
+            .filter(Memo.id == memo_id).first()
+        )
+        if not memo:
+            return None
+        old_document = keyword_document(memo.title, memo.content)
+        
+        # フィールドを更新
+        if title is not None:
+            memo.title = title
+        if content is not None:
+            memo.content = content
+        if summary is not None:
+            memo.summary = summary
+        
+        # タグを更新
+        if tags is not None:
+            memo.tags = self._resolve_tags(db, tags)
+        
+        memo.updated_at = datetime.now()
+        self.search_index.index_memo(db, memo)
+        result = memo.to_dict()
+        self._record_change(db, "updated", [memo_id])
+        db.commit()
+        self.event_feed.notify()
+        
+        new_document = keyword_document(result["title"], result["content"])
+        self.keyword_extractor.update_document(old_document, new_document)
+        self.keyword_extractor.add_tags(tags or [])
+        self._invalidate_cache(db, memo_id=memo_id, list_changed=True)
+        return result
+    
+    def _delete_memo(self, db: Session, memo_id: str) -> bool:
+        memo = db.query(Memo).filter(Memo.id == memo_id).first()
+        if not memo:
+            return False
+        
+        self.search_index.remove_memo(db, memo_id)
+        self.enrichment_queue.remove(db, memo_id)
+        old_document = keyword_document(memo.title, memo.content)
+        db.delete(memo)
+        self._record_change(db, "deleted", [memo_id])
+        db.commit()
+        self.event_feed.notify()
+        
+        self.keyword_extractor.remove_document(old_document)
+        self._invalidate_cache(
+            db, memo_id=memo_id, list_changed=True, count_changed=True
+        )
+        return True
+    
+    def _search_memos(self, db: Session, query: str, limit: int = 50,
+                      fields: Sequence[str] = None,
+                      preview: int = None) -> List[Dict[str, Any]]:
+        fields = normalize_fields(fields)
+        
+        # FTS5 インデックスで bm25 順に検索
+        if self.search_index.enabled:
+            memo_ids = self.search_index.search(db, query, limit)
+            if memo_ids is not None:
+                query = self._memo_query(db, fields, preview)
+                rows = query.filter(Memo.id.in_(memo_ids)).all()
+                rows_by_id = {row.Memo.id: row for row in rows}
+                return [
+                    self._row_to_dict(rows_by_id[memo_id], fields)
+                    for memo_id in memo_ids if memo_id in rows_by_id
+                ]
+        
+        # インデックスが使えない場合: タイトル、内容、タグで部分一致検索
+        search_filter = or_(
+            Memo.title.ilike(f"%{query}%"),
+            Memo.content.ilike(f"%{query}%"),
+            Tag.name.ilike(f"%{query}%")
+        )
+        
+        rows = (
+            self._memo_query(db, fields, preview)
+            .join(Memo.tags, isouter=True)
+            .filter(search_filter)
+            .distinct()
+            .order_by(Memo.updated_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [self._row_to_dict(row, fields) for row in rows]
+    
+    def _get_memos_by_tag(self, db: Session, tag_name: str, limit: int = 50,
+                          fields: Sequence[str] = None,
+                          preview: int = None) -> List[Dict[str, Any]]:
+        fields = normalize_fields(fields)
+        rows = (
+            self._memo_query(db, fields, preview)
+            .join(Memo.tags)
+            .filter(Tag.name == tag_name)
+            .order_by(Memo.updated_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [self._row_to_dict(row, fields) for row in rows]
+    
+    @cached("tags")
+    def _get_all_tags(self, db: Session) -> List[str]:
+        tags = db.query(Tag.name).all()
+        return [tag[0] for tag in tags]
+    
+    @cached("memo_count")
+    def _get_memo_count(self, db: Session) -> int:
+        return db.query(Memo).count()
+    
+    def _claim_enrichment_job(self, db: Session) -> Optional[Dict[str, Any]]:
+        job = self.enrichment_queue.claim(db)
+        db.commit()
+        return job
+    
+    def _complete_enrichment_job(self, db: Session, job_id: int, memo_id: str,
+                                 summary: Optional[str], tags: List[str]) -> None:
+        memo = (
+            db.query(Memo).options(selectinload(Memo.tags))
+            .filter(Memo.id == memo_id).first()
+        )
+        if not memo:
+            self.enrichment_queue.remove(db, memo_id)
             db.commit()
-            db.refresh(tag)
-        return tag 
\ No newline at end of file
+            return
+        
+        # ユーザーが付けたタグは残して AI のタグを追加する
+        # updated_at は変えない（一覧の並び順はユーザーの編集だけで決まる）
+        memo.summary = summary
+        memo.tags = self._resolve_tags(db, [tag.name for tag in memo.tags] + list(tags))
+        memo.enrichment_status = "done"
+        self.search_index.index_memo(db, memo)
+        self.enrichment_queue.complete(db, job_id)
+        self._record_change(db, "enriched", [memo_id])
+        db.commit()
+        self.event_feed.notify()
+        
+        self.keyword_extractor.add_tags(tags)
+        self._invalidate_cache(db, memo_id=memo_id, list_changed=True)
+    
+    def _fail_enrichment_job(self, db: Session, job_id: int, memo_id: str,
+                             attempts: int, error: str) -> str:
+        status = self.enrichment_queue.fail(db, job_id, attempts, error)
+        if status == "failed":
+            (
+                db.query(Memo).filter(Memo.id == memo_id)
+                .update({"enrichment_status": "failed"})
+            )
+            self._record_change(db, "enrichment_failed", [memo_id])
+        db.commit()
+        
+        if status == "failed":
+            self.event_feed.notify()
+            self._invalidate_cache(db, memo_id=memo_id, list_changed=True)
+        return status
+    
+    def _release_enrichment_job(self, db: Session, job_id: int) -> None:
+        self.enrichment_queue.release(db, job_id)
+        db.commit()
+    
+    def _get_enrichment_status(self, db: Session,
+                               memo_id: str) -> Optional[Dict[str, Any]]:
+        enrichment_status = (
+            db.query(Memo.enrichment_status).filter(Memo.id == memo_id).first()
+        )
+        if enrichment_status is None:
+            return None
+        return {
+            "memo_id": memo_id,
+            "enrichment_status": enrichment_status[0],
+            "job": self.enrichment_queue.get(db, memo_id)
+        }
+    
+    def _get_data_version(self, db: Session) -> str:
+        version = self._check_data_version(db)
+        if version is None:
+            return "0"
+        return f"{version[0]}-{version[1]}"
+    
+    def _check_data_version(self, db: Session) -> Optional[Tuple[str, int]]:
+        """DB のデータバージョンを読み、他プロセス（MCP サーバーなど）の書き込みで
+        進んでいれば読み取りキャッシュを捨てる"""
+        row = (
+            db.query(DataVersion.epoch, DataVersion.version)
+            .filter(DataVersion.id == 1).first()
+        )
+        if not row:
+            return None
+        self.cache.observe_version(row.epoch, row.version)
+        return row.epoch, row.version
+    
+    def _get_events(self, db: Session, after_id: Optional[int],
+                    limit: int = 500) -> Dict[str, Any]:
+        first_id, last_id = self.event_feed.bounds(db)
+        if after_id is None:
+            # 再開位置の指定が無ければ今後のイベントだけを返す
+            return {"events": [], "last_id": last_id, "reset": False}
+        # 指定位置の直後のイベントが既に削除されていれば、取りこぼしがあるため reset を返す
+        reset = after_id > last_id or (first_id is not None and after_id < first_id - 1)
+        if reset:
+            return {"events": [], "last_id": last_id, "reset": True}
+        events = self.event_feed.read(db, after_id, limit)
+        last_id = events[-1]["id"] if events else after_id
+        return {"events": events, "last_id": last_id, "reset": False}
+    
+    def _record_change(self, db: Session, event_type: str, memo_ids: List[str]) -> None:
+        """書き込みと同じトランザクションでデータのバージョンを上げ、変更イベントを記録する"""
+        row = db.execute(
+            update(DataVersion).where(DataVersion.id == 1)
+            .values(version=DataVersion.version + 1)
+            .returning(DataVersion.epoch, DataVersion.version)
+        ).first()
+        if row is not None:
+            # コミット後の _invalidate_cache で読み取りキャッシュに伝える
+            db.info.setdefault("data_versions", []).append((row.epoch, row.version))
+        self.event_feed.record(db, event_type, memo_ids)
+    
+    def _resolve_tags(self, db: Session, tag_names: List[str]) -> List[Tag]:
+        """タグ名のリストを Tag に変換（無いものはまとめて作成、コミットはしない）
+        
+        既存タグを1回の IN 検索で引き、足りない分だけ insert_ignore で追加してから
+        引き直す。別の書き込みが同じタグを同時に作成しても一意制約違反にはならず、
+        どちらかが作った行を使う。
+        """
+        names = list(dict.fromkeys(name for name in tag_names if name))
+        if not names:
+            return []
+        
+        existing = db.query(Tag).filter(Tag.name.in_(names)).all()
+        tags_by_name = {tag.name: tag for tag in existing}
+        missing = [name for name in names if name not in tags_by_name]
+        if missing:
+            rows = [{"name": name} for name in missing]
+            inserted = insert_ignore(db, Tag.__table__, rows, ["name"])
+            if inserted:
+                db.info["tags_created"] = True
+            for tag in db.query(Tag).filter(Tag.name.in_(missing)).all():
+                tags_by_name[tag.name] = tag
+        
+        return [tags_by_name[name] for name in names]
+    
+    def _resolve_tag_ids(self, db: Session, tag_names: List[str]) -> Dict[str, int]:
+        """タグ名 -> タグID の辞書（一括インポート用、ORM を通さず分割して問い合わせる）"""
+        names = list(dict.fromkeys(name for name in tag_names if name))
+        tag_ids = {}
+        for start in range(0, len(names), TAG_LOOKUP_CHUNK):
+            chunk = names[start:start + TAG_LOOKUP_CHUNK]
+            rows = [{"name": name} for name in chunk]
+            inserted = insert_ignore(db, Tag.__table__, rows, ["name"])
+            if inserted:
+                db.info["tags_created"] = True
+            lookup = select(Tag.name, Tag.id).where(Tag.name.in_(chunk))
+            tag_ids.update(db.execute(lookup).all())
+        return tag_ids
+    
+    def _memo_query(self, db: Session, fields: Optional[Tuple[str, ...]],
+                    preview: Optional[int], *columns):
+        """一覧用のクエリ（fields 以外の列は読み込まず、preview は SQL で切り出す）
+        
+        結果は常に Memo と追加列を持つ Row になる。
+        """
+        entities = [Memo, *columns]
+        if preview:
+            entities.append(func.substr(Memo.content, 1, preview).label("preview"))
+        else:
+            entities.append(null().label("preview"))
+        query = db.query(*entities)
+        
+        if fields is None:
+            return query.options(selectinload(Memo.tags))
+        columns = [getattr(Memo, name) for name in fields if name != "tags"]
+        query = query.options(load_only(*columns))
+        if "tags" in fields:
+            query = query.options(selectinload(Memo.tags))
+        return query
+    
+    @staticmethod
+    def _row_to_dict(row, fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        data = row.Memo.to_dict(fields)
+        if row.preview is not None:
+            data["preview"] = row.preview
+        return data
+    
+    def _invalidate_cache(self, db: Session, memo_id: str = None,
+                          list_changed: bool = False, count_changed: bool = False):
+        """コミット済みの書き込みが影響するキャッシュエントリだけを無効化"""
+        if memo_id is not None:
+            self.cache.invalidate("memo", cache_key(memo_id))
+        if list_changed:
+            self.cache.invalidate("memo_list")
+        if count_changed:
+            self.cache.invalidate("memo_count")
+        if db.info.pop("tags_created", False):
+            self.cache.invalidate("tags")
+        for epoch, version in db.info.pop("data_versions", []):
+            self.cache.observe_version(epoch, version, local_write=True)
+
+
+def keyword_document(title: str, content: str) -> str:
+    """キーワード抽出の文書頻度を数える単位（タイトル + 本文）"""
+    return f"{title}\n{content}"
+
+
+def encode_cursor(updated_at: str, memo_id: str) -> str:
+    """ページングカーソルを不透明な文字列にエンコード"""
+    raw = json.dumps([str(updated_at), memo_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """ページングカーソルをデコード（不正な値は ValueError）"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii"))
+        updated_at, memo_id = json.loads(raw)
+        return str(updated_at), str(memo_id)
+    except Exception:
+        raise ValueError("不正なカーソルです")
+
+
+def normalize_fields(fields: Optional[Sequence[str]]) -> Optional[Tuple[str, ...]]:
+    """fields を検証し、id を先頭に含むタプルにする（不明な項目は ValueError）"""
+    if fields is None:
+        return None
+    unknown = [name for name in fields if name not in MEMO_FIELDS]
+    if unknown:
+        raise ValueError(f"不明なフィールドです: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *fields]))
+
+
+def insert_ignore(db: Session, table, rows: List[Dict[str, Any]],
+                  index_elements: List[str]) -> int:
+    """一意制約 (index_elements) に衝突する行は無視して rows を追加し、追加した行数を返す
+    
+    SQLite / PostgreSQL は INSERT ... ON CONFLICT DO NOTHING の1文で追加する。
+    それ以外の DB では既存のキーを引いて無い行だけをセーブポイント内で1行ずつ追加し、
+    その間に別の書き込みが作成して一意制約違反になった行は飛ばす。
+    """
+    if not rows:
+        return 0
+    dialect_insert = ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(table).on_conflict_do_nothing(
+            index_elements=index_elements
+        )
+        return db.execute(statement.values(rows)).rowcount
+    
+    columns = [table.c[name] for name in index_elements]
+    keys = [tuple(row[name] for name in index_elements) for row in rows]
+    if len(columns) == 1:
+        condition = columns[0].in_([key[0] for key in keys])
+    else:
+        condition = tuple_(*columns).in_(keys)
+    existing = {tuple(row) for row in db.execute(select(*columns).where(condition))}
+    inserted = 0
+    for key, row in zip(keys, rows):
+        if key in existing:
+            continue
+        existing.add(key)
+        try:
+            with db.begin_nested():
+                db.execute(table.insert().values(row))
+        except IntegrityError:
+            continue
+        inserted += 1
+    return inserted
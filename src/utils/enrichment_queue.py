@@ -0,0 +1,231 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, select, update, delete, insert
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from src.models.database import EnrichmentJob
+from src.utils.ai_processor import SUMMARY_ERROR
+
+# ワーカー数・リトライ設定
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "2"))
+ENRICH_MAX_ATTEMPTS = int(os.getenv("ENRICH_MAX_ATTEMPTS", "5"))
+ENRICH_BACKOFF_SECONDS = float(os.getenv("ENRICH_BACKOFF_SECONDS", "2"))
+ENRICH_BACKOFF_MAX_SECONDS = float(os.getenv("ENRICH_BACKOFF_MAX_SECONDS", "300"))
+# 処理中のジョブを他のワーカーが再取得できるようになるまでの時間（ワーカーが落ちた場合の回収用）
+ENRICH_LEASE_SECONDS = float(os.getenv("ENRICH_LEASE_SECONDS", "300"))
+# 新しいジョブの通知が無い場合にキューを見に行く間隔
+ENRICH_POLL_INTERVAL = float(os.getenv("ENRICH_POLL_INTERVAL", "5"))
+
+jobs = EnrichmentJob.__table__
+
+
+def backoff_delay(attempts: int) -> float:
+    """attempts 回目の失敗後、次に実行するまでの秒数（指数バックオフ）"""
+    delay = ENRICH_BACKOFF_SECONDS * (2 ** (attempts - 1))
+    return min(delay, ENRICH_BACKOFF_MAX_SECONDS)
+
+
+class EnrichmentQueue:
+    """SQLite に保存する AI 処理のジョブキュー
+
+    ジョブはメモと同じトランザクションで enqueue するため、保存されたメモの
+    ジョブが失われることはない。memo_id は一意で、1つのメモに複数のジョブは作られない。
+    取り出しは条件付き UPDATE で行い、同じジョブを2つのワーカーが同時に処理することはない。
+    メソッドはセッションを受け取り、コミットは呼び出し側に任せる。
+    """
+
+    def enqueue(self, db: Session, memo_ids: List[str]) -> None:
+        """メモのジョブを追加（既にあるジョブは実行待ちに戻す）"""
+        if not memo_ids:
+            return
+        now = datetime.now()
+        existing = set(db.execute(
+            select(jobs.c.memo_id).where(jobs.c.memo_id.in_(memo_ids))
+        ).scalars())
+        new_ids = [
+            memo_id for memo_id in dict.fromkeys(memo_ids) if memo_id not in existing
+        ]
+        if new_ids:
+            db.execute(insert(jobs), [
+                {"memo_id": memo_id, "status": "queued", "attempts": 0,
+                 "next_run_at": now, "created_at": now, "updated_at": now}
+                for memo_id in new_ids
+            ])
+        if existing:
+            db.execute(
+                update(jobs).where(jobs.c.memo_id.in_(list(existing))).values(
+                    status="queued", attempts=0, next_run_at=now, locked_until=None,
+                    last_error=None, updated_at=now,
+                )
+            )
+
+    def claim(self, db: Session,
+              lease_seconds: float = ENRICH_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """実行可能なジョブを1件取り出して running にする（無ければ None）"""
+        now = datetime.now()
+        runnable = or_(
+            and_(jobs.c.status == "queued", jobs.c.next_run_at <= now),
+            and_(jobs.c.status == "running", jobs.c.locked_until < now),
+        )
+        while True:
+            row = db.execute(
+                select(jobs.c.id, jobs.c.memo_id, jobs.c.attempts)
+                .where(runnable).order_by(jobs.c.next_run_at).limit(1)
+            ).first()
+            if row is None:
+                return None
+            # 他のワーカーが先に取り出していれば 0 行になるので次の候補を探す
+            claimed = db.execute(
+                update(jobs).where(jobs.c.id == row.id, runnable).values(
+                    status="running",
+                    attempts=jobs.c.attempts + 1,
+                    locked_until=now + timedelta(seconds=lease_seconds),
+                    updated_at=now,
+                )
+            ).rowcount
+            if claimed:
+                return {
+                    "job_id": row.id,
+                    "memo_id": row.memo_id,
+                    "attempts": row.attempts + 1,
+                }
+
+    def complete(self, db: Session, job_id: int) -> None:
+        db.execute(
+            update(jobs).where(jobs.c.id == job_id).values(
+                status="done", locked_until=None, last_error=None,
+                updated_at=datetime.now(),
+            )
+        )
+
+    def fail(self, db: Session, job_id: int, attempts: int, error: str,
+             max_attempts: int = ENRICH_MAX_ATTEMPTS) -> str:
+        """失敗を記録し、上限未満ならバックオフ後に再実行する（更新後の status を返す）"""
+        now = datetime.now()
+        status = "queued" if attempts < max_attempts else "failed"
+        db.execute(
+            update(jobs).where(jobs.c.id == job_id).values(
+                status=status,
+                next_run_at=now + timedelta(seconds=backoff_delay(attempts)),
+                locked_until=None,
+                last_error=error[:1000],
+                updated_at=now,
+            )
+        )
+        return status
+
+    def release(self, db: Session, job_id: int) -> None:
+        """処理を中断したジョブを試行回数に数えずに実行待ちへ戻す（シャットダウン時）"""
+        now = datetime.now()
+        db.execute(
+            update(jobs).where(jobs.c.id == job_id, jobs.c.status == "running").values(
+                status="queued", attempts=jobs.c.attempts - 1, next_run_at=now,
+                locked_until=None, updated_at=now,
+            )
+        )
+
+    def remove(self, db: Session, memo_id: str) -> None:
+        db.execute(delete(jobs).where(jobs.c.memo_id == memo_id))
+
+    def get(self, db: Session, memo_id: str) -> Optional[Dict[str, Any]]:
+        row = db.execute(
+            select(
+                jobs.c.status, jobs.c.attempts, jobs.c.next_run_at, jobs.c.last_error,
+                jobs.c.updated_at,
+            ).where(jobs.c.memo_id == memo_id)
+        ).first()
+        if row is None:
+            return None
+        return {
+            "status": row.status,
+            "attempts": row.attempts,
+            "next_run_at": row.next_run_at.isoformat() if row.next_run_at else None,
+            "last_error": row.last_error,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+        }
+
+
+class EnrichmentWorkerPool:
+    """キューからジョブを取り出し、AI の要約・タグをメモに反映するワーカー群
+
+    API サーバーのイベントループ上で動く asyncio タスクで、db_manager には
+    AsyncDatabaseManager、ai_processor には AsyncAIProcessor を渡す。
+    """
+
+    def __init__(self, db_manager, ai_processor, workers: int = ENRICH_WORKERS,
+                 poll_interval: float = ENRICH_POLL_INTERVAL):
+        self.db_manager = db_manager
+        self.ai_processor = ai_processor
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """ワーカーを止める（処理中のジョブは実行待ちに戻る）"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """新しいジョブが追加されたことをワーカーに知らせる"""
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job = await self.db_manager.claim_enrichment_job()
+            except Exception as e:
+                print(f"Enrichment queue error: {e}")
+                job = None
+            if job is None:
+                await self._wait()
+                continue
+            try:
+                await self._process(job)
+            except asyncio.CancelledError:
+                release = self.db_manager.release_enrichment_job(job["job_id"])
+                await asyncio.shield(release)
+                raise
+            except Exception as e:
+                # 結果の書き込み自体の失敗（database is locked など）でワーカーを止めない
+                # ジョブはリースが切れた後に再び取り出される
+                print(f"Enrichment worker error ({job['memo_id']}): {e}")
+
+    async def _wait(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        try:
+            memo = await self.db_manager.get_memo(job["memo_id"])
+            if memo is None:
+                # 処理待ちの間に削除されたメモ（ジョブだけ片付ける）
+                await self.db_manager.complete_enrichment_job(
+                    job["job_id"], job["memo_id"], None, []
+                )
+                return
+            result = await self.ai_processor.process_memo(memo["content"])
+            if result["summary"] == SUMMARY_ERROR:
+                raise RuntimeError("AI 処理に失敗しました")
+            await self.db_manager.complete_enrichment_job(
+                job["job_id"], job["memo_id"], result["summary"], result["tags"]
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            status = await self.db_manager.fail_enrichment_job(
+                job["job_id"], job["memo_id"], job["attempts"], str(e)
+            )
+            print(
+                f"AI enrichment error ({job['memo_id']}, "
+                f"attempt {job['attempts']}, {status}): {e}"
+            )
@@ -0,0 +1,108 @@
+import asyncio
+import os
+from datetime import datetime
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.models.database import MemoEvent, insert_rows
+
+# 保持するイベント数（これより古いイベントから再開しようとしたクライアントには reset を送る）
+EVENT_LOG_MAX = int(os.getenv("EVENT_LOG_MAX", "1000"))
+# この回数の書き込みごとに古いイベントを削除する
+EVENT_PRUNE_EVERY = 100
+
+events = MemoEvent.__table__
+
+
+def event_to_dict(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "type": row.type,
+        "memo_id": row.memo_id,
+        "created_at": row.created_at.isoformat()
+    }
+
+
+class EventFeed:
+    """メモの変更イベントのログ（memo_events テーブル）
+
+    イベントはメモの書き込みと同じトランザクションで記録するため、別プロセス
+    （MCP サーバーなど）の書き込みも含めて取りこぼさない。
+    メソッドはセッションを受け取り、コミットは呼び出し側に任せる。
+    コミット後に notify を呼ぶと、同じプロセスのリスナー（/events の配信）にすぐ伝わる。
+    """
+
+    def __init__(self, max_events: int = EVENT_LOG_MAX):
+        self.max_events = max_events
+        self._listeners: List[Callable[[], None]] = []
+        self._writes = 0
+
+    def record(self, db: Session, event_type: str, memo_ids: List[str]) -> None:
+        """イベントを記録（bulk の場合も1文で書き込む）"""
+        if not memo_ids:
+            return
+        now = datetime.now()
+        insert_rows(db, events, [
+            {"type": event_type, "memo_id": memo_id, "created_at": now}
+            for memo_id in memo_ids
+        ])
+        self._writes += 1
+        if self._writes % EVENT_PRUNE_EVERY == 0:
+            self.prune(db)
+
+    def prune(self, db: Session) -> None:
+        """新しい max_events 件だけを残す"""
+        last_id = db.execute(select(func.max(events.c.id))).scalar()
+        if last_id is not None:
+            db.execute(delete(events).where(events.c.id <= last_id - self.max_events))
+
+    def bounds(self, db: Session) -> Tuple[Optional[int], int]:
+        """(保持している最も古いイベントの id, 最新のイベントの id)"""
+        first_id, last_id = db.execute(
+            select(func.min(events.c.id), func.max(events.c.id))
+        ).one()
+        return first_id, last_id or 0
+
+    def read(self, db: Session, after_id: int,
+             limit: int = 500) -> List[Dict[str, Any]]:
+        """after_id より後のイベントを古い順に返す"""
+        rows = db.execute(
+            select(events).where(events.c.id > after_id)
+            .order_by(events.c.id).limit(limit)
+        ).all()
+        return [event_to_dict(row) for row in rows]
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def notify(self) -> None:
+        """コミット後に呼び、新しいイベントがあることをリスナーに伝える"""
+        for listener in self._listeners:
+            listener()
+
+
+class EventNotifier:
+    """/events の各接続を新しいイベントの記録時に起こす（イベントループ側で使う）
+
+    EventFeed のリスナーとして登録する。どのスレッドから notify されてもよい。
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self._event = asyncio.Event()
+
+    def notify(self) -> None:
+        self.loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        # 待っている接続をすべて起こし、次の待機用に新しい Event を用意する
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    def current(self) -> asyncio.Event:
+        """イベントを読み込む前に取得しておき、読み込み後にこれを待つ（間の通知を取りこぼさない）"""
+        return self._event
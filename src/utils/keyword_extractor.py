@@ -0,0 +1,137 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Callable, Iterable, List, Optional, Tuple
+from src.utils.text_tokenizer import normalize_text
+
+# 日本語のキーワード候補: 漢字・カタカナの連続（ひらがな＝助詞や活用語尾などを区切りとみなす）
+JA_TERM_RE = re.compile(
+    "[\u3005\u3006\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+    "\u30a0-\u30ff\u31f0-\u31ff]{2,16}"
+)
+# 英語のキーワード候補: 英字で始まる単語
+EN_TERM_RE = re.compile(r"[a-z][a-z0-9+#.\-]*[a-z0-9+#]")
+
+EN_STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing done down during each few for from
+further get got had has have having he her here hers him his how i if in into is it its
+just let me more most my no nor not now of off on once only or other our out over own
+same she should so some such than that the their them then there these they this those
+through to too under until up us very was we were what when where which while who whom
+why will with would you your next new use used using make made via per etc
+""".split())
+
+# 既存タグと一致する語の重み（タグの表記ゆれを増やさないよう既存タグを優先する）
+TAG_BOOST = 1.5
+
+# (文書, タグ) を返すローダー（初回の抽出時に呼ぶ）
+DocumentLoader = Callable[[], Tuple[Iterable[str], Iterable[str]]]
+
+
+def extract_terms(text: str) -> List[str]:
+    """キーワード候補を出現順に列挙（日本語は漢字・カタカナ列、英語はストップワード以外の単語）"""
+    text = normalize_text(text)
+    terms = JA_TERM_RE.findall(text)
+    terms.extend(
+        word for word in EN_TERM_RE.findall(text)
+        if len(word) >= 3 and word not in EN_STOPWORDS
+    )
+    return terms
+
+
+class KeywordExtractor:
+    """メモのコーパスから IDF を作る TF-IDF キーワード抽出（LLM を使わないタグ候補）
+
+    IDF の元になる文書頻度はメモの作成・更新・削除に合わせて差分で更新する。
+    loader は初回の利用時に (全メモの本文の列, 全タグ名の列) を返す関数で、
+    それまでの差分更新は loader の結果に含まれるため無視する。
+    """
+
+    def __init__(self, loader: Optional[DocumentLoader] = None):
+        self._loader = loader
+        self._loaded = loader is None
+        self._lock = threading.Lock()
+        self.document_count = 0
+        self.document_frequency: Counter = Counter()
+        self.tags = set()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            documents, tags = self._loader()
+            for text in documents:
+                self._add(text, 1)
+            self.tags.update(normalize_text(tag) for tag in tags if tag)
+            self._loaded = True
+
+    def _add(self, text: str, sign: int) -> None:
+        terms = set(extract_terms(text))
+        self.document_count += sign
+        for term in terms:
+            self.document_frequency[term] += sign
+            if self.document_frequency[term] <= 0:
+                del self.document_frequency[term]
+
+    def add_document(self, text: str) -> None:
+        """メモの追加を IDF に反映"""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._add(text, 1)
+
+    def remove_document(self, text: str) -> None:
+        """メモの削除を IDF に反映"""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._add(text, -1)
+
+    def update_document(self, old_text: str, new_text: str) -> None:
+        """メモの更新を IDF に反映"""
+        if not self._loaded or old_text == new_text:
+            return
+        with self._lock:
+            self._add(old_text, -1)
+            self._add(new_text, 1)
+
+    def add_tags(self, tags: Iterable[str]) -> None:
+        """タグ辞書に追加（既存タグと一致する語を優先するため）"""
+        if not self._loaded:
+            return
+        with self._lock:
+            self.tags.update(normalize_text(tag) for tag in tags if tag)
+
+    def idf(self, term: str) -> float:
+        frequency = self.document_frequency.get(term, 0)
+        return math.log((self.document_count + 1) / (frequency + 1)) + 1.0
+
+    def extract(self, text: str, limit: int = 5) -> List[str]:
+        """TF-IDF の高い順にキーワードを返す"""
+        self._ensure_loaded()
+        counts = Counter(extract_terms(text))
+        normalized = normalize_text(text)
+        # 候補の切り出し方に合わない既存タグ（ひらがな混じりなど）も本文に含まれていれば候補にする
+        for tag in self.tags:
+            if len(tag) >= 2 and tag not in counts and tag in normalized:
+                counts[tag] = normalized.count(tag)
+
+        with self._lock:
+            scores = {
+                term: (1.0 + math.log(count)) * self.idf(term)
+                * (TAG_BOOST if term in self.tags else 1.0)
+                for term, count in counts.items()
+            }
+        # 互いに含み合う語（「会議」と「定例会議」など）はスコアの高い方だけ残す
+        keywords = []
+        for term in sorted(scores, key=lambda t: -scores[t]):
+            if any(term in chosen or chosen in term for chosen in keywords):
+                continue
+            keywords.append(term)
+            if len(keywords) >= limit:
+                break
+        return keywords
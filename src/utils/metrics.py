@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# false で HTTP リクエスト・SQL のメトリクスの記録を止める（オーバーヘッドの比較用）
+METRICS_ENABLED = (
+    os.getenv("METRICS_ENABLED", "true").lower() not in ("false", "0", "no")
+)
+
+# レイテンシ用のバケット（秒）
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+# 件数用のバケット（1リクエストあたりの SQL 文の数など）
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# (ラベル, 値) のリスト
+Samples = List[Tuple[Dict[str, str], float]]
+# (メトリクス名, 種類, 説明, サンプル)
+Family = Tuple[str, str, str, Samples]
+
+
+class Counter:
+    """ラベルごとに増えるだけのカウンタ
+
+    ラベルの値は labelnames と同じ順に位置引数で渡す: requests.inc("GET", "/memos", "200")
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> Family:
+        with self._lock:
+            values = list(self._values.items())
+        return self.name, self.type, self.help, [
+            (dict(zip(self.labelnames, labels)), value) for labels, value in values
+        ]
+
+
+class Histogram:
+    """ラベルごとの分布（バケットごとの件数・合計・件数）"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # ラベル -> [バケットごとの件数 (+Inf を含む)..., 合計]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def collect(self) -> Family:
+        with self._lock:
+            values = [(labels, list(counts)) for labels, counts in self._values.items()]
+        samples: Samples = []
+        for labels, counts in values:
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(({**base, "le": format_value(bound)}, cumulative))
+            samples.append(({**base, "__suffix__": "_sum"}, counts[-1]))
+            samples.append(({**base, "__suffix__": "_count"}, cumulative))
+        return self.name, self.type, self.help, samples
+
+
+class MetricsRegistry:
+    """プロセス内のメトリクスを集め、Prometheus のテキスト形式で出力する
+
+    Counter / Histogram は記録時に値を更新する。キャッシュの統計など既に他で数えているものは
+    add_collector で登録した関数を出力時に呼んで読み取る（記録時のコストが無い）。
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def _register(self, metric):
+        # モジュールの再読み込みなどで同じ名前が登録された場合は既存のものを使う
+        return self._metrics.setdefault(metric.name, metric)
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """出力時に呼ばれ、(名前, 種類, 説明, サンプル) を返す関数を登録"""
+        self._collectors.append(collector)
+
+    def collect(self) -> List[Family]:
+        families = [metric.collect() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        return families
+
+    def render(self) -> str:
+        """Prometheus のテキスト形式 (text/plain; version=0.0.4)"""
+        lines = []
+        for name, metric_type, help_text, samples in self.collect():
+            lines.append(f"# HELP {name} {escape_help(help_text)}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                suffix = labels.pop("__suffix__", "_bucket" if "le" in labels else "")
+                lines.append(
+                    f"{name}{suffix}{format_labels(labels)} {format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{escape_label(str(value))}"' for key, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def stats_families(prefix: str, help_subject: str, stats: Optional[Dict[str, Any]],
+                   counters: Sequence[str] = ("hits", "misses", "evictions"),
+                   gauges: Sequence[str] = ("hit_ratio",)) -> List[Family]:
+    """既存の stats() の辞書をメトリクスに変換（stats が None なら何も出さない）"""
+    if stats is None:
+        return []
+    families: List[Family] = []
+    for key in counters:
+        if key in stats:
+            families.append((
+                f"{prefix}_{key}_total", "counter", f"{help_subject}: {key}",
+                [({}, stats[key])],
+            ))
+    for key in gauges:
+        if key in stats:
+            families.append((
+                f"{prefix}_{key}", "gauge", f"{help_subject}: {key}", [({}, stats[key])]
+            ))
+    return families
+
+
+# プロセス共通のレジストリ
+registry = MetricsRegistry()
+
+
+# ---- SQL（SQLAlchemy のエンジンイベント）----
+
+db_statements = registry.counter(
+    "db_statements_total", "SQLAlchemy が発行した SQL 文の数", ["operation"]
+)
+db_statement_seconds = registry.histogram(
+    "db_statement_duration_seconds", "SQL 文1つの実行時間（秒）"
+)
+
+
+class RequestSQL:
+    """1リクエストの間に発行した SQL 文の数と合計時間"""
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# 処理中のリクエストの SQL 集計（AsyncSession.run_sync・asyncio.to_thread にも引き継がれる）
+current_request_sql: ContextVar[Optional[RequestSQL]] = ContextVar(
+    "current_request_sql", default=None
+)
+
+
+def statement_operation(statement: str) -> str:
+    """SQL 文の種類（SELECT / INSERT / ...）"""
+    head = statement.lstrip()[:8].split(None, 1)
+    return head[0].upper() if head else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None or not registry.enabled:
+        return
+    elapsed = time.perf_counter() - start
+    db_statements.inc(statement_operation(statement))
+    db_statement_seconds.observe(elapsed)
+    request_sql = current_request_sql.get()
+    if request_sql is not None:
+        request_sql.statements += 1
+        request_sql.seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """エンジンの SQL 文の数・時間を記録する（AsyncEngine の場合は sync_engine を渡す）"""
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
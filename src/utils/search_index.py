@@ -0,0 +1,232 @@
+import functools
+import os
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from src.utils.text_tokenizer import tokenize, tokenize_query
+
+# FTS5 仮想テーブル名（ngram モードでは n を付けたテーブルを別に持つ）
+FTS_TABLE = "memos_fts"
+
+# bm25 の列ごとの重み (title, content, summary, tags)
+BM25_WEIGHTS = (4.0, 1.0, 2.0, 3.0)
+
+# インデックス再構築時のバッチサイズ
+REBUILD_BATCH_SIZE = 1000
+
+# インデックスモード
+#   ngram:     CJK は文字 n-gram、英数字は単語単位でアプリ側がトークン化（日本語向け）
+#   unicode61: FTS5 標準の unicode61 トークナイザに任せる
+TOKENIZER_MODES = ("ngram", "unicode61")
+
+# 一括登録するメモ (memo_id, title, content, summary, tags)
+BulkDocument = Tuple[str, str, str, Optional[str], List[str]]
+
+
+class SearchIndex:
+    """SQLite FTS5 を使ったメモの全文検索インデックス
+
+    memos の title / content / summary / tags を FTS5 仮想テーブルにミラーし、
+    DatabaseManager の書き込みと同じトランザクション内で同期する。
+    FTS5 が使えない環境では enabled が False になり、呼び出し側は ILIKE 検索に戻る。
+    """
+
+    def __init__(self, engine: Engine, mode: str = None, ngram_size: int = None):
+        self.engine = engine
+        self.enabled = engine.dialect.name == "sqlite"
+        self.mode = mode or os.getenv("SEARCH_TOKENIZER", "ngram")
+        if self.mode not in TOKENIZER_MODES:
+            raise ValueError(
+                f"SEARCH_TOKENIZER must be one of {TOKENIZER_MODES}: {self.mode}"
+            )
+        self.ngram_size = ngram_size or int(os.getenv("SEARCH_NGRAM_SIZE", "2"))
+        if self.mode == "ngram":
+            self.table = f"{FTS_TABLE}_ngram{self.ngram_size}"
+        else:
+            self.table = FTS_TABLE
+        # FTS5 の rowid とメモIDの対応表（memos の rowid は VACUUM で変わり得るため）
+        self.ids_table = f"{self.table}_ids"
+
+    def init(self):
+        """仮想テーブルを作成し、未登録のメモがあればインデックスを再構築"""
+        if not self.enabled:
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                    "title, content, summary, tags, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                ))
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {self.ids_table} ("
+                    "rowid INTEGER PRIMARY KEY, memo_id TEXT NOT NULL UNIQUE)"
+                ))
+                indexed = conn.execute(
+                    text(f"SELECT COUNT(*) FROM {self.ids_table}")
+                ).scalar()
+                total = conn.execute(text("SELECT COUNT(*) FROM memos")).scalar()
+        except Exception as e:
+            print(f"FTS5 search index is unavailable, falling back to LIKE search: {e}")
+            self.enabled = False
+            return
+
+        if indexed != total:
+            with Session(bind=self.engine) as db:
+                self.rebuild(db)
+                db.commit()
+
+    def rebuild(self, db: Session):
+        """memos / tags からインデックスを作り直す"""
+        db.execute(text(f"DELETE FROM {self.table}"))
+        db.execute(text(f"DELETE FROM {self.ids_table}"))
+        db.execute(text(f"INSERT INTO {self.ids_table} (memo_id) SELECT id FROM memos"))
+        result = db.execute(text(
+            "SELECT i.rowid, m.title, m.content, m.summary, "
+            "(SELECT group_concat(t.name, ' ') FROM memo_tags mt "
+            "JOIN tags t ON t.id = mt.tag_id WHERE mt.memo_id = m.id) "
+            f"FROM memos m JOIN {self.ids_table} i ON i.memo_id = m.id"
+        ))
+        insert = text(
+            f"INSERT INTO {self.table} (rowid, title, content, summary, tags) "
+            "VALUES (:rowid, :title, :content, :summary, :tags)"
+        )
+        while True:
+            rows = result.fetchmany(REBUILD_BATCH_SIZE)
+            if not rows:
+                break
+            db.execute(insert, [
+                self._document(rowid, title, content, summary, (tags or "").split(" "))
+                for rowid, title, content, summary, tags in rows
+            ])
+
+    def index_memo(self, db: Session, memo) -> None:
+        """メモをインデックスに登録（既存エントリは置き換え）"""
+        if not self.enabled:
+            return
+        rowid = self._get_rowid(db, memo.id)
+        if rowid is None:
+            rowid = db.execute(
+                text(f"INSERT INTO {self.ids_table} (memo_id) VALUES (:memo_id)"),
+                {"memo_id": memo.id},
+            ).lastrowid
+        else:
+            db.execute(
+                text(f"DELETE FROM {self.table} WHERE rowid = :rowid"), {"rowid": rowid}
+            )
+
+        db.execute(
+            text(
+                f"INSERT INTO {self.table} (rowid, title, content, summary, tags) "
+                "VALUES (:rowid, :title, :content, :summary, :tags)"
+            ),
+            self._document(
+                rowid, memo.title, memo.content, memo.summary,
+                [tag.name for tag in memo.tags],
+            ),
+        )
+
+    def index_memos_bulk(self, db: Session, documents: List[BulkDocument]) -> None:
+        """新規メモをまとめて登録（一括インポート用）
+
+        documents は (memo_id, title, content, summary, tags) のリスト。
+        書き込みトランザクション内で呼ぶ前提で、rowid は現在の最大値から連番で割り当てる。
+        """
+        if not self.enabled or not documents:
+            return
+        max_rowid = db.execute(
+            text(f"SELECT COALESCE(MAX(rowid), 0) FROM {self.ids_table}")
+        ).scalar()
+        next_rowid = max_rowid + 1
+        rowids = range(next_rowid, next_rowid + len(documents))
+        # 件数が多いため SQLAlchemy のパラメータ処理を通さず DB-API の executemany に渡す
+        conn = db.connection()
+        conn.exec_driver_sql(
+            f"INSERT INTO {self.ids_table} (rowid, memo_id) VALUES (?, ?)",
+            [(rowid, doc[0]) for rowid, doc in zip(rowids, documents)],
+        )
+        conn.exec_driver_sql(
+            f"INSERT INTO {self.table} (rowid, title, content, summary, tags) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                tuple(self._document(rowid, *doc[1:]).values())
+                for rowid, doc in zip(rowids, documents)
+            ],
+        )
+
+    def remove_memo(self, db: Session, memo_id: str) -> None:
+        """メモをインデックスから削除"""
+        if not self.enabled:
+            return
+        rowid = self._get_rowid(db, memo_id)
+        if rowid is None:
+            return
+        params = {"rowid": rowid}
+        db.execute(text(f"DELETE FROM {self.table} WHERE rowid = :rowid"), params)
+        db.execute(text(f"DELETE FROM {self.ids_table} WHERE rowid = :rowid"), params)
+
+    def search(self, db: Session, query: str, limit: int = 50) -> Optional[List[str]]:
+        """bm25 順にマッチしたメモIDを返す（検索語が無い場合は None）"""
+        match = self.build_match_query(query)
+        if match is None:
+            return None
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        rows = db.execute(
+            text(
+                f"SELECT i.memo_id FROM {self.table} "
+                f"JOIN {self.ids_table} i ON i.rowid = {self.table}.rowid "
+                f"WHERE {self.table} MATCH :match "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        ).all()
+        return [row[0] for row in rows]
+
+    def build_match_query(self, query: str) -> Optional[str]:
+        """検索文字列を FTS5 の MATCH 式に変換（各語を AND 結合）"""
+        if self.mode == "ngram":
+            clauses = tokenize_query(query, self.ngram_size)
+        else:
+            clauses = [([term], True) for term in query.split()]
+        if not clauses:
+            return None
+        # FTS5 の構文文字を無効化するため、各フレーズをダブルクォートで囲む
+        return " ".join(
+            '"' + " ".join(tokens).replace('"', '""') + '"' + ("*" if prefix else "")
+            for tokens, prefix in clauses
+        )
+
+    def _document(self, rowid: int, title: str, content: str, summary: Optional[str],
+                  tags: List[str]) -> dict:
+        """FTS5 に登録する1行分のパラメータ"""
+        return {
+            "rowid": rowid,
+            "title": self._prepare(title),
+            "content": self._prepare(content),
+            "summary": self._prepare(summary or ""),
+            "tags": " ".join(self._prepare_tag(tag) for tag in tags if tag),
+        }
+
+    def _prepare_tag(self, tag: str) -> str:
+        """タグは同じ名前が繰り返し現れるため、トークン化の結果を再利用する"""
+        if self.mode == "ngram":
+            return _ngram_text(tag, self.ngram_size)
+        return tag
+
+    def _prepare(self, value: str) -> str:
+        """ngram モードではアプリ側でトークン化し、空白区切りで格納する"""
+        if self.mode == "ngram" and value:
+            return " ".join(tokenize(value, self.ngram_size))
+        return value
+
+    def _get_rowid(self, db: Session, memo_id: str) -> Optional[int]:
+        return db.execute(
+            text(f"SELECT rowid FROM {self.ids_table} WHERE memo_id = :memo_id"),
+            {"memo_id": memo_id},
+        ).scalar()
+
+
+@functools.lru_cache(maxsize=4096)
+def _ngram_text(value: str, n: int) -> str:
+    return " ".join(tokenize(value, n))
@@ -0,0 +1,91 @@
+import re
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:  # 未インストールの場合は文字数からの概算で数える
+    tiktoken = None
+
+# 段落・行の区切り（長いメモはできるだけここで分割する）
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+_encodings = {}
+
+
+def _encoding(model: str):
+    """モデルのエンコーディング（取得できなければ None）
+
+    tiktoken は初回に BPE ファイルをダウンロードするため、オフライン環境などで
+    失敗した場合は None を覚えておき、以降は文字数からの概算で数える。
+    """
+    if model not in _encodings:
+        try:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(
+                f"tiktoken encoding unavailable, estimating tokens from characters: {e}"
+            )
+            _encodings[model] = None
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """テキストのトークン数
+
+    tiktoken があれば正確に数え、無ければ（エンコーディングを取得できない場合も）
+    ASCII は4文字、それ以外（日本語など）は1文字を1トークンとして概算する
+    （多めに見積もる側）。
+    """
+    encoding = _encoding(model) if tiktoken is not None else None
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for c in text if c.isascii())
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def chunk_text(text: str, max_tokens: int, model: str = "gpt-4o-mini") -> List[str]:
+    """テキストを max_tokens 以下のチャンクに分割
+
+    段落 → 行 → 文字の順に区切りを探し、隣り合う断片はトークン数の上限まで
+    1つのチャンクにまとめる。
+    """
+    pieces = []
+    for paragraph in PARAGRAPH_RE.split(text):
+        if count_tokens(paragraph, model) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.split("\n"):
+            if count_tokens(line, model) <= max_tokens:
+                pieces.append(line)
+            else:
+                pieces.extend(_split_by_chars(line, max_tokens, model))
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        piece_tokens = count_tokens(piece, model)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _split_by_chars(text: str, max_tokens: int, model: str) -> List[str]:
+    """区切りの無い長い行を、トークン数が上限に収まる長さで切る"""
+    parts = []
+    while text:
+        # 1文字 = 1トークン以上とは限らないため、収まるまで長さを半分にして探す
+        size = max_tokens * 4
+        while size > 1 and count_tokens(text[:size], model) > max_tokens:
+            size //= 2
+        parts.append(text[:size])
+        text = text[size:]
+    return parts
@@ -0,0 +1,69 @@
+import re
+import unicodedata
+from typing import List, Tuple
+
+# 日本語などの分かち書きされない文字（ひらがな・カタカナ・漢字・ハングル）
+CJK_PATTERN = (
+    "\u3005\u3006"  # 々〆
+    "\u3040-\u309f"  # ひらがな
+    "\u30a0-\u30ff\u31f0-\u31ff"  # カタカナ
+    "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"  # 漢字
+    "\uac00-\ud7af"  # ハングル
+)
+
+# CJK の連続部分、またはそれ以外の英数字の連続部分を1つのランとして切り出す
+# （[^\W...] は「\w のうち CJK 以外」。文字ごとの否定先読みより速い）
+RUN_RE = re.compile(f"([{CJK_PATTERN}]+)|([^\\W{CJK_PATTERN}]+)")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC 正規化と小文字化（全角英数字・半角カナをそろえる）"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def split_runs(text: str) -> List[Tuple[str, bool]]:
+    """テキストを (ラン, CJKかどうか) のリストに分割"""
+    runs = []
+    for match in RUN_RE.finditer(normalize_text(text)):
+        cjk, word = match.groups()
+        if cjk:
+            runs.append((cjk, True))
+        else:
+            runs.append((word, False))
+    return runs
+
+
+def ngrams(run: str, n: int) -> List[str]:
+    """CJK ランを文字 n-gram に分割
+
+    末尾の n 文字未満の位置も短いグラムとして出力し、どの文字位置も
+    ちょうど1トークンの先頭になるようにする（短い検索語を前方一致で拾うため）。
+    """
+    return [run[i:i + n] for i in range(len(run))]
+
+
+def tokenize(text: str, n: int = 2) -> List[str]:
+    """インデックス用トークン列: CJK は n-gram、英数字は単語単位"""
+    tokens = []
+    # 一括インポートやインデックス再構築で大量に呼ばれるため split_runs を経由しない
+    for cjk, word in RUN_RE.findall(normalize_text(text)):
+        if cjk:
+            tokens += [cjk[i:i + n] for i in range(len(cjk))]
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def tokenize_query(query: str, n: int = 2) -> List[Tuple[List[str], bool]]:
+    """検索語を (フレーズを構成するトークン列, 前方一致かどうか) のリストに変換
+
+    - n 文字以上の CJK ラン: 連続する n-gram のフレーズ（部分文字列の完全一致）
+    - n 文字未満の CJK ラン / 英数字の単語: 1トークンの前方一致
+    """
+    clauses = []
+    for run, is_cjk in split_runs(query):
+        if is_cjk and len(run) >= n:
+            clauses.append(([run[i:i + n] for i in range(len(run) - n + 1)], False))
+        else:
+            clauses.append(([run], True))
+    return clauses
@@ -0,0 +1,26 @@
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# 一時 DB を使う（src のインポートより前に設定する）
+TMP_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP_DIR}/test.db"
+# AI 結果キャッシュのファイルを作らない
+os.environ["AI_CACHE_PATH"] = "none"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def client():
+    """API サーバーのテストクライアント（lifespan の MCP サーバー・AI ワーカーは起動しない）"""
+    from fastapi.testclient import TestClient
+    from src.backend.api_server import app
+    return TestClient(app)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
@@ -0,0 +1,112 @@
+"""AI 結果キャッシュ（本文のハッシュで要約・タグを保存する）のテスト"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.ai_cache import AIResultCache, content_hash
+from src.utils.ai_processor import AIProcessor, prompt_version_key
+
+RESULT = {"summary": "- 要約", "tags": ["会議"], "tags_source": "llm"}
+
+
+def response(content: str):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeClient:
+    """呼び出し回数を数える chat.completions.create の代用品（fail_tags でタグの呼び出しを失敗させる）"""
+
+    def __init__(self, fail_tags: bool = False):
+        self.fail_tags = fail_tags
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **request):
+        self.calls += 1
+        if "response_format" in request:
+            return response(json.dumps({"summary": "- 要約", "tags": ["会議"]}))
+        if "metadata extractor" in request["messages"][0]["content"]:
+            if self.fail_tags:
+                raise RuntimeError("upstream 500")
+            return response("会議")
+        return response("- 要約")
+
+
+class FakeKeywordExtractor:
+    def extract(self, content, limit):
+        return ["ローカル"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AIResultCache(str(tmp_path / "ai_cache.db"))
+
+
+def test_content_hash_ignores_line_endings_and_trailing_spaces():
+    normalized = content_hash("本文\n続き", "1", "model")
+    assert content_hash("本文  \r\n続き\n", "1", "model") == normalized
+    assert content_hash("本文", "1", "model") != content_hash("本文", "2", "model")
+    assert content_hash("本文", "1", "model") != content_hash("本文", "1", "other-model")
+
+
+def test_cache_round_trip_counts_hits_and_misses(cache):
+    assert cache.get("本文", "1", "model") is None
+
+    cache.set("本文", "1", "model", RESULT)
+
+    assert cache.get("本文", "1", "model") == RESULT
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_cache_is_shared_through_the_file(cache):
+    cache.set("本文", "1", "model", RESULT)
+
+    assert AIResultCache(cache.path).get("本文", "1", "model") == RESULT
+
+
+def test_cache_evicts_least_recently_used(cache):
+    cache.max_entries = 2
+    cache.set("a", "1", "model", RESULT)
+    cache.set("b", "1", "model", RESULT)
+    cache.get("a", "1", "model")
+
+    cache.set("c", "1", "model", RESULT)
+
+    assert cache.get("b", "1", "model") is None
+    assert cache.get("a", "1", "model") == RESULT
+    assert cache.evictions == 1
+
+
+def test_processor_reuses_cached_result(cache):
+    client = FakeClient()
+    ai = AIProcessor(client=client, combined=True, cache=cache, tag_strategy="llm")
+
+    first = ai.process_memo("同じ本文")
+    second = ai.process_memo("同じ本文\n")
+
+    assert first == second == RESULT
+    assert client.calls == 1
+
+
+def test_processor_uses_result_of_other_call_mode(cache):
+    # ストリーミングのプレビュー（2回呼び出しのプロンプト）の結果を、1回呼び出しの保存で使う
+    client = FakeClient()
+    ai = AIProcessor(client=client, combined=True, cache=cache, tag_strategy="llm")
+    cache.set("プレビュー済み", prompt_version_key(False), ai.model, RESULT)
+
+    assert ai.process_memo("プレビュー済み") == RESULT
+    assert client.calls == 0
+
+
+def test_processor_does_not_cache_local_tags(cache):
+    client = FakeClient(fail_tags=True)
+    ai = AIProcessor(client=client, combined=False, cache=cache,
+                     keyword_extractor=FakeKeywordExtractor(), tag_strategy="fallback")
+
+    result = ai.process_memo("タグに失敗する本文")
+
+    assert result["tags_source"] == "local"
+    assert cache.get("タグに失敗する本文", ai.prompt_version, ai.model) is None
@@ -0,0 +1,178 @@
+"""AI ゲートウェイの同一リクエストのまとめ (singleflight)・キャンセル・同時実行数のテスト"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.ai_gateway import AsyncAIGateway
+
+
+class BlockingClient:
+    """release() が呼ばれるまで応答を返さない chat.completions.create の代用品"""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = 0
+        self.released = asyncio.Event()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **request):
+        self.calls += 1
+        await self.released.wait()
+        if self.error:
+            raise self.error
+        content = request["messages"][0]["content"]
+        message = SimpleNamespace(content=f"re: {content}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def release(self):
+        self.released.set()
+
+
+def request(content: str = "メモ"):
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": content}],
+        "max_tokens": 10,
+    }
+
+
+def gateway(client, max_in_flight: int = 0):
+    return AsyncAIGateway(
+        client, rpm=0, tpm=0, max_in_flight=max_in_flight, max_retries=0
+    )
+
+
+async def settle():
+    """起動したタスクが API 呼び出しまで進むのを待つ"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def content(response):
+    return response.choices[0].message.content
+
+
+def test_identical_requests_share_one_call():
+    async def main():
+        client = BlockingClient()
+        ai = gateway(client)
+        callers = [asyncio.create_task(ai.create(**request())) for _ in range(3)]
+        await settle()
+        client.release()
+        responses = await asyncio.gather(*callers)
+        return client, ai, responses
+
+    client, ai, responses = asyncio.run(main())
+
+    assert client.calls == 1
+    assert ai.coalesced == 2
+    assert [content(response) for response in responses] == ["re: メモ"] * 3
+
+
+def test_different_requests_are_sent_separately():
+    async def main():
+        client = BlockingClient()
+        ai = gateway(client)
+        callers = [
+            asyncio.create_task(ai.create(**request(f"メモ {i}"))) for i in range(3)
+        ]
+        await settle()
+        client.release()
+        await asyncio.gather(*callers)
+        return client, ai
+
+    client, ai = asyncio.run(main())
+
+    assert client.calls == 3
+    assert ai.coalesced == 0
+
+
+def test_request_after_completion_is_sent_again():
+    async def main():
+        client = BlockingClient()
+        client.release()
+        ai = gateway(client)
+        await ai.create(**request())
+        await ai.create(**request())
+        return client, ai
+
+    client, ai = asyncio.run(main())
+
+    assert client.calls == 2
+    assert ai._inflight == {}
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def main():
+        client = BlockingClient()
+        ai = gateway(client)
+        leader = asyncio.create_task(ai.create(**request()))
+        await settle()
+        follower = asyncio.create_task(ai.create(**request()))
+        await settle()
+        leader.cancel()
+        await settle()
+        client.release()
+        return client, leader, await follower
+
+    client, leader, response = asyncio.run(main())
+
+    assert leader.cancelled()
+    assert content(response) == "re: メモ"
+    assert client.calls == 1
+
+
+def test_leader_timeout_does_not_cancel_followers():
+    async def main():
+        client = BlockingClient()
+        ai = gateway(client)
+        leader = asyncio.create_task(
+            asyncio.wait_for(ai.create(**request()), timeout=0.05)
+        )
+        await settle()
+        follower = asyncio.create_task(ai.create(**request()))
+        with pytest.raises(asyncio.TimeoutError):
+            await leader
+        client.release()
+        return await follower
+
+    assert content(asyncio.run(main())) == "re: メモ"
+
+
+def test_error_is_shared_with_followers():
+    async def main():
+        client = BlockingClient(error=RuntimeError("upstream error"))
+        ai = gateway(client)
+        callers = [asyncio.create_task(ai.create(**request())) for _ in range(2)]
+        await settle()
+        client.release()
+        return client, await asyncio.gather(*callers, return_exceptions=True)
+
+    client, results = asyncio.run(main())
+
+    assert client.calls == 1
+    assert [str(result) for result in results] == ["upstream error"] * 2
+
+
+def test_in_flight_counts_upstream_calls_within_limit():
+    async def main():
+        client = BlockingClient()
+        ai = gateway(client, max_in_flight=2)
+        callers = [
+            asyncio.create_task(ai.create(**request(f"メモ {i}"))) for i in range(5)
+        ]
+        # 同じ本文の呼び出しは数えない
+        callers.append(asyncio.create_task(ai.create(**request("メモ 0"))))
+        await settle()
+        during = ai.stats()["in_flight"], client.calls
+        client.release()
+        await asyncio.gather(*callers)
+        return during, ai.stats()["in_flight"], client.calls
+
+    (in_flight, calls), after, total_calls = asyncio.run(main())
+
+    assert (in_flight, calls) == (2, 2)
+    assert after == 0
+    assert total_calls == 5
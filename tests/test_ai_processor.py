@@ -0,0 +1,115 @@
+"""AIProcessor の呼び出し方式とタグ抽出の戦略 (llm / fallback / race) のテスト"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.ai_processor import AIProcessor, AsyncAIProcessor
+
+
+def response(content: str):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeClient:
+    """プロンプトの種類ごとに決まった応答を返す chat.completions.create の代用品"""
+
+    def __init__(self, tag_delay: float = 0.0):
+        self.tag_delay = tag_delay
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **request):
+        prompt = request["messages"][0]["content"]
+        if "response_format" in request:
+            self.calls.append("analysis")
+            return response(json.dumps({"summary": "- 要約", "tags": ["会議"]}))
+        if "metadata extractor" in prompt:
+            self.calls.append("tags")
+            time.sleep(self.tag_delay)
+            return response("会議\n議事録")
+        self.calls.append("summary")
+        return response("- 要約")
+
+
+class FakeKeywordExtractor:
+    def extract(self, content, limit):
+        return ["ローカル"]
+
+
+def processor(client, tag_strategy, combined=True):
+    return AIProcessor(client=client, combined=combined,
+                       keyword_extractor=FakeKeywordExtractor(),
+                       tag_strategy=tag_strategy)
+
+
+def test_combined_call_by_default():
+    client = FakeClient()
+
+    result = processor(client, "llm").process_memo("本文")
+
+    assert client.calls == ["analysis"]
+    assert result == {"summary": "- 要約", "tags": ["会議"], "tags_source": "llm"}
+
+
+def test_race_uses_separate_tag_call_in_combined_mode():
+    client = FakeClient(tag_delay=0.5)
+    with pytest.warns(UserWarning, match="AI_TAG_STRATEGY=race"):
+        ai = processor(client, "race")
+    ai.tag_budget = 0.05
+
+    start = time.perf_counter()
+    result = ai.process_memo("本文")
+
+    # タグの呼び出しが時間切れになり、ローカル抽出のタグで返す
+    assert time.perf_counter() - start < 0.4
+    assert sorted(client.calls) == ["summary", "tags"]
+    assert result == {"summary": "- 要約", "tags": ["ローカル"], "tags_source": "local"}
+
+
+def test_race_within_budget_uses_llm_tags():
+    client = FakeClient()
+    ai = processor(client, "race", combined=False)
+
+    assert ai.process_memo("本文")["tags"] == ["会議", "議事録"]
+
+
+class AsyncFakeClient(FakeClient):
+    async def _create(self, **request):
+        prompt = request["messages"][0]["content"]
+        if "response_format" not in request and "metadata extractor" in prompt:
+            self.calls.append("tags")
+            await asyncio.sleep(self.tag_delay)
+            return response("会議\n議事録")
+        return FakeClient._create(self, **request)
+
+
+def test_async_processor_is_not_a_sync_processor():
+    # 同期版のメソッドを async で上書きしない（同期版として使えるかのように見せない）
+    assert not issubclass(AsyncAIProcessor, AIProcessor)
+
+
+@pytest.mark.parametrize(
+    "combined, calls", [(True, ["analysis"]), (False, ["summary", "tags"])]
+)
+def test_async_process_memo_matches_sync(combined, calls):
+    sync_result = processor(FakeClient(), "llm", combined=combined).process_memo("本文")
+    client = AsyncFakeClient()
+    ai = AsyncAIProcessor(client=client, combined=combined, tag_strategy="llm")
+
+    assert asyncio.run(ai.process_memo("本文")) == sync_result
+    assert sorted(client.calls) == calls
+
+
+def test_async_race_falls_back_to_local_tags():
+    ai = AsyncAIProcessor(client=AsyncFakeClient(tag_delay=0.5), combined=False,
+                          keyword_extractor=FakeKeywordExtractor(), tag_strategy="race")
+    ai.tag_budget = 0.05
+
+    result = asyncio.run(ai.process_memo("本文"))
+
+    assert (result["tags"], result["tags_source"]) == (["ローカル"], "local")
@@ -0,0 +1,53 @@
+"""複数メモの一括取得 (get_memos / POST /memos/batch-get) のテスト"""
+
+import pytest
+
+from src.utils.cache import QueryCache
+from src.utils.database_manager import BATCH_GET_MAX_IDS, DatabaseManager
+
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager(cache=QueryCache(None))
+
+
+@pytest.fixture
+def memo_ids(db_manager):
+    return [
+        db_manager.create_memo(
+            title=f"一括取得 {i}", content=f"本文 {i}", tags=[f"一括取得{i}"]
+        )["id"]
+        for i in range(3)
+    ]
+
+
+def test_get_memos_keeps_request_order_and_marks_missing(db_manager, memo_ids):
+    requested = [memo_ids[2], "missing", memo_ids[0], memo_ids[2]]
+
+    memos = db_manager.get_memos(requested)
+
+    expected = [memo_ids[2], None, memo_ids[0], memo_ids[2]]
+    assert [memo and memo["id"] for memo in memos] == expected
+    assert memos[0]["tags"] == ["一括取得2"]
+
+
+def test_get_memos_rejects_too_many_ids(db_manager):
+    with pytest.raises(ValueError):
+        db_manager.get_memos(["missing"] * (BATCH_GET_MAX_IDS + 1))
+
+
+def test_batch_get_endpoint(client, memo_ids):
+    ids = [memo_ids[1], "missing", memo_ids[0]]
+    response = client.post("/memos/batch-get", json={"ids": ids})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [memo["id"] for memo in body["memos"]] == ids
+    assert body["memos"][0]["title"] == "一括取得 1"
+    assert body["memos"][1] == {"id": "missing", "not_found": True}
+    assert body["not_found"] == ["missing"]
+
+
+@pytest.mark.parametrize("ids", [[], ["missing"] * (BATCH_GET_MAX_IDS + 1)])
+def test_batch_get_endpoint_validates_id_count(client, ids):
+    assert client.post("/memos/batch-get", json={"ids": ids}).status_code == 422
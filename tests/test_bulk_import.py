@@ -0,0 +1,72 @@
+"""一括インポート (create_memos_bulk / POST /memos/bulk) のテスト"""
+
+import pytest
+
+from src.utils.cache import QueryCache
+from src.utils.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager(cache=QueryCache(None))
+
+
+def test_bulk_import_saves_memos_tags_and_search_index(db_manager):
+    memo_ids = db_manager.create_memos_bulk([
+        {"title": "一括の会議メモ", "content": "四半期の予算を確認した", "tags": ["一括", "会議", "一括"]},
+        {"title": "一括のメモ", "content": "本文", "summary": "要約"},
+    ], batch_size=1)
+
+    first, second = db_manager.get_memos(memo_ids)
+    assert (first["title"], first["tags"]) == ("一括の会議メモ", ["一括", "会議"])
+    assert (second["summary"], second["tags"]) == ("要約", [])
+    assert first["created_at"] == first["updated_at"]
+    assert [memo["id"] for memo in db_manager.search_memos("四半期の予算")] == memo_ids[:1]
+    assert memo_ids[0] in [memo["id"] for memo in db_manager.get_memos_by_tag("一括")]
+
+
+def test_bulk_import_validates_all_items_before_writing(db_manager):
+    count = db_manager.get_memo_count()
+
+    with pytest.raises(ValueError, match="3件目"):
+        db_manager.create_memos_bulk([
+            {"title": "メモ", "content": "本文"},
+            {"title": "メモ", "content": "本文"},
+            {"title": "", "content": "本文"},
+        ], batch_size=1)
+
+    assert db_manager.get_memo_count() == count
+
+
+def test_bulk_endpoint_reports_invalid_item_index(client):
+    count = client.get("/stats").json()["count"]
+
+    response = client.post("/memos/bulk", json=[
+        {"title": "メモ", "content": "本文"},
+        {"title": "メモ", "content": "本文", "tags": "会議"},
+    ])
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("2件目: tags:")
+    assert client.get("/stats").json()["count"] == count
+
+
+def test_bulk_endpoint_accepts_ndjson(client):
+    body = (
+        '{"title": "一行目", "content": "本文"}\n\n'
+        '{"title": "二行目", "content": "本文", "tags": ["NDJSON"]}\n'
+    )
+
+    response = client.post(
+        "/memos/bulk", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+    assert response.json()["enrich"] == "none"
+
+
+def test_bulk_endpoint_rejects_non_array(client):
+    response = client.post("/memos/bulk", json={"title": "メモ", "content": "本文"})
+
+    assert response.status_code == 400
@@ -0,0 +1,239 @@
+"""読み取りキャッシュの無効化（書き込み・読み込みとの競合・TTL・LRU）のテスト"""
+
+from datetime import datetime
+
+import pytest
+
+from src.utils.cache import (
+    MISS, MemoryCacheBackend, QueryCache, SQLiteCacheBackend, cache_key
+)
+from src.utils.database_manager import DatabaseManager
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("memo", "a", 1, ttl=60)
+    backend.set("memo", "b", 2, ttl=60)
+    backend.get("memo", "a")
+    backend.set("memo", "c", 3, ttl=60)
+
+    assert backend.get("memo", "b") is MISS
+    assert backend.get("memo", "a") == 1
+    assert backend.evictions == 1
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryCacheBackend()
+    backend.set("memo", "a", 1, ttl=-1)
+
+    assert backend.get("memo", "a") is MISS
+
+
+@pytest.mark.parametrize("make_backend", [
+    lambda tmp_path: MemoryCacheBackend(),
+    lambda tmp_path: SQLiteCacheBackend(str(tmp_path / "cache.db")),
+], ids=["memory", "sqlite"])
+def test_invalidate_key_and_namespace(tmp_path, make_backend):
+    backend = make_backend(tmp_path)
+    backend.set("memo", "a", {"id": "a"}, ttl=60)
+    backend.set("memo", "b", {"id": "b"}, ttl=60)
+    backend.set("tags", "", ["会議"], ttl=60)
+
+    backend.invalidate("memo", "a")
+    assert backend.get("memo", "a") is MISS
+    assert backend.get("memo", "b") == {"id": "b"}
+
+    backend.invalidate("memo")
+    assert backend.get("memo", "b") is MISS
+    assert backend.get("tags", "") == ["会議"]
+
+
+def test_sqlite_backend_invalidation_is_shared_between_processes(tmp_path):
+    # 同じファイルを使う別プロセスの無効化が反映される
+    writer = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    reader = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    writer.set("memo", "a", {"id": "a"}, ttl=60)
+    assert reader.get("memo", "a") == {"id": "a"}
+
+    writer.invalidate("memo", "a")
+
+    assert reader.get("memo", "a") is MISS
+
+
+def test_sqlite_backend_stores_datetimes_as_iso8601(tmp_path):
+    # Memo.to_dict の datetime は API の応答（orjson）と同じ形式の文字列で読み出される
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    updated_at = datetime(2024, 5, 1, 10, 0, 0, 123456)
+    backend.set("memo", "a", {"updated_at": updated_at}, ttl=60)
+
+    assert backend.get("memo", "a") == {"updated_at": "2024-05-01T10:00:00.123456"}
+
+
+def test_load_racing_with_write_is_not_stored():
+    # 読み込み中に書き込みの無効化が走った場合、読み込んだ（古いかもしれない）値は保存しない
+    cache = QueryCache(MemoryCacheBackend())
+
+    def loader():
+        cache.invalidate("memo", "a")
+        return "古い本文"
+
+    assert cache.get_or_load("memo", "a", loader) == "古い本文"
+    assert cache.get("memo", "a") is MISS
+
+    assert cache.get_or_load("memo", "a", lambda: "新しい本文") == "新しい本文"
+    assert cache.get("memo", "a") == "新しい本文"
+
+
+def test_fill_after_invalidation_is_dropped():
+    cache = QueryCache(MemoryCacheBackend())
+    generation = cache.generation
+    cache.invalidate("memo")
+
+    cache.fill("memo", {"a": 1, "b": 2}, generation)
+
+    assert cache.get("memo", "a") is MISS
+    assert cache.get("memo", "b") is MISS
+
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager(cache=QueryCache(MemoryCacheBackend()))
+
+
+def test_get_memo_is_cached_until_update(db_manager):
+    memo_id = db_manager.create_memo(title="メモ", content="古い本文", tags=["会議"])["id"]
+    db_manager.get_memo(memo_id)
+    hits = db_manager.cache.hits
+    assert db_manager.get_memo(memo_id)["content"] == "古い本文"
+    assert db_manager.cache.hits == hits + 1
+
+    db_manager.update_memo(memo_id, content="新しい本文")
+
+    assert db_manager.get_memo(memo_id)["content"] == "新しい本文"
+
+
+def test_get_memos_shares_entries_with_get_memo(db_manager):
+    memo_id = db_manager.create_memo(title="メモ", content="古い本文")["id"]
+    db_manager.get_memos([memo_id, "missing"])
+    hits = db_manager.cache.hits
+    assert db_manager.get_memo(memo_id)["content"] == "古い本文"
+    assert db_manager.cache.hits == hits + 1
+
+    db_manager.update_memo(memo_id, content="新しい本文")
+
+    memos = db_manager.get_memos([memo_id, "missing"])
+    assert [memo and memo["content"] for memo in memos] == ["新しい本文", None]
+
+
+def test_delete_invalidates_memo_list_and_count(db_manager):
+    memo_id = db_manager.create_memo(title="削除するメモ", content="本文")["id"]
+    count = db_manager.get_memo_count()
+    db_manager.list_memos(limit=1000)
+    assert db_manager.get_memo(memo_id) is not None
+
+    db_manager.delete_memo(memo_id)
+
+    assert db_manager.get_memo(memo_id) is None
+    assert db_manager.get_memo_count() == count - 1
+    assert memo_id not in [memo["id"] for memo in db_manager.list_memos(limit=1000)]
+
+
+def test_create_invalidates_tags(db_manager):
+    db_manager.get_all_tags()
+
+    db_manager.create_memo(title="メモ", content="本文", tags=["新しいタグ"])
+
+    assert "新しいタグ" in db_manager.get_all_tags()
+
+
+def test_observe_version_clears_on_other_process_write():
+    cache = QueryCache(MemoryCacheBackend())
+    cache.observe_version("epoch", 1)
+    cache.set("memo", "a", 1)
+
+    # 同じバージョン・古いバージョンでは捨てない
+    cache.observe_version("epoch", 1)
+    cache.observe_version("epoch", 0)
+    assert cache.get("memo", "a") == 1
+
+    # 自プロセスの書き込みで1つ進んだ場合は捨てない
+    cache.observe_version("epoch", 2, local_write=True)
+    assert cache.get("memo", "a") == 1
+
+    # 他プロセスの書き込みで進んだ場合は捨てる
+    cache.observe_version("epoch", 3)
+    assert cache.get("memo", "a") is MISS
+
+
+def test_observe_version_clears_when_local_write_skips_versions():
+    cache = QueryCache(MemoryCacheBackend())
+    cache.observe_version("epoch", 1)
+    cache.set("memo", "a", 1)
+
+    # 間に他プロセスの書き込みがあった
+    cache.observe_version("epoch", 3, local_write=True)
+
+    assert cache.get("memo", "a") is MISS
+
+
+def test_observe_version_clears_on_new_epoch():
+    cache = QueryCache(MemoryCacheBackend())
+    cache.observe_version("epoch", 5)
+    cache.set("memo", "a", 1)
+
+    cache.observe_version("other", 5)
+
+    assert cache.get("memo", "a") is MISS
+
+
+@pytest.fixture
+def other_manager():
+    # 同じ DB に書き込む別プロセス（MCP サーバーなど）の代わり
+    return DatabaseManager(cache=QueryCache(MemoryCacheBackend()))
+
+
+def test_reads_see_write_from_other_manager(db_manager, other_manager):
+    memo_id = db_manager.create_memo(title="メモ", content="古い本文", tags=["会議"])["id"]
+    count = db_manager.get_memo_count()
+    assert db_manager.get_memo(memo_id)["content"] == "古い本文"
+    assert db_manager.get_memos([memo_id])[0]["content"] == "古い本文"
+    db_manager.get_all_tags()
+
+    other_manager.update_memo(memo_id, content="新しい本文", tags=["別プロセスのタグ"])
+    other_manager.create_memo(title="別プロセスのメモ", content="本文")
+
+    # ETag 用の get_data_version を呼ばなくても、読み取りのたびにバージョンを確認する
+    assert db_manager.get_memo(memo_id)["content"] == "新しい本文"
+    assert db_manager.get_memos([memo_id])[0]["content"] == "新しい本文"
+    assert db_manager.get_memo_count() == count + 1
+    assert "別プロセスのタグ" in db_manager.get_all_tags()
+
+
+def test_load_racing_with_other_manager_write_is_not_stored(db_manager, other_manager):
+    memo_id = db_manager.create_memo(title="メモ", content="古い本文")["id"]
+    db_manager.get_memo_count()
+
+    def racing_load(db):
+        memo = db_manager._get_memo.__wrapped__(db_manager, db, memo_id)
+        # 読み込みの直後に別プロセスが書き込んだ
+        other_manager.update_memo(memo_id, content="新しい本文")
+        return memo
+
+    db_manager._run(lambda db: db_manager.cache.get_or_load(
+        "memo", cache_key(memo_id), lambda: racing_load(db),
+        sync=lambda: db_manager._check_data_version(db),
+    ))
+
+    assert db_manager.cache.get("memo", cache_key(memo_id)) is MISS
+    assert db_manager.get_memo(memo_id)["content"] == "新しい本文"
+
+
+def test_local_write_keeps_other_entries_cached(db_manager):
+    kept_id = db_manager.create_memo(title="残るメモ", content="本文")["id"]
+    db_manager.get_memo(kept_id)
+
+    db_manager.create_memo(title="別のメモ", content="本文")
+    hits = db_manager.cache.hits
+    db_manager.get_memo(kept_id)
+
+    assert db_manager.cache.hits == hits + 1
@@ -0,0 +1,50 @@
+"""本文の変更量による AI 再処理の判定 (EnrichmentGate) のテスト"""
+
+from src.utils.change_detector import EnrichmentGate, changed_chars, content_similarity
+
+LONG_MEMO = (
+    "来週の定例会議では、新しい検索機能のリリース計画と、既存のタグ付けの精度について議論する。"
+    "検索は日本語の部分一致に対応し、英数字は単語の前方一致で引けるようにした。"
+    "タグ付けは LLM の応答が遅い場合にローカルのキーワード抽出で補う。"
+    "一括インポートの速度と、キャッシュの無効化が他のプロセスに伝わるかも確認したい。"
+)
+
+
+def test_typo_fix_in_short_memo_is_skipped():
+    gate = EnrichmentGate(threshold=0.1, min_chars=4)
+
+    # 割合では threshold を大きく超える
+    assert 1.0 - content_similarity("明日は会義に出る", "明日は会議に出る") >= 0.1
+    assert not gate.should_reprocess("明日は会義に出る", "明日は会議に出る")
+    assert gate.stats()["skipped"] == 1
+
+
+def test_rewritten_short_memo_is_reprocessed():
+    gate = EnrichmentGate(threshold=0.1, min_chars=4)
+
+    assert gate.should_reprocess("明日は会議に出る", "牛乳と卵を買う")
+    # min_chars より短いメモでも、書き換えられていれば再処理する
+    assert gate.should_reprocess("牛乳", "卵")
+
+
+def test_whitespace_and_case_changes_are_skipped():
+    gate = EnrichmentGate(threshold=0.1, min_chars=4)
+
+    assert not gate.should_reprocess("Buy  milk\n", "buy milk")
+    assert not gate.should_reprocess("ＡＢＣ　メモ", "abc メモ")
+
+
+def test_large_edit_of_long_memo_is_reprocessed():
+    gate = EnrichmentGate(threshold=0.1, min_chars=4)
+    new = LONG_MEMO[:100] + "予算の見直しと採用計画についても話し合う。" * 5
+
+    assert gate.should_reprocess(LONG_MEMO, new)
+    assert not gate.should_reprocess(LONG_MEMO, LONG_MEMO.replace("議論する", "話し合う", 1))
+    assert gate.stats()["rerun"] == 1
+
+
+def test_changed_chars_counts_single_edit():
+    assert changed_chars("明日は会義に出る", "明日は会議に出る") == 1
+    assert changed_chars("牛乳を買う", "牛乳とパンを買う") == 3
+    assert changed_chars("", "メモ") == 2
+    assert changed_chars("同じ", "同じ") == 0
@@ -0,0 +1,207 @@
+"""AI 処理のジョブキュー（取り出し・リース・リトライ）とワーカーのテスト"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, update
+
+from src.models.database import SessionLocal
+from src.utils.cache import QueryCache
+from src.utils.database_manager import DatabaseManager
+from src.utils.enrichment_queue import (
+    EnrichmentQueue, EnrichmentWorkerPool, backoff_delay, jobs
+)
+
+
+@pytest.fixture
+def db_manager():
+    # テーブルは DatabaseManager の作成時に作られる
+    return DatabaseManager(cache=QueryCache(None))
+
+
+@pytest.fixture
+def db(db_manager):
+    session = SessionLocal()
+    session.execute(delete(jobs))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture
+def memo_ids(db_manager):
+    return [
+        db_manager.create_memo(title=f"メモ {i}", content=f"本文 {i}")["id"]
+        for i in range(2)
+    ]
+
+
+def test_claim_marks_job_running_and_counts_attempt(db, memo_ids):
+    queue = EnrichmentQueue()
+    queue.enqueue(db, memo_ids[:1])
+
+    job = queue.claim(db)
+
+    assert job["memo_id"] == memo_ids[0]
+    assert job["attempts"] == 1
+    assert queue.get(db, memo_ids[0])["status"] == "running"
+    # 処理中のジョブは他のワーカーに渡さない
+    assert queue.claim(db) is None
+
+
+def test_claim_takes_each_job_once(db, memo_ids):
+    queue = EnrichmentQueue()
+    queue.enqueue(db, memo_ids)
+
+    claimed = {queue.claim(db)["memo_id"], queue.claim(db)["memo_id"]}
+
+    assert claimed == set(memo_ids)
+    assert queue.claim(db) is None
+
+
+def test_expired_lease_is_reclaimed(db, memo_ids):
+    queue = EnrichmentQueue()
+    queue.enqueue(db, memo_ids[:1])
+    # ワーカーが落ちてリースが切れた状態
+    queue.claim(db, lease_seconds=-1)
+
+    job = queue.claim(db)
+
+    assert job["memo_id"] == memo_ids[0]
+    assert job["attempts"] == 2
+
+
+def test_fail_retries_after_backoff_until_max_attempts(db, memo_ids):
+    queue = EnrichmentQueue()
+    queue.enqueue(db, memo_ids[:1])
+    job = queue.claim(db)
+
+    status = queue.fail(db, job["job_id"], job["attempts"], "timeout", max_attempts=2)
+    assert status == "queued"
+    status = queue.get(db, memo_ids[0])
+    assert status["last_error"] == "timeout"
+    # バックオフの間は取り出さない
+    assert datetime.fromisoformat(status["next_run_at"]) > datetime.now()
+    assert queue.claim(db) is None
+
+    db.execute(update(jobs).values(next_run_at=datetime.now()))
+    job = queue.claim(db)
+    assert job["attempts"] == 2
+    status = queue.fail(db, job["job_id"], job["attempts"], "timeout", max_attempts=2)
+    assert status == "failed"
+    db.execute(update(jobs).values(next_run_at=datetime.now()))
+    assert queue.claim(db) is None
+
+
+def test_release_does_not_count_attempt(db, memo_ids):
+    queue = EnrichmentQueue()
+    queue.enqueue(db, memo_ids[:1])
+    job = queue.claim(db)
+
+    queue.release(db, job["job_id"])
+
+    assert queue.claim(db)["attempts"] == 1
+
+
+def test_enqueue_resets_existing_job(db, memo_ids):
+    queue = EnrichmentQueue()
+    queue.enqueue(db, memo_ids[:1])
+    job = queue.claim(db)
+    queue.fail(db, job["job_id"], job["attempts"], "error", max_attempts=1)
+
+    queue.enqueue(db, memo_ids[:1])
+
+    status = queue.get(db, memo_ids[0])
+    assert status["status"] == "queued"
+    assert status["attempts"] == 0
+    assert status["last_error"] is None
+
+
+def test_backoff_delay_doubles():
+    assert backoff_delay(2) == 2 * backoff_delay(1)
+
+
+class FakeDatabaseManager:
+    """AsyncDatabaseManager のワーカーが使うメソッドだけを持つ代用品"""
+
+    def __init__(self, jobs_to_run, fail_writes: int = 0):
+        self.jobs = list(jobs_to_run)
+        self.fail_writes = fail_writes
+        self.completed = []
+        self.failed = []
+
+    async def claim_enrichment_job(self):
+        return self.jobs.pop(0) if self.jobs else None
+
+    async def get_memo(self, memo_id):
+        return {"id": memo_id, "content": "本文"}
+
+    async def complete_enrichment_job(self, job_id, memo_id, summary, tags):
+        if self.fail_writes:
+            self.fail_writes -= 1
+            raise RuntimeError("database is locked")
+        self.completed.append(memo_id)
+
+    async def fail_enrichment_job(self, job_id, memo_id, attempts, error):
+        if self.fail_writes:
+            self.fail_writes -= 1
+            raise RuntimeError("database is locked")
+        self.failed.append((memo_id, error))
+        return "queued"
+
+    async def release_enrichment_job(self, job_id):
+        pass
+
+
+class FakeAIProcessor:
+    def __init__(self, error: Exception = None):
+        self.error = error
+
+    async def process_memo(self, content):
+        if self.error:
+            raise self.error
+        return {"summary": "- 要約", "tags": ["タグ"]}
+
+
+async def run_workers(db_manager, ai_processor):
+    pool = EnrichmentWorkerPool(db_manager, ai_processor, workers=1, poll_interval=0.01)
+    pool.start()
+    for _ in range(100):
+        if not db_manager.jobs:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    await pool.stop()
+
+
+def job(i):
+    return {"job_id": i, "memo_id": f"memo-{i}", "attempts": 1}
+
+
+def test_worker_completes_jobs():
+    db_manager = FakeDatabaseManager([job(1), job(2)])
+
+    asyncio.run(run_workers(db_manager, FakeAIProcessor()))
+
+    assert db_manager.completed == ["memo-1", "memo-2"]
+
+
+def test_worker_records_ai_failure():
+    db_manager = FakeDatabaseManager([job(1)])
+
+    asyncio.run(run_workers(db_manager, FakeAIProcessor(RuntimeError("upstream 500"))))
+
+    assert db_manager.failed == [("memo-1", "upstream 500")]
+
+
+def test_worker_survives_write_errors():
+    # 結果の書き込みも失敗の記録も失敗するジョブの後も、ワーカーは次のジョブを処理する
+    db_manager = FakeDatabaseManager([job(1), job(2)], fail_writes=2)
+
+    asyncio.run(run_workers(db_manager, FakeAIProcessor()))
+
+    assert db_manager.completed == ["memo-2"]
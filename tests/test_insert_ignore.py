@@ -0,0 +1,85 @@
+"""insert_ignore（一意制約に衝突する行を無視する INSERT）のテスト"""
+
+import uuid
+
+import pytest
+from sqlalchemy import false, select
+
+from src.models.database import SessionLocal, Tag
+from src.utils import database_manager
+from src.utils.cache import QueryCache
+from src.utils.database_manager import DatabaseManager, insert_ignore
+
+
+@pytest.fixture
+def db():
+    # テーブルは DatabaseManager の作成時に作られる
+    DatabaseManager(cache=QueryCache(None))
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture
+def portable(db, monkeypatch):
+    """ON CONFLICT を使えない DB として扱う"""
+    monkeypatch.setattr(db.get_bind().dialect, "name", "generic")
+
+
+def names(prefix: str, count: int):
+    return [f"{prefix}-{uuid.uuid4().hex[:8]}-{i}" for i in range(count)]
+
+
+def tag_names(db, candidates):
+    return set(db.execute(select(Tag.name).where(Tag.name.in_(candidates))).scalars())
+
+
+def test_insert_ignore_skips_existing_rows(db):
+    existing, new = names("既存", 1), names("新規", 2)
+    insert_ignore(db, Tag.__table__, [{"name": name} for name in existing], ["name"])
+
+    rows = [{"name": name} for name in existing + new]
+    inserted = insert_ignore(db, Tag.__table__, rows, ["name"])
+
+    assert inserted == 2
+    assert tag_names(db, existing + new) == set(existing + new)
+
+
+def test_portable_fallback_skips_existing_and_duplicate_rows(db, portable):
+    existing, new = names("既存", 1), names("新規", 2)
+    insert_ignore(db, Tag.__table__, [{"name": name} for name in existing], ["name"])
+
+    rows = [{"name": name} for name in existing + new + new[:1]]
+    inserted = insert_ignore(db, Tag.__table__, rows, ["name"])
+
+    assert inserted == 2
+    assert tag_names(db, existing + new) == set(existing + new)
+
+
+def test_portable_fallback_ignores_rows_created_concurrently(db, portable, monkeypatch):
+    created, new = names("同時", 1), names("新規", 1)
+    db.execute(Tag.__table__.insert().values(name=created[0]))
+    # 既存キーを引いた後に別の書き込みが作成した状態（引いた結果に現れない）
+    monkeypatch.setattr(
+        database_manager, "select", lambda *columns: select(*columns).where(false())
+    )
+
+    rows = [{"name": name} for name in created + new]
+    inserted = insert_ignore(db, Tag.__table__, rows, ["name"])
+
+    assert inserted == 1
+    # 一意制約違反はセーブポイントで取り消され、トランザクションは続けられる
+    assert tag_names(db, created + new) == set(created + new)
+
+
+def test_resolve_tags_uses_portable_fallback(db, portable):
+    db_manager = DatabaseManager(cache=QueryCache(None))
+    tags = names("タグ", 2)
+
+    resolved = db_manager._resolve_tags(db, tags + tags[:1])
+
+    assert [tag.name for tag in resolved] == tags
+    assert db.info.get("tags_created") is True
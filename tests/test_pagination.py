@@ -0,0 +1,83 @@
+"""GET /memos と list_memos_page のキーセット（カーソル）ページングのテスト"""
+
+import pytest
+
+from src.utils.cache import QueryCache
+from src.utils.database_manager import DatabaseManager, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager(cache=QueryCache(None))
+
+
+def all_pages(db_manager, limit):
+    """next_cursor が無くなるまでページを取得し、ページごとの ID のリストを返す"""
+    pages = []
+    cursor = None
+    while True:
+        page = db_manager.list_memos_page(limit=limit, cursor=cursor, fields=["title"])
+        pages.append([memo["id"] for memo in page["memos"]])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return pages
+
+
+def test_cursor_pages_cover_all_memos_once(db_manager):
+    # 一括インポートのメモは updated_at が同じになり、id で順序が決まる
+    db_manager.create_memos_bulk(
+        [{"title": f"ページング {i}", "content": "本文"} for i in range(7)]
+    )
+
+    pages = all_pages(db_manager, limit=3)
+    memo_ids = [memo_id for page in pages for memo_id in page]
+
+    assert all(len(page) <= 3 for page in pages)
+    assert len(memo_ids) == len(set(memo_ids)) == db_manager.get_memo_count()
+    by_offset = db_manager.list_memos(limit=len(memo_ids))
+    assert memo_ids == [memo["id"] for memo in by_offset]
+
+
+def test_cursor_page_is_not_shifted_by_updates(db_manager):
+    for i in range(4):
+        db_manager.create_memo(title=f"更新とページング {i}", content="本文")
+    first = db_manager.list_memos_page(limit=2)
+    # 1ページ目を取得した後に、まだ見ていないメモが更新されて先頭に移動する
+    unseen = db_manager.list_memos(limit=3)[2]
+    db_manager.update_memo(unseen["id"], content="更新した本文")
+
+    second = db_manager.list_memos_page(limit=2, cursor=first["next_cursor"])
+
+    seen = {memo["id"] for memo in first["memos"]}
+    assert not seen & {memo["id"] for memo in second["memos"]}
+    assert unseen["id"] not in [memo["id"] for memo in second["memos"]]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("2024-01-01 00:00:00.000001", "memo-id")) == (
+        "2024-01-01 00:00:00.000001", "memo-id"
+    )
+
+
+def test_invalid_cursor_is_rejected(db_manager):
+    with pytest.raises(ValueError, match="不正なカーソル"):
+        db_manager.list_memos_page(cursor="not-a-cursor")
+
+
+def test_api_returns_next_cursor_header(client, db_manager):
+    for i in range(3):
+        db_manager.create_memo(title=f"ヘッダーのページング {i}", content="本文")
+
+    first = client.get("/memos", params={"limit": 2})
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/memos", params={"limit": 2, "cursor": cursor})
+
+    assert first.status_code == second.status_code == 200
+    first_ids = {memo["id"] for memo in first.json()}
+    assert not first_ids & {memo["id"] for memo in second.json()}
+
+
+def test_api_rejects_invalid_cursor(client):
+    response = client.get("/memos", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
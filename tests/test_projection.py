@@ -0,0 +1,72 @@
+"""一覧・検索の fields（返す項目の絞り込み）と preview（本文の先頭だけ返す）のテスト"""
+
+import pytest
+
+from src.models.database import engine
+from src.utils.cache import QueryCache
+from src.utils.database_manager import DatabaseManager
+from src.utils.query_counter import QueryCounter
+
+CONTENT = "プロジェクトの進捗について話し合いました。" * 20
+
+
+@pytest.fixture(scope="module")
+def db_manager():
+    db_manager = DatabaseManager(cache=QueryCache(None))
+    db_manager.create_memo(title="射影のテスト", content=CONTENT, tags=["射影"], summary="要約")
+    return db_manager
+
+
+def test_fields_limits_keys_and_keeps_id(db_manager):
+    memos = db_manager.get_memos_by_tag("射影", fields=["title", "updated_at"])
+
+    assert set(memos[0]) == {"id", "title", "updated_at"}
+    assert memos[0]["title"] == "射影のテスト"
+
+
+def test_fields_with_tags(db_manager):
+    memos = db_manager.search_memos("射影のテスト", fields=["title", "tags"])
+
+    assert memos[0]["tags"] == ["射影"]
+    assert "content" not in memos[0]
+
+
+def test_fields_does_not_select_other_columns(db_manager):
+    with QueryCounter(engine) as counter:
+        db_manager.list_memos(limit=10, fields=["title"])
+
+    select_memos = [
+        statement for statement in counter.statements if "FROM memos" in statement
+    ]
+    assert select_memos
+    assert all("memos.content" not in statement for statement in select_memos)
+    assert all("memo_tags" not in statement for statement in counter.statements)
+
+
+def test_preview_returns_prefix_without_content(db_manager):
+    memos = db_manager.get_memos_by_tag("射影", fields=["title"], preview=10)
+
+    assert memos[0]["preview"] == CONTENT[:10]
+    assert "content" not in memos[0]
+
+
+def test_without_fields_returns_full_memo(db_manager):
+    memo = db_manager.get_memos_by_tag("射影")[0]
+
+    assert memo["content"] == CONTENT
+    assert memo["summary"] == "要約"
+    assert "preview" not in memo
+
+
+def test_unknown_field_is_rejected(db_manager):
+    with pytest.raises(ValueError, match="password"):
+        db_manager.list_memos(fields=["title", "password"])
+
+
+def test_api_fields_and_unknown_field(client, db_manager):
+    params = {"fields": "title,tags", "preview": 5}
+    response = client.get("/memos/tag/射影", params=params)
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"id", "title", "tags", "preview"}
+
+    assert client.get("/memos", params={"fields": "title,password"}).status_code == 400
@@ -0,0 +1,86 @@
+"""
+DatabaseManager の SQL 発行回数のテスト
+
+各メソッドが発行する SQL 文の数を数え、想定値を超えたら失敗する。
+メモ件数に比例してクエリが増える N+1 問題の再発検知用。
+
+    uv run pytest tests/test_query_counts.py
+"""
+
+import pytest
+
+from src.models.database import engine
+from src.utils.cache import QueryCache
+from src.utils.database_manager import DatabaseManager
+from src.utils.query_counter import QueryCounter
+
+MEMO_COUNT = 50
+
+# メソッドごとの想定 SQL 文数（メモ件数に依存しないこと）
+EXPECTED = {
+    "get_memo": 2,  # メモ + タグ (selectin)
+    "get_memos": 2,  # メモ (IN) + タグ (selectin)
+    "list_memos": 2,  # メモ一覧 + タグ (selectin)
+    "search_memos": 3,  # FTS5 検索 + メモ + タグ (selectin)
+    "get_memos_by_tag": 2,  # メモ一覧 + タグ (selectin)
+    "get_all_tags": 1,
+    "get_memo_count": 1,
+    # 書き込みはタグ数に関係なく1トランザクション・一定の文数
+    # タグ検索 + タグ追加 + タグ再検索 + メモ + memo_tags + FTS5 (3)
+    # + データのバージョン + 変更イベント
+    "create_memo": 10,
+    # メモ + タグ (selectin) + タグ解決 (3) + FTS5 (3) + メモ更新 + memo_tags (2)
+    # + データのバージョン + 変更イベント
+    "update_memo": 13,
+    # メモ + FTS5 (3) + AI ジョブ + タグ (lazy) + memo_tags + メモ削除
+    # + データのバージョン + 変更イベント
+    "delete_memo": 10,
+}
+
+
+def count(func, *args, **kwargs):
+    """関数実行中に発行された SQL 文の数を返す"""
+    with QueryCounter(engine) as counter:
+        func(*args, **kwargs)
+    return counter.count
+
+
+@pytest.fixture(scope="module")
+def actual():
+    # キャッシュを無効にして DB に届く SQL だけを数える
+    db_manager = DatabaseManager(cache=QueryCache(None))
+    memo_ids = [
+        db_manager.create_memo(
+            title=f"会議メモ {i}",
+            content=f"プロジェクトの進捗について話し合いました ({i})",
+            tags=["会議", f"tag{i}"],
+            summary="要約",
+        )["id"]
+        for i in range(MEMO_COUNT)
+    ]
+
+    return {
+        "get_memo": count(db_manager.get_memo, memo_ids[0]),
+        "get_memos": count(db_manager.get_memos, memo_ids[2:42] + ["missing"]),
+        "list_memos": count(db_manager.list_memos, limit=MEMO_COUNT),
+        "search_memos": count(db_manager.search_memos, "会議", limit=MEMO_COUNT),
+        "get_memos_by_tag": count(db_manager.get_memos_by_tag, "会議", limit=MEMO_COUNT),
+        "get_all_tags": count(db_manager.get_all_tags),
+        "get_memo_count": count(db_manager.get_memo_count),
+        "create_memo": count(
+            db_manager.create_memo, title="新規", content="内容",
+            tags=["会議", "新規1", "新規2", "新規3", "新規4", "新規5", "新規6", "新規7"],
+        ),
+        "update_memo": count(
+            db_manager.update_memo, memo_ids[0],
+            content="更新", tags=["会議", "更新1", "更新2"],
+        ),
+        "delete_memo": count(db_manager.delete_memo, memo_ids[1]),
+    }
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_query_count(actual, name):
+    assert actual[name] <= EXPECTED[name], (
+        f"{name}: {actual[name]} 文 (想定 {EXPECTED[name]} 文以下)"
+    )
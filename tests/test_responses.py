@@ -0,0 +1,103 @@
+"""orjson の応答（日時の形式）と圧縮ミドルウェア（Accept-Encoding / Vary）のテスト"""
+
+from datetime import datetime
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.backend.responses import (
+    CompressionMiddleware, FastJSONResponse, brotli, choose_encoding
+)
+
+LARGE = 2048
+
+
+def make_app():
+    async def large(request):
+        return FastJSONResponse({"text": "メモ" * LARGE})
+
+    async def small(request):
+        return FastJSONResponse({"text": "メモ"})
+
+    async def stream(request):
+        events = iter([b"data: 1\n\n", b"data: 2\n\n"])
+        return StreamingResponse(events, media_type="text/event-stream")
+
+    async def not_modified(request):
+        return PlainTextResponse("", status_code=304)
+
+    app = Starlette(routes=[
+        Route("/large", large),
+        Route("/small", small),
+        Route("/stream", stream),
+        Route("/not-modified", not_modified),
+    ])
+    app.add_middleware(CompressionMiddleware, min_size=1024)
+    return TestClient(app)
+
+
+def test_fast_json_response_renders_datetime_as_iso8601():
+    created_at = datetime(2024, 5, 1, 10, 0, 0, 123456)
+
+    updated_at = datetime(2024, 5, 1)
+
+    body = FastJSONResponse({"created_at": created_at, "updated_at": updated_at}).body
+
+    assert body == (
+        b'{"created_at":"2024-05-01T10:00:00.123456",'
+        b'"updated_at":"2024-05-01T00:00:00"}'
+    )
+
+
+def test_memo_dates_are_serialized_by_orjson(client):
+    memo = client.post("/memos/bulk", json=[{"title": "メモ", "content": "本文"}]).json()
+
+    response = client.get(f"/memos/{memo['ids'][0]}")
+
+    assert datetime.fromisoformat(response.json()["created_at"])
+    assert "T" in response.json()["created_at"]
+
+
+def test_large_response_is_gzipped_with_vary():
+    response = make_app().get("/large", headers={"accept-encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == {"text": "メモ" * LARGE}
+
+
+def test_uncompressed_eligible_response_still_varies():
+    # Accept-Encoding の無いリクエストの非圧縮の応答を、共有キャッシュが圧縮対応のクライアントに返さないように
+    response = make_app().get("/large", headers={"accept-encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_not_modified_varies_like_the_full_response():
+    response = make_app().get("/not-modified", headers={"accept-encoding": "gzip"})
+
+    assert response.status_code == 304
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+@pytest.mark.parametrize("path", ["/small", "/stream"])
+def test_small_and_streaming_responses_are_not_compressed(path):
+    response = make_app().get(path, headers={"accept-encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0, identity", None),
+    ("*", "br" if brotli is not None else "gzip"),
+    ("", None),
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
@@ -0,0 +1,84 @@
+"""全文検索（文字 n-gram のトークン化と FTS5 インデックス）のテスト"""
+
+import pytest
+
+from src.utils.cache import QueryCache
+from src.utils.database_manager import DatabaseManager
+from src.utils.text_tokenizer import split_runs, tokenize, tokenize_query
+
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager(cache=QueryCache(None))
+
+
+def ids(memos):
+    return [memo["id"] for memo in memos]
+
+
+def test_tokenize_splits_cjk_into_ngrams_and_keeps_words():
+    assert tokenize("会議メモ Python3、ＡＢＣ") == ["会議", "議メ", "メモ", "モ", "python3", "abc"]
+
+
+def test_split_runs_separates_cjk_and_words():
+    assert split_runs("東京タワー2024年") == [("東京タワー", True), ("2024", False), ("年", True)]
+
+
+def test_tokenize_query_uses_phrases_and_prefixes():
+    assert tokenize_query("進捗報告 py 議") == [
+        (["進捗", "捗報", "報告"], False),
+        (["py"], True),
+        (["議"], True),
+    ]
+
+
+def test_search_finds_japanese_substring(db_manager):
+    memo = db_manager.create_memo(title="週次の定例", content="蒼穹プロジェクトの進捗報告を共有した")
+
+    assert memo["id"] in ids(db_manager.search_memos("穹プロ"))
+    # 1文字の検索語は前方一致で引く
+    assert memo["id"] in ids(db_manager.search_memos("穹"))
+    assert memo["id"] not in ids(db_manager.search_memos("穹報告"))
+
+
+def test_search_matches_word_prefix_and_full_width(db_manager):
+    memo = db_manager.create_memo(title="Zephyrine の設定", content="設定ファイルを見直す")
+
+    assert memo["id"] in ids(db_manager.search_memos("zephyr"))
+    assert memo["id"] in ids(db_manager.search_memos("ＺＥＰＨＹＲＩＮＥ"))
+
+
+def test_search_requires_all_terms(db_manager):
+    both = db_manager.create_memo(title="翡翠と琥珀", content="宝石の比較")
+    one = db_manager.create_memo(title="翡翠だけ", content="宝石の一覧")
+
+    found = ids(db_manager.search_memos("翡翠 琥珀"))
+
+    assert both["id"] in found
+    assert one["id"] not in found
+
+
+def test_search_ranks_title_above_content(db_manager):
+    # 更新日時の順（ILIKE 検索の並び）とは逆になるように作成する
+    in_title = db_manager.create_memo(title="瑠璃色のメモ", content="空の写真")
+    in_content = db_manager.create_memo(title="雑記", content="今日は瑠璃色の空だった")
+
+    assert ids(db_manager.search_memos("瑠璃色"))[:2] == [in_title["id"], in_content["id"]]
+
+
+def test_search_follows_updates_deletes_and_tags(db_manager):
+    memo = db_manager.create_memo(title="索引の同期", content="古い翠嵐の本文", tags=["群青"])
+    assert memo["id"] in ids(db_manager.search_memos("群青"))
+
+    db_manager.update_memo(memo["id"], content="新しい本文")
+    assert memo["id"] not in ids(db_manager.search_memos("翠嵐"))
+
+    db_manager.delete_memo(memo["id"])
+    assert memo["id"] not in ids(db_manager.search_memos("索引の同期"))
+
+
+def test_search_escapes_fts_syntax(db_manager):
+    memo = db_manager.create_memo(title='引用符 "quoted" AND', content="NEAR(テスト) *")
+
+    assert memo["id"] in ids(db_manager.search_memos('"quoted" AND'))
+    assert db_manager.search_memos('NEAR( * "') is not None
@@ -0,0 +1,38 @@
+"""トークン数の数え方と長いメモの分割のテスト"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import text_chunker
+from src.utils.text_chunker import chunk_text, count_tokens
+
+
+@pytest.fixture
+def offline_tiktoken(monkeypatch):
+    # BPE ファイルをダウンロードできない環境の tiktoken
+    calls = []
+
+    def fail(name):
+        calls.append(name)
+        raise ConnectionError("could not download o200k_base")
+
+    broken = SimpleNamespace(encoding_for_model=fail, get_encoding=fail)
+    monkeypatch.setattr(text_chunker, "tiktoken", broken)
+    monkeypatch.setattr(text_chunker, "_encodings", {})
+    return calls
+
+
+def test_count_tokens_falls_back_when_encoding_is_unavailable(offline_tiktoken):
+    assert count_tokens("abcdefgh会議") == 2 + 2
+    # 失敗した結果も覚えておき、ダウンロードを繰り返さない
+    count_tokens("もう一度")
+    assert offline_tiktoken == ["gpt-4o-mini"]
+
+
+def test_chunk_text_works_when_encoding_is_unavailable(offline_tiktoken):
+    chunks = chunk_text("一段落目\n\n" + "あ" * 30, max_tokens=10)
+
+    assert chunks[0] == "一段落目"
+    assert all(count_tokens(chunk) <= 10 for chunk in chunks)
+    assert "".join(chunks[1:]) == "あ" * 30